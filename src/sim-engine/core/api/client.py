@@ -1,12 +1,41 @@
 # api/client.py
+from collections import OrderedDict
+
 import httpx
 
 BASE_URL = "http://localhost:8000"  # your FastAPI server URL
+API_PREFIX = "/api/v1"
+MAX_CACHED_RESPONSES = 1024  # ETag-validated GET bodies kept for revalidation
 
 
 class SocialAPIClient:
     def __init__(self, base_url=BASE_URL):
         self.client = httpx.Client(base_url=base_url)
+        # url -> (etag, decoded body), least recently used first
+        self._validated = OrderedDict()
+
+    def _get(self, path: str, params=None):
+        """GET with If-None-Match; a 304 reuses the body cached for that URL."""
+        request = self.client.build_request("GET", path, params=params)
+        url = str(request.url)
+        cached = self._validated.get(url)
+        if cached:
+            request.headers["If-None-Match"] = cached[0]
+        response = self.client.send(request)
+        if response.status_code == 304 and cached:
+            self._validated.move_to_end(url)
+            return cached[1]
+        response.raise_for_status()
+        data = response.json()
+        etag = response.headers.get("ETag")
+        if etag:
+            self._validated[url] = (etag, data)
+            self._validated.move_to_end(url)
+            while len(self._validated) > MAX_CACHED_RESPONSES:
+                self._validated.popitem(last=False)
+        else:
+            self._validated.pop(url, None)
+        return data
 
     def create_post(self, user_id: str, content: str):
         response = self.client.post(
@@ -15,7 +44,16 @@ class SocialAPIClient:
         response.raise_for_status()
         return response.json()
 
-    def get_feed(self, user_id: str):
-        response = self.client.get(f"/feed/{user_id}")
-        response.raise_for_status()
-        return response.json()
+    def get_post(self, post_id: int):
+        return self._get(f"{API_PREFIX}/posts/{post_id}")
+
+    def get_user(self, user_id: int):
+        return self._get(f"{API_PREFIX}/users/{user_id}")
+
+    def get_feed(self, user_id: str, cursor=None, limit=None):
+        params = {
+            key: value
+            for key, value in (("cursor", cursor), ("limit", limit))
+            if value is not None
+        }
+        return self._get(f"{API_PREFIX}/user-feeds/by-user/{user_id}", params)
@@ -0,0 +1,7 @@
+import os
+
+# Database engine profile, see core/db/engine.py: "dev" echoes SQL with
+# driver defaults, "production" turns echo off and tunes SQLite for concurrency
+DB_PROFILE = os.getenv("SIM_DB_PROFILE", "dev")
+DB_POOL_SIZE = int(os.getenv("SIM_DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("SIM_DB_MAX_OVERFLOW", "10"))
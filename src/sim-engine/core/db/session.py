@@ -1,14 +1,21 @@
 from typing import AsyncGenerator
 from sqlmodel import SQLModel
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel.ext.asyncio.session import AsyncSession as SQLModelAsyncSession
 from sqlalchemy.orm import sessionmaker
 from contextlib import asynccontextmanager
+from ..config import settings
+from .engine import create_engine
 
 DATABASE_URL = "sqlite+aiosqlite:///./simengine.db"
 DB_FILE = "./simengine.db"
 
-engine = create_async_engine(DATABASE_URL, echo=True, future=True)
+engine = create_engine(
+    DATABASE_URL,
+    profile=settings.DB_PROFILE,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+)
 
 async_session = sessionmaker(
     engine, class_=SQLModelAsyncSession, expire_on_commit=False
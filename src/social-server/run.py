@@ -1,36 +1,141 @@
+import argparse
 import asyncio
+import importlib.util
 import os
 import sys
 import uvicorn
 
-from server.db.session import DB_FILE
-from scripts.init_data import seed
+# The engine profile is read at import time; production turns off SQL echo
+# and applies the SQLite WAL pragmas
+if "--prod" in sys.argv:
+    os.environ.setdefault("DB_PROFILE", "production")
 
+from server.common import config  # noqa: E402
+from server.db.session import (  # noqa: E402
+    DATABASE_URL,
+    DB_FILE,
+    engine,
+    init_db,
+    reset_db,
+)
+from scripts.init_data import seed  # noqa: E402
 
-def main():
-    # Parse flags
-    init_db_flag = "--init-db" in sys.argv
-    init_data_flag = "--init-data" in sys.argv
-
-    # Clean flags from sys.argv so uvicorn doesn't choke
-    for flag in ("--init-db", "--init-data"):
-        if flag in sys.argv:
-            sys.argv.remove(flag)
-
-    # Delete the database file if either flag is set
-    if init_db_flag or init_data_flag:
-        if os.path.exists(DB_FILE):
-            print(f"🗑️  Deleting existing DB file: {DB_FILE}")
-            os.remove(DB_FILE)
-
-    # Run seeding if --init-data
-    if init_data_flag:
+# Default GRAPH_MAX_AGE_SECONDS with several workers, where each one's graph
+# index only sees the others' follows and friendships after a rebuild
+MULTI_WORKER_GRAPH_MAX_AGE_SECONDS = "10"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the social server")
+    parser.add_argument(
+        "--init-db", action="store_true", help="drop and recreate the database"
+    )
+    parser.add_argument(
+        "--init-data", action="store_true", help="recreate and seed test data"
+    )
+    parser.add_argument(
+        "--prod",
+        action="store_true",
+        help="serve with several workers and no reloader",
+    )
+    parser.add_argument("--workers", type=int, default=config.SERVER_WORKERS)
+    parser.add_argument("--host", default=config.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVER_PORT)
+    return parser.parse_args()
+
+
+async def prepare_db(reset: bool, init_data: bool):
+    # One event loop for every step, pooled connections are bound to it
+    if reset:
+        print("🗑️  Dropping all tables...")
+        await reset_db()
+    if init_data:
         print("🌱 Seeding database with test data...")
-        asyncio.run(seed())
+        await seed()
+    else:
+        await init_db()
+    # Workers open their own pools; do not carry this one's connections along
+    await engine.dispose()
+
+
+def serve_production(host: str, port: int, workers: int):
+    if DB_FILE is None and DATABASE_URL.startswith("sqlite") and workers > 1:
+        raise SystemExit("In-memory SQLite cannot be shared between workers")
+    if workers > 1 and not config.CACHE_URL:
+        print("⚠️  Per-worker caches: writes in one worker are not seen by others")
+        print("   until their TTL expires; set CACHE_URL to share one cache.")
+        print("⚠️  Trending runs in one worker: the others answer /trending with")
+        print("   an empty list unless CACHE_URL shares its lists.")
+    if workers > 1 and "GRAPH_MAX_AGE_SECONDS" not in os.environ:
+        print("⚠️  Per-worker graph index: /graph sees follows and friendships")
+        print(
+            "   written by other workers after a rebuild, every "
+            f"{MULTI_WORKER_GRAPH_MAX_AGE_SECONDS}s;"
+        )
+        print("   set GRAPH_MAX_AGE_SECONDS to change that.")
+        # Read by the spawned workers at import time
+        os.environ["GRAPH_MAX_AGE_SECONDS"] = MULTI_WORKER_GRAPH_MAX_AGE_SECONDS
+    if workers > 1 and config.ACTIVITY_URL == "memory://":
+        raise SystemExit(
+            "ACTIVITY_URL=memory:// lives in one process and cannot relay "
+            "activity between workers; use a redis:// URL or --workers 1"
+        )
+    if workers > 1 and not config.ACTIVITY_URL:
+        print("⚠️  Per-worker activity streams: a stream only sees writes its own")
+        print("   worker handled; set ACTIVITY_URL=redis://... to relay them.")
+
+    # Workers are spawned and read this at import time. The schema is ready,
+    # so they skip create_all instead of racing each other's DDL
+    os.environ["INIT_DB_ON_STARTUP"] = "0"
+
+    print(f"🚀 Starting FastAPI server with {workers} workers...")
+    uvicorn.run("server:app", **production_options(host, port, workers))
+
+
+def production_options(host: str, port: int, workers: int) -> dict:
+    # uvicorn[standard] brings uvloop and httptools; fall back where missing
+    has_uvloop = importlib.util.find_spec("uvloop") is not None
+    has_httptools = importlib.util.find_spec("httptools") is not None
+    return dict(
+        host=host,
+        port=port,
+        workers=workers,
+        loop="uvloop" if has_uvloop else "auto",
+        http="httptools" if has_httptools else "auto",
+        backlog=config.SERVER_BACKLOG,
+        timeout_keep_alive=config.SERVER_KEEP_ALIVE_SECONDS,
+        limit_concurrency=config.SERVER_LIMIT_CONCURRENCY or None,
+        timeout_graceful_shutdown=config.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        access_log=False,
+        proxy_headers=True,
+    )
+
+
+def main():
+    args = parse_args()
+
+    reset = args.init_db or args.init_data
+
+    # Delete the database file (or drop all tables) if either flag is set
+    if reset and DB_FILE:
+        # WAL mode keeps -wal/-shm files next to the database
+        for path in (DB_FILE, f"{DB_FILE}-wal", f"{DB_FILE}-shm"):
+            if os.path.exists(path):
+                print(f"🗑️  Deleting existing DB file: {path}")
+                os.remove(path)
+        reset = False
+
+    if args.prod:
+        asyncio.run(prepare_db(reset, args.init_data))
+        serve_production(args.host, args.port, args.workers)
+        return
+
+    if reset or args.init_data:
+        asyncio.run(prepare_db(reset, args.init_data))
 
     # Start the FastAPI server
     print("🚀 Starting FastAPI server...")
-    uvicorn.run("server:app", host="0.0.0.0", port=8888, reload=True)
+    uvicorn.run("server:app", host=args.host, port=args.port, reload=True)
 
 
 if __name__ == "__main__":
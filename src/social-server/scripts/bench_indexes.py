@@ -0,0 +1,187 @@
+"""Measure hot lookup latency with and without the model indexes.
+
+Loads ``--rows`` rows into each hot table of a throwaway SQLite file, times the
+service queries against random keys with the indexes dropped, then creates the
+indexes and times them again.
+
+    python -m scripts.bench_indexes --rows 1000000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, insert
+from sqlmodel import SQLModel, select
+
+from server.db.models import (
+    Comment,
+    Follow,
+    Friendship,
+    Post,
+    PostTag,
+    Reaction,
+    UserFeed,
+)
+from server.services.friendship import accepted_friend_ids
+
+BATCH_SIZE = 50_000
+NUM_TAGS = 1_000
+TABLES = [Post, Follow, Friendship, Comment, Reaction, UserFeed, PostTag]
+REACTION_TYPES = ["like", "upvote", "love", "haha", "wow"]
+STATUSES = ["requested", "accepted", "blocked"]
+
+QUERIES = {
+    "get_posts_by_user_id": lambda k: select(Post).where(Post.user_id == k),
+    "get_followers": lambda k: select(Follow).where(Follow.following_id == k),
+    "get_followings": lambda k: select(Follow).where(Follow.follower_id == k),
+    "get_friendships_for_user": lambda k: select(Friendship).where(
+        (Friendship.user_id == k) | (Friendship.friend_id == k)
+    ),
+    "accepted_friend_ids": accepted_friend_ids,
+    "get_comments_for_post": lambda k: select(Comment)
+    .where(Comment.post_id == k)
+    .order_by(Comment.created_at),
+    "get_reactions_for_post": lambda k: select(Reaction).where(Reaction.post_id == k),
+    "get_feeds_for_user": lambda k: select(UserFeed)
+    .where(UserFeed.user_id == k)
+    .order_by(UserFeed.added_at.desc()),
+    "get_post_ids_by_tag": lambda k: select(PostTag.post_id).where(PostTag.tag_id == k),
+}
+
+
+def _rows(model, n, num_users, rng):
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    seen = set()
+    i = 0
+    while i < n:
+        ts = start + timedelta(seconds=i)
+        user = rng.randrange(1, num_users + 1)
+        other = rng.randrange(1, num_users + 1)
+        post = rng.randrange(1, n + 1)
+        # Skip repeats so the unique indexes can be built afterwards
+        unique_key = {
+            Follow: (user, other),
+            Friendship: (min(user, other), max(user, other)),
+            Reaction: (post, user, other % 5),
+            PostTag: (post, other % NUM_TAGS),
+        }.get(model)
+        if unique_key is not None:
+            if unique_key in seen or (model is Friendship and user == other):
+                continue
+            seen.add(unique_key)
+        i += 1
+        if model is Post:
+            yield dict(
+                user_id=user, content_text="x", visibility="public", created_at=ts
+            )
+        elif model is Follow:
+            yield dict(follower_id=user, following_id=other, created_at=ts)
+        elif model is Friendship:
+            yield dict(
+                user_id=min(user, other),
+                friend_id=max(user, other),
+                requester_id=user,
+                status=rng.choice(STATUSES),
+                created_at=ts,
+            )
+        elif model is Comment:
+            yield dict(post_id=post, user_id=user, content_text="x", created_at=ts)
+        elif model is Reaction:
+            yield dict(
+                post_id=post,
+                user_id=user,
+                type=REACTION_TYPES[other % 5],
+                created_at=ts,
+            )
+        elif model is UserFeed:
+            yield dict(
+                user_id=user,
+                post_id=post,
+                added_at=ts,
+                source_type="follow",
+                is_seen=False,
+                visibility="public",
+            )
+        elif model is PostTag:
+            yield dict(post_id=post, tag_id=other % NUM_TAGS + 1)
+
+
+def load(engine, n, num_users, seed):
+    rng = random.Random(seed)
+    for model in TABLES:
+        table = model.__table__
+        started = time.perf_counter()
+        batch = []
+        with engine.begin() as conn:
+            for row in _rows(model, n, num_users, rng):
+                batch.append(row)
+                if len(batch) == BATCH_SIZE:
+                    conn.execute(insert(table), batch)
+                    batch = []
+            if batch:
+                conn.execute(insert(table), batch)
+        print(
+            f"  loaded {n:>9,} {table.name:<12} {time.perf_counter() - started:6.1f}s"
+        )
+
+
+def measure(engine, keys):
+    timings = {}
+    with engine.connect() as conn:
+        for name, build in QUERIES.items():
+            started = time.perf_counter()
+            for key in keys:
+                conn.execute(build(key)).all()
+            timings[name] = (time.perf_counter() - started) / len(keys) * 1000
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    tables = [model.__table__ for model in TABLES]
+    SQLModel.metadata.create_all(engine, tables=tables)
+    with engine.begin() as conn:
+        for table in tables:
+            for index in table.indexes:
+                index.drop(conn)
+
+    print(f"Loading {args.rows:,} rows per table into {path}")
+    load(engine, args.rows, args.users, args.seed)
+
+    rng = random.Random(args.seed)
+    keys = [rng.randrange(1, min(args.users, 100) + 1) for _ in range(args.repeat)]
+
+    print("Timing queries without indexes...")
+    before = measure(engine, keys)
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        for table in tables:
+            for index in table.indexes:
+                index.create(conn)
+    print(f"Created indexes in {time.perf_counter() - started:.1f}s")
+    after = measure(engine, keys)
+
+    print(f"\n{'query':<26}{'no index ms':>12}{'indexed ms':>12}{'speedup':>10}")
+    for name in QUERIES:
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"{name:<26}{before[name]:>12.2f}{after[name]:>12.3f}{speedup:>9.0f}x")
+
+    engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
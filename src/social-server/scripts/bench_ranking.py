@@ -0,0 +1,92 @@
+"""Measure how many feed candidates per second the ranking service scores.
+
+Seeds a throwaway SQLite file with the bulk seeder (``--scale 200`` is a
+10k-user graph), then times ``score()`` alone on in-memory candidate arrays and
+``rank_feeds()`` end to end, including its reads and rank_score writes.
+
+    python -m scripts.bench_ranking --scale 200
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import tempfile
+import time
+
+# The app engine is configured at import time
+os.environ["DATABASE_URL"] = (
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+)
+os.environ.setdefault("DB_PROFILE", "production")
+
+from sqlmodel import select  # noqa: E402
+
+from scripts.init_data import seed_bulk  # noqa: E402
+from server.db.models import Post, UserFeed  # noqa: E402
+from server.db.session import engine, get_session  # noqa: E402
+from server.services.ranking import (  # noqa: E402
+    Candidates,
+    load_affinity,
+    load_labels,
+    rank_feeds,
+    score,
+)
+
+
+async def bench(scale: int, seed: int, repeat: int):
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        await seed_bulk(scale, seed)
+
+    async with get_session() as session:
+        result = await session.exec(
+            select(
+                UserFeed.user_id,
+                UserFeed.post_id,
+                UserFeed.source_type,
+                Post.created_at,
+                Post.comment_count,
+                Post.reaction_count,
+            ).join(Post, Post.id == UserFeed.post_id)
+        )
+        rows = result.all()
+        user_ids = {row.user_id for row in rows}
+        affinity = await load_affinity(session, user_ids)
+        labels = await load_labels(session, select(Post.id))
+    candidates = Candidates.from_rows(rows)
+    now = max(candidates.created_at)
+    print(
+        f"{len(user_ids):,} readers, {len(rows):,} feed candidates, "
+        f"{len(affinity.keys):,} affinity weights, {len(labels.labels):,} post labels"
+    )
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        score(candidates, affinity, labels, now)
+    elapsed = (time.perf_counter() - started) / repeat
+    print(
+        f"score() only      {elapsed * 1000:9.1f} ms  "
+        f"{len(rows) / elapsed:>14,.0f} candidates/s"
+    )
+
+    started = time.perf_counter()
+    scored = await rank_feeds()
+    elapsed = time.perf_counter() - started
+    print(
+        f"rank_feeds()      {elapsed * 1000:9.1f} ms  "
+        f"{scored / elapsed:>14,.0f} candidates/s (reads, scoring and writes)"
+    )
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(bench(args.scale, args.seed, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Compare list request latency with and without the fast JSON response path.
+
+Seeds a throwaway SQLite file with the bulk seeder and tops one reader's feed
+up to ``--limit`` entries. Then requests large ``/posts/`` and feed pages
+in-process, once through ``response_model`` and once with
+``FAST_JSON_RESPONSES`` on, and prints the median latency of each.
+
+    python -m scripts.bench_responses --scale 200 --limit 10000
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import statistics
+import tempfile
+import time
+
+# The app engine and page size cap are configured at import time
+os.environ["DATABASE_URL"] = (
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+)
+os.environ.setdefault("DB_PROFILE", "production")
+os.environ["MAX_PAGE_SIZE"] = "100000"
+
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from sqlalchemy import exists, func, insert, literal  # noqa: E402
+from sqlmodel import select  # noqa: E402
+
+from scripts.init_data import seed_bulk  # noqa: E402
+from server import app  # noqa: E402
+from server.common import config  # noqa: E402
+from server.db.models import Post, UserFeed  # noqa: E402
+from server.db.session import engine, get_session  # noqa: E402
+
+
+async def timed(client: AsyncClient, url: str, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = await client.get(url)
+        timings.append(time.perf_counter() - started)
+        response.raise_for_status()
+    return statistics.median(timings), len(response.json()), len(response.content)
+
+
+async def bench(scale: int, seed: int, limit: int, repeat: int):
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        await seed_bulk(scale, seed)
+
+    async with get_session() as session:
+        result = await session.exec(
+            select(UserFeed.user_id)
+            .group_by(UserFeed.user_id)
+            .order_by(func.count().desc())
+            .limit(1)
+        )
+        reader = result.first()
+        # Seeded feeds hold a few dozen entries; pad one to a full page
+        padding = (
+            select(
+                literal(reader),
+                Post.id,
+                Post.created_at,
+                literal("follow"),
+                literal(False),
+                Post.visibility,
+            )
+            .where(
+                ~exists().where(
+                    (UserFeed.user_id == reader) & (UserFeed.post_id == Post.id)
+                )
+            )
+            .order_by(Post.id.desc())
+            .limit(limit)
+        )
+        await session.exec(
+            insert(UserFeed).from_select(
+                [
+                    "user_id",
+                    "post_id",
+                    "added_at",
+                    "source_type",
+                    "is_seen",
+                    "visibility",
+                ],
+                padding,
+            )
+        )
+        await session.commit()
+
+    urls = [
+        f"/api/v1/posts/?limit={limit}",
+        f"/api/v1/user-feeds/by-user/{reader}?limit={limit}",
+        f"/api/v1/user-feeds/by-user/{reader}/hydrated?limit={limit}",
+    ]
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=config.base_url) as client:
+        for url in urls:
+            results = {}
+            for fast in (False, True):
+                config.FAST_JSON_RESPONSES = fast
+                await client.get(url)  # warm up
+                results[fast] = await timed(client, url, repeat)
+            (slow, rows, size), (quick, _, _) = results[False], results[True]
+            print(
+                f"{url}\n  {rows:,} rows, {size / 1024:,.0f} KiB  "
+                f"response_model {slow * 1000:8.1f} ms  "
+                f"fast {quick * 1000:8.1f} ms  ({slow / quick:.1f}x)"
+            )
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--limit", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(bench(args.scale, args.seed, args.limit, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
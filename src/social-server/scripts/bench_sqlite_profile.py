@@ -0,0 +1,67 @@
+"""Compare write throughput of the "dev" and "production" engine profiles.
+
+Each run creates a fresh SQLite file and has ``--writers`` concurrent tasks
+commit ``--ops`` single-post transactions each, the same shape as
+``create_post``. SQL echo of the dev profile goes to /dev/null but is still
+formatted, so its cost is part of the measurement.
+
+    python -m scripts.bench_sqlite_profile --writers 8 --ops 250
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import tempfile
+import time
+
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from server.db.engine import PROFILES, create_engine
+from server.db.models import Post, User
+
+
+async def run(profile: str, writers: int, ops: int) -> float:
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(
+        f"sqlite+aiosqlite:///{path}",
+        profile=profile,
+        pool_size=writers,
+        max_overflow=0,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with AsyncSession(engine) as session:
+        session.add(User(id=1, username="bench", password_hash="x"))
+        await session.commit()
+
+    async def writer():
+        for _ in range(ops):
+            async with AsyncSession(engine) as session:
+                session.add(Post(user_id=1, content_text="benchmark post"))
+                await session.commit()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(writer() for _ in range(writers)))
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    return writers * ops / elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=250)
+    args = parser.parse_args()
+
+    results = {}
+    for profile in PROFILES:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            results[profile] = await run(profile, args.writers, args.ops)
+        print(f"{profile:<12}{results[profile]:>10.0f} commits/s")
+    print(f"speedup     {results['production'] / results['dev']:>10.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+"""Measure what viewer-aware visibility filtering adds to post and feed reads.
+
+Seeds a throwaway SQLite file with the bulk seeder, picks the reader with the
+most accepted friends, and times ``get_all_posts``, ``get_posts_by_user_id``
+(the reader's most prolific friend) and ``get_feeds_for_user`` with the visibility
+filters in place and skipped, alternating. Prints the median latency of
+each and the overhead of filtering, which should stay under 10%.
+
+    python -m scripts.bench_visibility --scale 200 --limit 50
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import statistics
+import tempfile
+import time
+
+# The app engine is configured at import time
+os.environ["DATABASE_URL"] = (
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+)
+os.environ.setdefault("DB_PROFILE", "production")
+
+from sqlalchemy import func  # noqa: E402
+from sqlmodel import select  # noqa: E402
+
+from scripts.init_data import seed_bulk  # noqa: E402
+from server.db.models import Friendship, Post  # noqa: E402
+from server.db.session import engine, get_session  # noqa: E402
+from server.services import newsfeed, post, visibility  # noqa: E402
+from server.services.friendship import accepted_friend_ids  # noqa: E402
+from server.services.user_feed import get_feeds_for_user  # noqa: E402
+
+
+def unfiltered(statement, *args):
+    return statement
+
+
+def use_filters(filtered: bool):
+    if filtered:
+        post.only_visible = visibility.only_visible
+        newsfeed.only_visible_entries = visibility.only_visible_entries
+    else:
+        post.only_visible = newsfeed.only_visible_entries = unfiltered
+
+
+async def timed(read, repeat: int):
+    """Median latency of ``read`` without and with the filters, alternating
+    between the two so drift in the machine affects both alike."""
+    timings = {False: [], True: []}
+    rows = {}
+    for _ in range(repeat):
+        for filtered in (False, True):
+            use_filters(filtered)
+            started = time.perf_counter()
+            rows[filtered], _ = await read()
+            timings[filtered].append(time.perf_counter() - started)
+    use_filters(True)
+    return (
+        statistics.median(timings[False]),
+        statistics.median(timings[True]),
+        len(rows[True]),
+    )
+
+
+async def bench(scale: int, seed: int, limit: int, repeat: int):
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        await seed_bulk(scale, seed)
+
+    async with get_session() as session:
+        accepted = Friendship.status == "accepted"
+        result = await session.exec(
+            select(Friendship.user_id, func.count())
+            .where(accepted)
+            .group_by(Friendship.user_id)
+            .order_by(func.count().desc())
+            .limit(1)
+        )
+        reader, friends = result.first()
+        result = await session.exec(
+            select(Post.user_id)
+            .where(Post.user_id.in_(accepted_friend_ids(reader)))
+            .group_by(Post.user_id)
+            .order_by(func.count().desc())
+            .limit(1)
+        )
+        friend = result.first()
+    print(f"reader {reader} with {friends} friends, reading friend {friend}\n")
+
+    reads = {
+        "get_all_posts": lambda: post.get_all_posts(None, limit, viewer_id=reader),
+        "get_posts_by_user_id": lambda: post.get_posts_by_user_id(
+            friend, None, limit, viewer_id=reader
+        ),
+        "get_feeds_for_user": lambda: get_feeds_for_user(reader, None, limit),
+    }
+    print(f"{'read':<24}{'rows':>6}{'unfiltered ms':>15}{'filtered ms':>13}  overhead")
+    for name, read in reads.items():
+        await read()  # warm up
+        plain, checked, rows = await timed(read, repeat)
+        print(
+            f"{name:<24}{rows:>6}{plain * 1000:>15.3f}{checked * 1000:>13.3f}"
+            f"  {(checked / plain - 1) * 100:+7.1f}%"
+        )
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(bench(args.scale, args.seed, args.limit, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
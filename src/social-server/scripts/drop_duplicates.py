@@ -0,0 +1,19 @@
+"""Delete rows that repeat the key of a unique index the database lacks yet,
+keeping the lowest id of each, then build the indexes.
+
+Startup leaves such indexes out and logs a warning instead; this is the
+explicit step that removes the duplicates. Run repair_counters afterwards,
+since post counters still include any reactions dropped here.
+
+python -m scripts.drop_duplicates
+"""
+
+import asyncio
+import logging
+
+from server.db.session import init_db
+
+if __name__ == "__main__":
+    # What was dropped is logged at WARNING by server.db.session
+    logging.getLogger("server.db.session").addHandler(logging.StreamHandler())
+    asyncio.run(init_db(drop_duplicates=True))
@@ -0,0 +1,199 @@
+"""Export every table to Parquet for offline analysis.
+
+Each table in ``server/db/models.py`` is written to ``<out>/<table>/`` as
+Parquet files, ``CHUNK_ROWS`` rows per row group, with an Arrow schema built
+from the SQLModel columns. Read a table back with e.g.
+``pyarrow.dataset.dataset("<out>/post")`` or ``pandas.read_parquet``.
+
+    python -m scripts.export_parquet --out exports
+    python -m scripts.export_parquet --out exports --incremental
+
+``--incremental`` appends one new file per table holding only rows after the
+``(time column, id)`` high-water mark of the previous run, kept in
+``<out>/_state.json``. Rows backdated below that mark are not picked up.
+Tables without a time column (tags, categories and their links) are small and
+rewritten in full every run.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import JSON, and_, or_, select
+from sqlmodel import SQLModel
+
+import server.db.models  # noqa: F401  registers every table on the metadata
+from server.db.session import engine
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    raise SystemExit("The Parquet export needs pyarrow: pip install pyarrow")
+
+CHUNK_ROWS = 100_000  # rows fetched and written per Parquet row group
+TIME_COLUMNS = ("created_at", "added_at", "viewed_at")
+STATE_FILE = "_state.json"
+
+
+# By the Python type SQLModel maps each field to; SQLite hands back naive
+# datetimes, which are UTC here. JSON columns are stored as their JSON text.
+ARROW_TYPES = {
+    bool: pa.bool_(),
+    int: pa.int64(),
+    float: pa.float64(),
+    datetime: pa.timestamp("us", tz="UTC"),
+    str: pa.string(),
+}
+
+
+def arrow_type(column) -> pa.DataType:
+    if isinstance(column.type, JSON):
+        return pa.string()
+    # SQLModel's AutoString is a TypeDecorator, its impl knows the Python type
+    column_type = getattr(column.type, "impl_instance", column.type)
+    try:
+        return ARROW_TYPES[column_type.python_type]
+    except (KeyError, NotImplementedError):
+        raise TypeError(f"No Arrow type for {column.table.name}.{column.name}")
+
+
+def arrow_schema(table) -> pa.Schema:
+    return pa.schema(
+        [
+            pa.field(column.name, arrow_type(column), nullable=column.nullable)
+            for column in table.columns
+        ]
+    )
+
+
+def time_column(table):
+    for name in TIME_COLUMNS:
+        if name in table.c and "id" in table.c:
+            return table.c[name]
+    return None
+
+
+def record_batch(table, schema: pa.Schema, rows) -> pa.RecordBatch:
+    columns = list(zip(*rows))
+    arrays = []
+    for index, column in enumerate(table.columns):
+        values = columns[index]
+        if isinstance(column.type, JSON):
+            values = [None if value is None else json.dumps(value) for value in values]
+        arrays.append(pa.array(values, type=schema.field(column.name).type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _load_state(out: str) -> Dict[str, dict]:
+    path = os.path.join(out, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def _save_state(out: str, state: Dict[str, dict]) -> None:
+    path = os.path.join(out, STATE_FILE)
+    with open(f"{path}.tmp", "w") as handle:
+        json.dump(state, handle, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+async def export_table(
+    table, out: str, run: str, mark: Optional[dict]
+) -> Tuple[int, Optional[dict]]:
+    """Write the rows of ``table`` after ``mark`` to one new file.
+
+    Without a ``mark`` the table's earlier files are replaced. Returns the row
+    count and the new high-water mark (``None`` for tables without one).
+    """
+    schema = arrow_schema(table)
+    directory = os.path.join(out, table.name)
+    os.makedirs(directory, exist_ok=True)
+    stamp = time_column(table)
+    if stamp is None or not mark:
+        for name in os.listdir(directory):
+            if name.endswith(".parquet"):
+                os.remove(os.path.join(directory, name))
+
+    statement = select(*table.columns)
+    if stamp is None:
+        statement = statement.order_by(*table.primary_key.columns)
+    else:
+        statement = statement.order_by(stamp, table.c.id)
+        if mark:
+            since = datetime.fromisoformat(mark["time"])
+            statement = statement.where(
+                or_(stamp > since, and_(stamp == since, table.c.id > mark["id"]))
+            )
+
+    path = os.path.join(directory, f"{run}.parquet")
+    writer, rows, last = None, 0, None
+    async with engine.connect() as conn:
+        result = await conn.stream(statement.execution_options(yield_per=CHUNK_ROWS))
+        async for chunk in result.partitions():
+            if writer is None:
+                writer = pq.ParquetWriter(f"{path}.tmp", schema)
+            writer.write_batch(record_batch(table, schema, chunk))
+            rows += len(chunk)
+            last = chunk[-1]
+    if writer is not None:
+        writer.close()
+        os.replace(f"{path}.tmp", path)
+
+    if stamp is None:
+        return rows, None
+    if last is None:
+        return rows, mark
+    last = last._mapping
+    return rows, {"time": _as_utc(last[stamp.name]).isoformat(), "id": last["id"]}
+
+
+async def export_all(
+    out: str, incremental: bool = False, tables=None
+) -> Dict[str, int]:
+    os.makedirs(out, exist_ok=True)
+    state = _load_state(out)
+    run = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    counts = {}
+    for table in SQLModel.metadata.sorted_tables:
+        if tables and table.name not in tables:
+            continue
+        started = time.perf_counter()
+        if not incremental:
+            state.pop(table.name, None)
+        rows, mark = await export_table(table, out, run, state.get(table.name))
+        if mark is not None:
+            state[table.name] = mark
+        counts[table.name] = rows
+        elapsed = time.perf_counter() - started
+        print(f"  {table.name:<20}{rows:>12,} rows {elapsed:8.2f}s")
+        # Saved per table so an interrupted run resumes where it stopped
+        _save_state(out, state)
+    await engine.dispose()
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default="exports", help="output directory")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="append only rows newer than the previous run",
+    )
+    parser.add_argument(
+        "--tables", nargs="*", help="table names to export (default: all)"
+    )
+    args = parser.parse_args()
+    print(f"📦 Exporting to {args.out}...")
+    asyncio.run(export_all(args.out, args.incremental, args.tables))
@@ -1,14 +1,34 @@
+import argparse
 import asyncio
 import random
+import time
+import numpy as np
 from faker import Faker
-from datetime import datetime, timezone
-from server.db.session import init_db
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, insert, select, text
+from server.db.models import (
+    Category,
+    Comment,
+    Follow,
+    Friendship,
+    Post,
+    PostCategory,
+    PostTag,
+    Reaction,
+    Tag,
+    User,
+    UserFeed,
+    UserPostViewHistory,
+)
+from server.db.search import rebuild_search_index
+from server.db.session import engine, get_session, init_db
+from server.services.counters import recompute_counters
 from server.schemas.user import UserCreate
 from server.schemas.post import PostCreate
 from server.schemas.comment import CommentCreate
 from server.schemas.reaction import ReactionCreate
 from server.schemas.follow import FollowCreate
-from server.schemas.friendship import FriendshipCreate
+from server.schemas.friendship import FriendshipCreate, FriendshipUpdate
 from server.schemas.tag import TagCreate
 from server.schemas.post_tag import PostTagCreate
 from server.schemas.category import CategoryCreate
@@ -20,7 +40,7 @@ from server.services.post import create_post
 from server.services.comment import create_comment
 from server.services.reaction import create_reaction
 from server.services.follow import create_follow
-from server.services.friendship import create_friendship
+from server.services.friendship import create_friendship, update_friendship
 from server.services.tag import create_tag
 from server.services.post_tag import add_tag_to_post
 from server.services.category import create_category
@@ -40,6 +60,18 @@ NUM_CATEGORIES = 10
 NUM_VIEW_HISTORY = 700
 NUM_FEED_ENTRIES = 1000
 
+REACTION_TYPES = ["like", "upvote", "love", "haha", "wow"]
+VISIBILITIES = ["public", "friends", "private"]
+FRIENDSHIP_STATUSES = ["requested", "accepted", "blocked"]
+SOURCE_TYPES = ["follow", "friend", "trending", "recommended"]
+
+# Bulk mode: rows per executemany, and the window posts are spread over.
+# Timestamps are anchored to a fixed date so a seed always yields the same rows.
+BULK_BATCH_SIZE = 50_000
+BULK_START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+BULK_SPAN_SECONDS = 90 * 24 * 3600
+TEXT_POOL_SIZE = 1_000
+
 
 async def seed():
     await init_db()
@@ -80,20 +112,26 @@ async def seed():
 
     # Reactions
     print(f"👍 Creating {NUM_REACTIONS} reactions...")
+    reacted = set()
     for _ in range(NUM_REACTIONS):
         reaction = ReactionCreate(
             post_id=random.choice(posts).id,
             user_id=random.choice(users).id,
             type=random.choice(["like", "upvote", "love", "haha", "wow"]),
         )
-        await create_reaction(reaction)
+        key = (reaction.post_id, reaction.user_id, reaction.type)
+        if key not in reacted:
+            reacted.add(key)
+            await create_reaction(reaction)
 
     # Follows
     print(f"🔗 Creating {NUM_FOLLOWS} follows...")
+    followed = set()
     for _ in range(NUM_FOLLOWS):
         follower = random.choice(users)
         following = random.choice(users)
-        if follower.id != following.id:
+        if follower.id != following.id and (follower.id, following.id) not in followed:
+            followed.add((follower.id, following.id))
             await create_follow(
                 FollowCreate(
                     follower_id=follower.id,
@@ -107,13 +145,16 @@ async def seed():
         u1 = random.choice(users)
         u2 = random.choice(users)
         if u1.id != u2.id:
-            await create_friendship(
+            status = random.choice(["requested", "accepted", "blocked"])
+            friendship = await create_friendship(
                 FriendshipCreate(
                     user_id=u1.id,
                     friend_id=u2.id,
-                    status=random.choice(["requested", "accepted", "blocked"]),
+                    status="blocked" if status == "blocked" else "requested",
                 )
             )
+            if friendship and status == "accepted":
+                await update_friendship(friendship.id, FriendshipUpdate(status=status))
 
     # Tags & PostTags
     print(f"🏷️ Creating {NUM_TAGS} tags + tagging posts...")
@@ -162,5 +203,414 @@ async def seed():
     print("✅ Done seeding!")
 
 
+def _timestamps(seconds):
+    return [BULK_START + timedelta(seconds=s) for s in seconds.tolist()]
+
+
+def _unique(*columns):
+    """Drop repeated rows across ``columns``, keeping first occurrences in order."""
+    _, first = np.unique(np.stack(columns, axis=1), axis=0, return_index=True)
+    first.sort()
+    return [column[first] for column in columns]
+
+
+def _owner_chunks(num_owners, num_rows):
+    """Split owner ids ``0..num_owners`` into ranges holding ~BULK_BATCH_SIZE rows.
+
+    Rows are spread evenly over owners, and each range yields
+    ``(lo, hi, rows)``. Unique keys that lead with the owner (follower, post,
+    ...) can then be de-duplicated one chunk at a time.
+    """
+    per_chunk = max(1, num_owners * BULK_BATCH_SIZE // max(num_rows, 1))
+    for lo in range(0, num_owners, per_chunk):
+        hi = min(lo + per_chunk, num_owners)
+        yield lo, hi, num_rows * hi // num_owners - num_rows * lo // num_owners
+
+
+class BulkSeeder:
+    """Generate ``scale`` times the default dataset with NumPy, in batches.
+
+    Row ids are assigned here, after any rows already in the tables, so rows
+    can reference each other without reading ids back from the database.
+    """
+
+    def __init__(self, scale: int, seed: int):
+        self.rng = np.random.default_rng(seed)
+        Faker.seed(seed)
+        self.num_users = NUM_USERS * scale
+        self.num_posts = NUM_POSTS * scale
+        self.num_tags = NUM_TAGS * scale
+        self.num_categories = NUM_CATEGORIES * scale
+        self.counts = {
+            Comment: NUM_COMMENTS * scale,
+            Reaction: NUM_REACTIONS * scale,
+            Follow: NUM_FOLLOWS * scale,
+            Friendship: NUM_FRIENDSHIPS * scale,
+            UserFeed: NUM_FEED_ENTRIES * scale,
+            UserPostViewHistory: NUM_VIEW_HISTORY * scale,
+        }
+        self.words = [fake.word() for _ in range(TEXT_POOL_SIZE)]
+        self.names = [fake.user_name() for _ in range(TEXT_POOL_SIZE)]
+        self.sentences = [fake.sentence() for _ in range(TEXT_POOL_SIZE)]
+        self.paragraphs = [fake.paragraph() for _ in range(TEXT_POOL_SIZE)]
+        self.image_urls = [fake.image_url() for _ in range(TEXT_POOL_SIZE)]
+        self.base = {}
+
+    def _pick(self, pool, n):
+        return [pool[i] for i in self.rng.integers(0, len(pool), n).tolist()]
+
+    def _ids(self, model, lo, hi):
+        return range(self.base[model] + 1 + lo, self.base[model] + 1 + hi)
+
+    def users(self):
+        for lo, hi, n in _owner_chunks(self.num_users, self.num_users):
+            ids = self._ids(User, lo, hi)
+            seconds = self.rng.integers(0, BULK_SPAN_SECONDS, n)
+            yield [
+                dict(
+                    id=i,
+                    username=f"{name}{i}",
+                    password_hash="test123",
+                    bio=bio,
+                    created_at=created_at,
+                )
+                for i, name, bio, created_at in zip(
+                    ids,
+                    self._pick(self.names, n),
+                    self._pick(self.sentences, n),
+                    _timestamps(seconds),
+                )
+            ]
+
+    def posts(self):
+        # Post ids follow created_at, and later rows reuse these arrays
+        self.post_seconds = np.sort(
+            self.rng.integers(0, BULK_SPAN_SECONDS, self.num_posts)
+        )
+        self.post_visibility = self.rng.integers(0, 3, self.num_posts)
+        user_base = self.base[User] + 1
+        for lo, hi, n in _owner_chunks(self.num_posts, self.num_posts):
+            users = self.rng.integers(0, self.num_users, n) + user_base
+            has_image = self.rng.random(n) < 0.3
+            yield [
+                dict(
+                    id=i,
+                    user_id=user,
+                    content_text=content,
+                    image_url=image if flag else None,
+                    visibility=VISIBILITIES[visibility],
+                    created_at=created_at,
+                    followers_fanned_out=True,
+                    # Filled in by recompute_counters once comments and
+                    # reactions are loaded
+                    comment_count=0,
+                    reaction_count=0,
+                    reaction_counts={},
+                )
+                for i, user, content, image, flag, visibility, created_at in zip(
+                    self._ids(Post, lo, hi),
+                    users.tolist(),
+                    self._pick(self.paragraphs, n),
+                    self._pick(self.image_urls, n),
+                    has_image.tolist(),
+                    self.post_visibility[lo:hi].tolist(),
+                    _timestamps(self.post_seconds[lo:hi]),
+                )
+            ]
+
+    def _named(self, model, count, extra=None):
+        names = [
+            self.words[i % TEXT_POOL_SIZE]
+            + (f"-{i // TEXT_POOL_SIZE}" if i >= TEXT_POOL_SIZE else "")
+            for i in range(count)
+        ]
+        for lo in range(0, count, BULK_BATCH_SIZE):
+            hi = min(lo + BULK_BATCH_SIZE, count)
+            ids = self._ids(model, lo, hi)
+            yield [
+                dict(id=i, name=name, **(extra(i) if extra else {}))
+                for i, name in zip(ids, names[lo:hi])
+            ]
+
+    def tags(self):
+        return self._named(Tag, self.num_tags)
+
+    def categories(self):
+        return self._named(
+            Category,
+            self.num_categories,
+            lambda i: {"description": self.sentences[i % TEXT_POOL_SIZE]},
+        )
+
+    def _post_links(self, model, column, max_per_post, num_targets):
+        target_base = self.base[Tag if model is PostTag else Category] + 1
+        post_base = self.base[Post] + 1
+        for lo, hi, _ in _owner_chunks(
+            self.num_posts, self.num_posts * max_per_post // 2
+        ):
+            per_post = self.rng.integers(0, max_per_post + 1, hi - lo)
+            posts = np.repeat(np.arange(lo, hi), per_post)
+            targets = self.rng.integers(0, num_targets, len(posts))
+            posts, targets = _unique(posts, targets)
+            yield [
+                {"post_id": post, column: target}
+                for post, target in zip(
+                    (posts + post_base).tolist(), (targets + target_base).tolist()
+                )
+            ]
+
+    def post_tags(self):
+        return self._post_links(PostTag, "tag_id", 3, self.num_tags)
+
+    def post_categories(self):
+        return self._post_links(PostCategory, "category_id", 2, self.num_categories)
+
+    def _per_owner(
+        self, model, num_owners, other_count, unique, distinct=False, ordered=False
+    ):
+        """Yield ``(ids, owners, others)`` batches of random owner/other index pairs.
+
+        ``unique`` drops repeated pairs, ``distinct`` pairs of an owner with itself.
+        ``ordered`` keeps only pairs with the owner below the other, one per
+        unordered pair; twice as many are drawn, as about half are dropped.
+        """
+        next_id = self.base[model] + 1
+        for lo, hi, n in _owner_chunks(num_owners, self.counts[model]):
+            n = 2 * n if ordered else n
+            owners = self.rng.integers(lo, hi, n)
+            others = self.rng.integers(0, other_count, n)
+            if distinct or ordered:
+                keep = owners < others if ordered else owners != others
+                owners, others = owners[keep], others[keep]
+            if unique:
+                owners, others = _unique(owners, others)
+            yield range(next_id, next_id + len(owners)), owners, others
+            next_id += len(owners)
+
+    def _after_post(self, posts, max_delay):
+        return self.post_seconds[posts] + self.rng.integers(0, max_delay, len(posts))
+
+    def comments(self):
+        user_base, post_base = self.base[User] + 1, self.base[Post] + 1
+        for ids, posts, users in self._per_owner(
+            Comment, self.num_posts, self.num_users, unique=False
+        ):
+            yield [
+                dict(
+                    id=i,
+                    post_id=post,
+                    user_id=user,
+                    content_text=content,
+                    created_at=created_at,
+                )
+                for i, post, user, content, created_at in zip(
+                    ids,
+                    (posts + post_base).tolist(),
+                    (users + user_base).tolist(),
+                    self._pick(self.sentences, len(ids)),
+                    _timestamps(self._after_post(posts, 3 * 24 * 3600)),
+                )
+            ]
+
+    def reactions(self):
+        user_base, post_base = self.base[User] + 1, self.base[Post] + 1
+        num_types = len(REACTION_TYPES)
+        # Fold the type into the "other" key so (post, user, type) is unique
+        for ids, posts, keys in self._per_owner(
+            Reaction, self.num_posts, self.num_users * num_types, unique=True
+        ):
+            yield [
+                dict(
+                    id=i,
+                    post_id=post,
+                    user_id=key // num_types + user_base,
+                    type=REACTION_TYPES[key % num_types],
+                    created_at=created_at,
+                )
+                for i, post, key, created_at in zip(
+                    ids,
+                    (posts + post_base).tolist(),
+                    keys.tolist(),
+                    _timestamps(self._after_post(posts, 24 * 3600)),
+                )
+            ]
+
+    def _user_pairs(self, model, build, ordered=False):
+        user_base = self.base[User] + 1
+        for ids, users, others in self._per_owner(
+            model,
+            self.num_users,
+            self.num_users,
+            unique=True,
+            distinct=True,
+            ordered=ordered,
+        ):
+            seconds = self.rng.integers(0, BULK_SPAN_SECONDS, len(ids))
+            yield [
+                build(i, user, other, created_at)
+                for i, user, other, created_at in zip(
+                    ids,
+                    (users + user_base).tolist(),
+                    (others + user_base).tolist(),
+                    _timestamps(seconds),
+                )
+            ]
+
+    def follows(self):
+        return self._user_pairs(
+            Follow,
+            lambda i, user, other, created_at: dict(
+                id=i, follower_id=user, following_id=other, created_at=created_at
+            ),
+        )
+
+    def friendships(self):
+        # Ordered pairs are drawn twice over, see _per_owner
+        n = 2 * self.counts[Friendship]
+        statuses = iter(self.rng.integers(0, len(FRIENDSHIP_STATUSES), n).tolist())
+        flips = iter(self.rng.integers(0, 2, n).tolist())
+        return self._user_pairs(
+            Friendship,
+            lambda i, user, other, created_at: dict(
+                id=i,
+                user_id=user,
+                friend_id=other,
+                requester_id=other if next(flips) else user,
+                status=FRIENDSHIP_STATUSES[next(statuses)],
+                created_at=created_at,
+            ),
+            ordered=True,
+        )
+
+    def feed_entries(self):
+        user_base, post_base = self.base[User] + 1, self.base[Post] + 1
+        for ids, users, posts in self._per_owner(
+            UserFeed, self.num_users, self.num_posts, unique=True
+        ):
+            n = len(ids)
+            yield [
+                dict(
+                    id=i,
+                    user_id=user,
+                    post_id=post,
+                    added_at=added_at,
+                    rank_score=score,
+                    source_type=SOURCE_TYPES[source],
+                    is_seen=seen,
+                    visibility=VISIBILITIES[visibility],
+                )
+                for i, user, post, added_at, score, source, seen, visibility in zip(
+                    ids,
+                    (users + user_base).tolist(),
+                    (posts + post_base).tolist(),
+                    _timestamps(self.post_seconds[posts]),
+                    self.rng.random(n).tolist(),
+                    self.rng.integers(0, len(SOURCE_TYPES), n).tolist(),
+                    (self.rng.random(n) < 0.5).tolist(),
+                    self.post_visibility[posts].tolist(),
+                )
+            ]
+
+    def view_history(self):
+        user_base, post_base = self.base[User] + 1, self.base[Post] + 1
+        for ids, users, posts in self._per_owner(
+            UserPostViewHistory, self.num_users, self.num_posts, unique=False
+        ):
+            yield [
+                dict(id=i, user_id=user, post_id=post, viewed_at=viewed_at)
+                for i, user, post, viewed_at in zip(
+                    ids,
+                    (users + user_base).tolist(),
+                    (posts + post_base).tolist(),
+                    _timestamps(self._after_post(posts, 7 * 24 * 3600)),
+                )
+            ]
+
+    def tables(self):
+        # Parents before children, so foreign keys hold on PostgreSQL
+        return [
+            (User, self.users),
+            (Post, self.posts),
+            (Tag, self.tags),
+            (Category, self.categories),
+            (PostTag, self.post_tags),
+            (PostCategory, self.post_categories),
+            (Comment, self.comments),
+            (Reaction, self.reactions),
+            (Follow, self.follows),
+            (Friendship, self.friendships),
+            (UserFeed, self.feed_entries),
+            (UserPostViewHistory, self.view_history),
+        ]
+
+
+async def seed_bulk(scale: int = 1, seed_value: int = 42):
+    """Seed ``scale`` times the default dataset with batched core inserts.
+
+    Each table is loaded in one transaction, ``BULK_BATCH_SIZE`` rows per
+    executemany. The same ``seed_value`` always produces the same rows.
+    """
+    await init_db()
+    seeder = BulkSeeder(scale, seed_value)
+    print(f"🔥 Bulk seeding DB at scale {scale} (seed {seed_value})...")
+
+    async with engine.connect() as conn:
+        for model, _ in seeder.tables():
+            if "id" in model.__table__.c:
+                seeder.base[model] = await conn.scalar(
+                    select(func.coalesce(func.max(model.__table__.c.id), 0))
+                )
+
+    total_rows, total_started = 0, time.perf_counter()
+    for model, generate in seeder.tables():
+        table = model.__table__
+        rows, started = 0, time.perf_counter()
+        async with engine.begin() as conn:
+            for batch in generate():
+                if batch:
+                    await conn.execute(insert(table), batch)
+                    rows += len(batch)
+            # Ids were given explicitly, so move the sequence past them
+            if conn.dialect.name == "postgresql" and "id" in table.c:
+                await conn.execute(
+                    text(
+                        "SELECT setval(pg_get_serial_sequence(:table, 'id'), "
+                        f'(SELECT coalesce(max(id), 0) + 1 FROM "{table.name}"), false)'
+                    ),
+                    {"table": f'"{table.name}"'},
+                )
+        elapsed = time.perf_counter() - started
+        total_rows += rows
+        print(
+            f"  {table.name:<20}{rows:>12,} rows {elapsed:8.2f}s "
+            f"{rows / elapsed if elapsed else 0:>12,.0f} rows/s"
+        )
+
+    started = time.perf_counter()
+    async with get_session() as session:
+        await recompute_counters(session)
+        await session.commit()
+    print(f"  post counters recomputed in {time.perf_counter() - started:.2f}s")
+
+    started = time.perf_counter()
+    async with engine.begin() as conn:
+        await conn.run_sync(rebuild_search_index)
+    print(f"  search index rebuilt in {time.perf_counter() - started:.2f}s")
+
+    elapsed = time.perf_counter() - total_started
+    print(f"✅ Seeded {total_rows:,} rows in {elapsed:.1f}s")
+
+
 if __name__ == "__main__":
-    asyncio.run(seed())
+    parser = argparse.ArgumentParser(description="Seed the database with test data")
+    parser.add_argument(
+        "--scale",
+        type=int,
+        help="bulk mode: seed this many times the default row counts",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="bulk mode RNG seed")
+    args = parser.parse_args()
+    if args.scale:
+        asyncio.run(seed_bulk(args.scale, args.seed))
+    else:
+        asyncio.run(seed())
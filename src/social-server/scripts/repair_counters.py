@@ -0,0 +1,28 @@
+"""Recompute the engagement counters on Post from Comment and Reaction rows,
+and the unread notification counts on User from Notification rows.
+
+python -m scripts.repair_counters
+"""
+
+import asyncio
+import time
+
+from server.db.session import get_session
+from server.services.counters import recompute_counters
+from server.services.notification import recompute_unread_counts
+
+
+async def repair():
+    started = time.perf_counter()
+    async with get_session() as session:
+        updated = await recompute_counters(session)
+        users = await recompute_unread_counts(session)
+        await session.commit()
+    print(
+        f"Recomputed counters for {updated:,} posts and {users:,} users "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(repair())
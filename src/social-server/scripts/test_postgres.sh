@@ -0,0 +1,17 @@
+#!/usr/bin/env bash
+# Run the test suite against a throwaway PostgreSQL cluster started from the
+# local postgres binaries (initdb, pg_ctl, createdb on PATH); no container.
+# Extra arguments are passed to pytest.
+set -euo pipefail
+
+PGPORT="${PGPORT:-55432}"
+PGDATA="$(mktemp -d)"
+
+initdb -D "$PGDATA" -U postgres -A trust >/dev/null
+pg_ctl -D "$PGDATA" -o "-p $PGPORT -k $PGDATA -c fsync=off" -l "$PGDATA/server.log" -w start >/dev/null
+trap 'pg_ctl -D "$PGDATA" -m immediate stop >/dev/null; rm -rf "$PGDATA"' EXIT
+
+createdb -h localhost -p "$PGPORT" -U postgres social_test
+
+DATABASE_URL="postgresql+asyncpg://postgres@localhost:$PGPORT/social_test" \
+    coverage run -m pytest "$@"
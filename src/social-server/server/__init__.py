@@ -1,5 +1,7 @@
-from fastapi import FastAPI
-from contextlib import asynccontextmanager
+import asyncio
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager, suppress
 from server.api.v1 import (
     user,
     post,
@@ -10,16 +12,52 @@ from server.api.v1 import (
     follow,
     comment,
     reaction,
+    trending,
+    cache,
+    export,
+    graph,
+    search,
+    notification,
+    activity,
 )
-from server.db.session import init_db
+from server.common import config
+from server.common.pagination import InvalidCursorError
+from server.common.process_lock import try_lock
+from server.db.session import engine, init_db
+from server.services.activity import hub as activity_hub
+from server.services.events import event_log
+from server.services.trending import run_trending_job
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup logic
-    await init_db()
+    if config.INIT_DB_ON_STARTUP:
+        await init_db()
+    trending_job = job_lock = None
+    if config.TRENDING_INTERVAL_SECONDS > 0:
+        # With several workers only the one holding the lock runs the job;
+        # the others serve its lists through CACHE_URL
+        job_lock = try_lock("trending")
+        if job_lock:
+            trending_job = asyncio.create_task(run_trending_job())
+    event_log.start()
+    await activity_hub.start()
     yield
-    # Shutdown logic (if needed)
+    # Shutdown logic
+    if trending_job:
+        trending_job.cancel()
+        with suppress(asyncio.CancelledError):
+            await trending_job
+    if job_lock:
+        job_lock.close()
+    # Open streams would otherwise hold up the graceful shutdown
+    await activity_hub.stop()
+    # Queued views and notifications are written before the pool closes
+    await event_log.stop()
+    # Return pooled connections so SQLite can checkpoint its WAL on close and
+    # PostgreSQL sees a clean disconnect instead of a dropped socket
+    await engine.dispose()
 
 
 app = FastAPI(
@@ -28,6 +66,12 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+
 app.include_router(user.router, prefix="/api/v1")
 app.include_router(follow.router, prefix="/api/v1")
 app.include_router(friendship.router, prefix="/api/v1")
@@ -37,3 +81,10 @@ app.include_router(tag.router, prefix="/api/v1")
 app.include_router(category.router, prefix="/api/v1")
 app.include_router(comment.router, prefix="/api/v1")
 app.include_router(reaction.router, prefix="/api/v1")
+app.include_router(trending.router, prefix="/api/v1")
+app.include_router(cache.router, prefix="/api/v1")
+app.include_router(export.router, prefix="/api/v1")
+app.include_router(graph.router, prefix="/api/v1")
+app.include_router(search.router, prefix="/api/v1")
+app.include_router(notification.router, prefix="/api/v1")
+app.include_router(activity.router, prefix="/api/v1")
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Literal
+from server.services.activity import Topics, hub, stream_events
+
+router = APIRouter(prefix="/activity", tags=["Activity"])
+
+ActivityType = Literal["post", "comment", "reaction", "follow"]
+
+
+@router.get("/stream")
+async def stream(
+    type: List[ActivityType] = Query([]),
+    user_id: List[int] = Query([]),
+    tag_id: List[int] = Query([]),
+    category_id: List[int] = Query([]),
+):
+    """Server-sent events for new posts, comments, reactions and follows.
+
+    Repeat a filter to accept any of its values; different filters must all
+    match. Only activity on public posts is sent.
+    """
+    subscriber = hub.subscribe(Topics(type, user_id, tag_id, category_id))
+    if subscriber is None:
+        raise HTTPException(status_code=503, detail="Too many activity streams")
+    return StreamingResponse(
+        stream_events(subscriber),
+        media_type="text/event-stream",
+        # Proxies must pass events through as they come
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
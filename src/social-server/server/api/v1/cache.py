@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from typing import Dict
+from server.schemas.cache import CacheStats
+from server.services.cache import cache_stats
+
+router = APIRouter(prefix="/cache", tags=["Cache"])
+
+
+@router.get("/stats", response_model=Dict[str, CacheStats])
+async def get_cache_stats():
+    return cache_stats()
@@ -1,7 +1,15 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, Body, HTTPException, Response, status
+from typing import Any, List, Optional
+from server.common import config
+from server.common.pagination import set_next_cursor
+from server.schemas.bulk import BulkCreateResult
 from server.schemas.comment import CommentCreate, CommentRead
-from server.services.comment import create_comment, get_comments_for_post
+from server.services.comment import (
+    create_comment,
+    create_comments_bulk,
+    delete_comment,
+    get_comments_for_post,
+)
 
 router = APIRouter(prefix="/comments", tags=["Comments"])
 
@@ -11,9 +19,27 @@ async def create(comment: CommentCreate):
     return await create_comment(comment)
 
 
+@router.post("/bulk", response_model=BulkCreateResult)
+async def create_bulk(items: List[Any] = Body(..., max_length=config.MAX_BULK_ITEMS)):
+    return await create_comments_bulk(items)
+
+
 @router.get("/post/{post_id}", response_model=List[CommentRead])
-async def get_post_comments(post_id: int):
-    comments = await get_comments_for_post(post_id)
+async def get_post_comments(
+    post_id: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+):
+    comments, next_cursor = await get_comments_for_post(post_id, cursor, limit)
     if comments is None:
         raise HTTPException(status_code=404, detail="No comments found for this post")
+    set_next_cursor(response, next_cursor)
     return comments
+
+
+@router.delete("/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete(comment_id: int):
+    deleted = await delete_comment(comment_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Comment not found")
@@ -0,0 +1,25 @@
+from datetime import datetime
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from server.schemas.export import ExportTable
+from server.services.export import EXPORTS, export_query, stream_ndjson
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+
+@router.get("/{table}")
+async def export_table(
+    table: ExportTable,
+    since: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+):
+    """Stream every row of ``table`` as NDJSON, in id order.
+
+    ``since`` keeps rows created at or after it; ``after_id`` resumes after the
+    last id of a previous export.
+    """
+    statement = export_query(EXPORTS[table], since, after_id)
+    return StreamingResponse(
+        stream_ndjson(statement), media_type="application/x-ndjson"
+    )
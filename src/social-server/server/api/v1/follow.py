@@ -14,7 +14,10 @@ router = APIRouter(prefix="/follows", tags=["Follows"])
 
 @router.post("/", response_model=FollowRead)
 async def create(follow: FollowCreate):
-    return await create_follow(follow)
+    created = await create_follow(follow)
+    if not created:
+        raise HTTPException(status_code=409, detail="Already following this user")
+    return created
 
 
 @router.get("/{follow_id}", response_model=FollowRead)
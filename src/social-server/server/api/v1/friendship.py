@@ -2,7 +2,10 @@ from fastapi import APIRouter, HTTPException, status
 from typing import List
 from server.schemas.friendship import FriendshipCreate, FriendshipRead, FriendshipUpdate
 from server.services.friendship import (
+    FriendshipTransitionError,
     create_friendship,
+    get_friend_ids,
+    get_friendship_between,
     get_friendship_by_id,
     get_friendships_for_user,
     update_friendship,
@@ -14,7 +17,12 @@ router = APIRouter(prefix="/friendships", tags=["Friendships"])
 
 @router.post("/", response_model=FriendshipRead)
 async def create(friendship: FriendshipCreate):
-    return await create_friendship(friendship)
+    created = await create_friendship(friendship)
+    if not created:
+        raise HTTPException(
+            status_code=409, detail="These users already have a friendship"
+        )
+    return created
 
 
 @router.get("/{friendship_id}", response_model=FriendshipRead)
@@ -25,14 +33,30 @@ async def get_one(friendship_id: int):
     return friendship
 
 
+@router.get("/between/{user_id}/{other_id}", response_model=FriendshipRead)
+async def get_between(user_id: int, other_id: int):
+    friendship = await get_friendship_between(user_id, other_id)
+    if not friendship:
+        raise HTTPException(status_code=404, detail="Friendship not found")
+    return friendship
+
+
 @router.get("/by-user/{user_id}", response_model=List[FriendshipRead])
 async def get_by_user(user_id: int):
     return await get_friendships_for_user(user_id)
 
 
+@router.get("/by-user/{user_id}/friends", response_model=List[int])
+async def get_friends(user_id: int):
+    return await get_friend_ids(user_id)
+
+
 @router.put("/{friendship_id}", response_model=FriendshipRead)
 async def update(friendship_id: int, data: FriendshipUpdate):
-    updated = await update_friendship(friendship_id, data)
+    try:
+        updated = await update_friendship(friendship_id, data)
+    except FriendshipTransitionError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
     if not updated:
         raise HTTPException(status_code=404, detail="Friendship not found")
     return updated
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import List
+from server.common import config
+from server.schemas.graph import (
+    FollowCheck,
+    FriendSuggestion,
+    GraphCounts,
+    MutualFriends,
+)
+from server.services.graph import (
+    get_counts,
+    get_friend_suggestions,
+    get_mutual_friends,
+    is_following,
+)
+
+router = APIRouter(prefix="/graph", tags=["Graph"])
+
+
+@router.get("/users/{user_id}/counts", response_model=GraphCounts)
+async def counts(user_id: int):
+    return await get_counts(user_id)
+
+
+@router.get("/users/{user_id}/is-following", response_model=List[FollowCheck])
+async def check_following(user_id: int, user_ids: List[int] = Query(...)):
+    if len(user_ids) > config.MAX_PAGE_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {config.MAX_PAGE_SIZE} user_ids per request",
+        )
+    checks = await is_following(user_id, user_ids)
+    return [
+        FollowCheck(user_id=target, following=following)
+        for target, following in checks.items()
+    ]
+
+
+@router.get("/users/{user_id}/mutual-friends/{other_id}", response_model=MutualFriends)
+async def mutual_friends(user_id: int, other_id: int):
+    user_ids = await get_mutual_friends(user_id, other_id)
+    return MutualFriends(count=len(user_ids), user_ids=user_ids)
+
+
+@router.get("/users/{user_id}/suggestions", response_model=List[FriendSuggestion])
+async def suggestions(user_id: int, limit: int = 20):
+    limit = max(1, min(limit, config.MAX_PAGE_SIZE))
+    return [
+        FriendSuggestion(user_id=candidate, mutual_friends=shared)
+        for candidate, shared in await get_friend_suggestions(user_id, limit)
+    ]
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, HTTPException, Response
+from typing import List, Optional
+from server.common.pagination import set_next_cursor
+from server.schemas.notification import (
+    MarkRead,
+    MarkReadResult,
+    NotificationRead,
+    UnreadCount,
+)
+from server.services.notification import (
+    get_notifications_for_user,
+    get_unread_count,
+    mark_read,
+)
+
+router = APIRouter(prefix="/notifications", tags=["Notifications"])
+
+
+@router.get("/by-user/{user_id}", response_model=List[NotificationRead])
+async def get_user_notifications(
+    user_id: int,
+    response: Response,
+    unread_only: bool = False,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+):
+    notifications, next_cursor = await get_notifications_for_user(
+        user_id, unread_only, cursor, limit
+    )
+    set_next_cursor(response, next_cursor)
+    return notifications
+
+
+@router.get("/by-user/{user_id}/unread-count", response_model=UnreadCount)
+async def unread_count(user_id: int):
+    unread = await get_unread_count(user_id)
+    if unread is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return UnreadCount(user_id=user_id, unread=unread)
+
+
+@router.post("/by-user/{user_id}/mark-read", response_model=MarkReadResult)
+async def mark_user_notifications_read(user_id: int, body: MarkRead):
+    marked = await mark_read(user_id, body.ids)
+    unread = await get_unread_count(user_id)
+    if unread is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return MarkReadResult(marked=marked, unread=unread)
@@ -1,8 +1,14 @@
-from typing import List
-from fastapi import APIRouter, HTTPException, status
+from typing import Any, List, Optional
+from fastapi import APIRouter, Body, HTTPException, Request, Response, status
+from server.common import config, fast_json
+from server.common.http_cache import make_etag, not_modified
+from server.common.pagination import set_next_cursor
+from server.schemas.bulk import BulkCreateResult
 from server.schemas.post import PostCreate, PostRead, PostUpdate
+from server.services.events import record_view
 from server.services.post import (
     create_post,
+    create_posts_bulk,
     get_all_posts,
     get_post_by_id,
     update_post,
@@ -18,17 +24,46 @@ async def create(post: PostCreate):
     return await create_post(post)
 
 
+@router.post("/bulk", response_model=BulkCreateResult)
+async def create_bulk(items: List[Any] = Body(..., max_length=config.MAX_BULK_ITEMS)):
+    return await create_posts_bulk(items)
+
+
 @router.get("/", response_model=list[PostRead])
-async def get_all():
-    return await get_all_posts()
+async def get_all(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    viewer_id: Optional[int] = None,
+):
+    fast = fast_json.enabled()
+    posts, next_cursor = await get_all_posts(
+        cursor, limit, as_rows=fast, viewer_id=viewer_id
+    )
+    set_next_cursor(response, next_cursor)
+    return fast_json.rows_response(posts, PostRead, response) if fast else posts
 
 
 @router.get("/{post_id}", response_model=PostRead)
-async def get_one(post_id: int):
+async def get_one(
+    post_id: int,
+    request: Request,
+    response: Response,
+    viewer_id: Optional[int] = None,
+):
     post = await get_post_by_id(post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
-    return post
+    if viewer_id is not None:
+        await record_view(viewer_id, post_id)
+    # Counters change without touching updated_at
+    etag = make_etag(
+        post.id,
+        post.updated_at,
+        post.comment_count,
+        sorted(post.reaction_counts.items()),
+    )
+    return not_modified(request, response, etag) or post
 
 
 @router.put("/{post_id}", response_model=PostRead)
@@ -47,5 +82,16 @@ async def delete(post_id: int):
 
 
 @router.get("/by-user/{user_id}", response_model=List[PostRead])
-async def get_posts_by_user(user_id: int):
-    return await get_posts_by_user_id(user_id)
+async def get_posts_by_user(
+    user_id: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    viewer_id: Optional[int] = None,
+):
+    fast = fast_json.enabled()
+    posts, next_cursor = await get_posts_by_user_id(
+        user_id, cursor, limit, as_rows=fast, viewer_id=viewer_id
+    )
+    set_next_cursor(response, next_cursor)
+    return fast_json.rows_response(posts, PostRead, response) if fast else posts
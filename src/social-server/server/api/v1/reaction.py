@@ -1,19 +1,48 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, Body, HTTPException, Response, status
+from typing import Any, List, Optional
+from server.common import config
+from server.common.pagination import set_next_cursor
+from server.schemas.bulk import BulkCreateResult
 from server.schemas.reaction import ReactionCreate, ReactionRead
-from server.services.reaction import create_reaction, get_reactions_for_post
+from server.services.reaction import (
+    create_reaction,
+    create_reactions_bulk,
+    delete_reaction,
+    get_reactions_for_post,
+)
 
 router = APIRouter(prefix="/reactions", tags=["Reactions"])
 
 
 @router.post("/", response_model=ReactionRead)
 async def react(data: ReactionCreate):
-    return await create_reaction(data)
+    created = await create_reaction(data)
+    if not created:
+        raise HTTPException(status_code=409, detail="Reaction already exists")
+    return created
+
+
+@router.post("/bulk", response_model=BulkCreateResult)
+async def create_bulk(items: List[Any] = Body(..., max_length=config.MAX_BULK_ITEMS)):
+    return await create_reactions_bulk(items)
 
 
 @router.get("/post/{post_id}", response_model=List[ReactionRead])
-async def get_post_reactions(post_id: int):
-    reactions = await get_reactions_for_post(post_id)
+async def get_post_reactions(
+    post_id: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+):
+    reactions, next_cursor = await get_reactions_for_post(post_id, cursor, limit)
     if not reactions:
         raise HTTPException(status_code=404, detail="No reactions found for this post")
+    set_next_cursor(response, next_cursor)
     return reactions
+
+
+@router.delete("/{reaction_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete(reaction_id: int):
+    deleted = await delete_reaction(reaction_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Reaction not found")
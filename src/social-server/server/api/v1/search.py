@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Query, Response
+from typing import List, Optional
+from server.common.pagination import set_next_cursor
+from server.schemas.search import SearchHit, SearchKind
+from server.services.search import search
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get("/", response_model=List[SearchHit])
+async def search_content(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=500),
+    kind: Optional[SearchKind] = None,
+    tag_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    viewer_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+):
+    hits, next_cursor = await search(
+        q, kind, tag_id, category_id, viewer_id, cursor, limit
+    )
+    set_next_cursor(response, next_cursor)
+    return hits
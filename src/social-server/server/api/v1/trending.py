@@ -0,0 +1,31 @@
+from fastapi import APIRouter, HTTPException
+from typing import List, Optional
+from server.common import config
+from server.schemas.trending import TrendingPost
+from server.services.ranking import category_label, tag_label
+from server.services.trending import top_posts
+
+router = APIRouter(prefix="/trending", tags=["Trending"])
+
+
+@router.get("/", response_model=List[TrendingPost])
+async def get_trending(
+    tag_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    limit: Optional[int] = None,
+):
+    if tag_id is not None and category_id is not None:
+        raise HTTPException(
+            status_code=400, detail="Filter by tag_id or category_id, not both"
+        )
+    label = None
+    if tag_id is not None:
+        label = tag_label(tag_id)
+    elif category_id is not None:
+        label = category_label(category_id)
+    if limit:
+        limit = min(limit, config.MAX_PAGE_SIZE)
+    return [
+        TrendingPost(post_id=post_id, score=score)
+        for post_id, score in await top_posts(limit, label)
+    ]
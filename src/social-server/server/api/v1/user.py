@@ -1,9 +1,13 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from typing import List, Optional
+from server.common import fast_json
+from server.common.http_cache import make_etag, not_modified
+from server.common.pagination import set_next_cursor
 from server.schemas.user import UserCreate, UserRead, UserUpdate, UserReadWithPosts
 from server.services.user import (
     create_user,
     get_user,
+    get_user_with_posts,
     get_all_users,
     update_user,
     delete_user,
@@ -18,21 +22,28 @@ async def create(user: UserCreate):
 
 
 @router.get("/", response_model=List[UserRead])
-async def read_all_users():
-    return await get_all_users()
+async def read_all_users(
+    response: Response, cursor: Optional[str] = None, limit: Optional[int] = None
+):
+    fast = fast_json.enabled()
+    users, next_cursor = await get_all_users(cursor, limit, as_rows=fast)
+    set_next_cursor(response, next_cursor)
+    return fast_json.rows_response(users, UserRead, response) if fast else users
 
 
 @router.get("/{user_id}", response_model=UserRead)
-async def read(user_id: int):
+async def read(user_id: int, request: Request, response: Response):
     user = await get_user(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    # update_user always bumps last_active_at
+    etag = make_etag(user.id, user.username, user.bio, user.last_active_at)
+    return not_modified(request, response, etag) or user
 
 
 @router.get("/{user_id}/with-posts", response_model=UserReadWithPosts)
-async def get_user_with_posts(user_id: int):
-    user = await get_user(user_id)
+async def read_with_posts(user_id: int):
+    user = await get_user_with_posts(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -1,10 +1,23 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
-from server.schemas.user_feed import UserFeedCreate, UserFeedRead, UserFeedUpdate
+from fastapi import APIRouter, Body, HTTPException, Request, Response, status
+from typing import Any, List, Optional
+from server.common import config, fast_json
+from server.common.http_cache import make_etag, not_modified
+from server.common.pagination import set_next_cursor
+from server.schemas.bulk import BulkCreateResult
+from server.services.events import record_active
+from server.schemas.user_feed import (
+    FeedOrder,
+    HydratedFeedItem,
+    UserFeedCreate,
+    UserFeedRead,
+    UserFeedUpdate,
+)
 from server.services.user_feed import (
     create_user_feed,
+    create_user_feeds_bulk,
     get_user_feed_by_id,
     get_feeds_for_user,
+    get_hydrated_feed_for_user,
     update_user_feed,
     delete_user_feed,
 )
@@ -12,11 +25,32 @@ from server.services.user_feed import (
 router = APIRouter(prefix="/user-feeds", tags=["UserFeeds"])
 
 
+def _fingerprint(item: dict) -> tuple:
+    post = item["post"]
+    return (
+        item["post_id"],
+        item["added_at"],
+        item["rank_score"],
+        item["is_seen"],
+        post.updated_at,
+        item["comment_count"],
+        sorted(item["reaction_counts"].items()),
+        item["author_username"],
+        [tag["id"] for tag in item["tags"]],
+        [category["id"] for category in item["categories"]],
+    )
+
+
 @router.post("/", response_model=UserFeedRead)
 async def create(feed: UserFeedCreate):
     return await create_user_feed(feed)
 
 
+@router.post("/bulk", response_model=BulkCreateResult)
+async def create_bulk(items: List[Any] = Body(..., max_length=config.MAX_BULK_ITEMS)):
+    return await create_user_feeds_bulk(items)
+
+
 @router.get("/{feed_id}", response_model=UserFeedRead)
 async def get_one(feed_id: int):
     feed = await get_user_feed_by_id(feed_id)
@@ -26,8 +60,47 @@ async def get_one(feed_id: int):
 
 
 @router.get("/by-user/{user_id}", response_model=List[UserFeedRead])
-async def get_by_user(user_id: int):
-    return await get_feeds_for_user(user_id)
+async def get_by_user(
+    user_id: int,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    order: FeedOrder = "recent",
+):
+    feeds, next_cursor = await get_feeds_for_user(user_id, cursor, limit, order)
+    if cursor is None:
+        await record_active(user_id)
+    set_next_cursor(response, next_cursor)
+    etag = make_etag(next_cursor, [tuple(feed) for feed in feeds])
+    cached = not_modified(request, response, etag)
+    if cached or not fast_json.enabled():
+        return cached or feeds
+    # Feed pages are already plain rows
+    return fast_json.rows_response(feeds, UserFeedRead, response)
+
+
+@router.get("/by-user/{user_id}/hydrated", response_model=List[HydratedFeedItem])
+async def get_hydrated_by_user(
+    user_id: int,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    order: FeedOrder = "recent",
+):
+    fast = fast_json.enabled()
+    items, next_cursor = await get_hydrated_feed_for_user(
+        user_id, cursor, limit, order, as_rows=fast
+    )
+    if cursor is None:
+        await record_active(user_id)
+    set_next_cursor(response, next_cursor)
+    etag = make_etag(next_cursor, [_fingerprint(item) for item in items])
+    cached = not_modified(request, response, etag)
+    if cached or not fast:
+        return cached or items
+    return fast_json.rows_response(items, HydratedFeedItem, response)
 
 
 @router.put("/{feed_id}", response_model=UserFeedRead)
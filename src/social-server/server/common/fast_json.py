@@ -0,0 +1,102 @@
+import logging
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Tuple, Type, get_args, get_origin
+
+from fastapi import Response
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+from server.common import config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+if config.FAST_JSON_RESPONSES and orjson is None:
+    logger.warning(
+        "FAST_JSON_RESPONSES=1 has no effect without orjson (pip install orjson)"
+    )
+
+
+def enabled() -> bool:
+    """Whether list routes take the fast path, see ``FAST_JSON_RESPONSES``."""
+    return config.FAST_JSON_RESPONSES and orjson is not None
+
+
+class FastJSONResponse(JSONResponse):
+    # UTC as "Z" matches what Pydantic writes for the same datetimes
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_UTC_Z
+            | orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_SERIALIZE_NUMPY,
+        )
+
+
+def read_columns(model, schema: Type[BaseModel]) -> list:
+    """The ``model`` columns behind each field of ``schema``, in field order."""
+    return [model.__table__.c[name] for name in schema.model_fields]
+
+
+def _model(annotation) -> Optional[Type[BaseModel]]:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    return None
+
+
+@lru_cache(maxsize=None)
+def _plan(schema: Type[BaseModel]) -> Tuple[Tuple[str, Any, bool], ...]:
+    # (field name, nested schema or None, whether it is a list of them)
+    plan = []
+    for name, field in schema.model_fields.items():
+        annotation = field.annotation
+        if get_origin(annotation) in (list, List):
+            (item,) = get_args(annotation)
+            plan.append((name, _model(item), True))
+        else:
+            plan.append((name, _model(annotation), False))
+    return tuple(plan)
+
+
+def as_dict(value, schema: Type[BaseModel]) -> dict:
+    """Pick ``schema``'s fields off a row, ORM object or dict, without validating.
+
+    Values are trusted to already have the field types, as rows read with
+    ``read_columns`` do; nested schemas are picked recursively.
+    """
+    get = value.__getitem__ if isinstance(value, dict) else value.__getattribute__
+    data = {}
+    for name, nested, many in _plan(schema):
+        field = get(name)
+        if nested is not None and field is not None:
+            if many:
+                field = [as_dict(item, nested) for item in field]
+            else:
+                field = as_dict(field, nested)
+        data[name] = field
+    return data
+
+
+def rows_response(
+    rows: Iterable, schema: Type[BaseModel], response: Response
+) -> FastJSONResponse:
+    """Serialise ``rows`` as a list of ``schema`` with orjson.
+
+    Skips the ``response_model`` validation and encoding; headers already set
+    on ``response`` (next cursor, ETag) are carried over.
+    """
+    fields = tuple(schema.model_fields)
+    content = [
+        # Rows selected with read_columns already hold exactly the fields;
+        # zipping them is several times cheaper than Row._asdict()
+        (
+            dict(zip(fields, row))
+            if getattr(row, "_fields", None) == fields
+            else as_dict(row, schema)
+        )
+        for row in rows
+    ]
+    return FastJSONResponse(content, headers=dict(response.headers))
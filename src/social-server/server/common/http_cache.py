@@ -0,0 +1,42 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from server.common import config
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag over a fingerprint of the response, e.g. ids and timestamps.
+
+    Fingerprints are cheap to build from the rows already loaded, so a
+    matching request is answered without serialising the response model.
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    wanted = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == wanted for tag in if_none_match.split(",")
+    )
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Set ``ETag`` and ``Cache-Control`` on ``response``.
+
+    Returns a bodiless 304 carrying the same headers (including any next
+    cursor already set) when the request's ``If-None-Match`` matches, else
+    ``None`` and the route returns its payload as usual.
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = (
+        f"private, max-age={config.HTTP_CACHE_MAX_AGE}, must-revalidate"
+    )
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(status_code=304, headers=dict(response.headers))
+    return None
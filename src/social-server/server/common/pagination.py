@@ -0,0 +1,124 @@
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Any, List, Optional, Sequence, Tuple, Type
+
+from sqlalchemy import and_, or_
+from server.common import config
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    if not limit or limit < 1:
+        return config.DEFAULT_PAGE_SIZE
+    return min(limit, config.MAX_PAGE_SIZE)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = [
+        {"dt": value.isoformat()} if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str, size: int, types: Optional[Sequence[Optional[Type]]] = None
+) -> List[Any]:
+    """The values of ``cursor``, checked against ``types`` when given.
+
+    A ``None`` type accepts any value. Without the check a well-formed cursor
+    with e.g. a string for a timestamp would fail in the driver instead.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = [
+            _parse_datetime(value["dt"]) if isinstance(value, dict) else value
+            for value in payload
+        ]
+    except (ValueError, TypeError, KeyError) as exc:
+        raise InvalidCursorError("Malformed cursor") from exc
+    if len(values) != size:
+        raise InvalidCursorError("Cursor does not match this listing")
+    if types is not None and not all(map(_accepts, types, values)):
+        raise InvalidCursorError("Cursor does not match this listing")
+    return values
+
+
+def _accepts(expected: Optional[Type], value: Any) -> bool:
+    if expected is None:
+        return True
+    if isinstance(value, bool):
+        return expected is bool
+    if expected is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, expected)
+
+
+def column_type(column) -> Optional[Type]:
+    """The Python type of ``column``'s values, ``None`` if unknown."""
+    # Decorated types, e.g. SQLModel's UTC datetimes, report object
+    sql_type = getattr(column.type, "impl_instance", column.type)
+    try:
+        python_type = sql_type.python_type
+    except NotImplementedError:
+        return None
+    return None if python_type is object else python_type
+
+
+def _parse_datetime(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    # SQLite hands back naive UTC timestamps
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _after(columns, values, descending: bool):
+    # Expanded row-value comparison: (a, b) > (x, y)  ->  a > x OR (a = x AND b > y)
+    clauses = []
+    for i, column in enumerate(columns):
+        equal = [columns[j] == values[j] for j in range(i)]
+        step = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal, step))
+    return or_(*clauses)
+
+
+def paginate(
+    statement,
+    columns: Sequence,
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = False,
+):
+    """Apply keyset pagination over ``columns`` to ``statement``.
+
+    ``columns`` must end in a unique column so the order is total. One extra
+    row is fetched so ``page_of`` can tell whether a next page exists.
+    """
+    if cursor:
+        values = decode_cursor(cursor, len(columns), list(map(column_type, columns)))
+        statement = statement.where(_after(columns, values, descending))
+    order = [column.desc() if descending else column.asc() for column in columns]
+    return statement.order_by(*order).limit(limit + 1)
+
+
+def page_of(
+    rows: Sequence, columns: Sequence, limit: int
+) -> Tuple[list, Optional[str]]:
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, column.key) for column in columns])
+
+
+def set_next_cursor(response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
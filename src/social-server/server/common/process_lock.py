@@ -0,0 +1,31 @@
+import hashlib
+import os
+import tempfile
+from typing import IO, Optional
+
+from server.common import config
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+def try_lock(name: str) -> Optional[IO]:
+    """Take a host-wide lock shared by every worker serving ``DATABASE_URL``.
+
+    Returns the open lock file, which holds the lock until it is closed or the
+    process exits, or ``None`` if another process already holds it. Without
+    ``fcntl`` every caller gets the lock.
+    """
+    database = hashlib.sha1(config.DATABASE_URL.encode()).hexdigest()[:12]
+    path = os.path.join(tempfile.gettempdir(), f"social-{database}-{name}.lock")
+    handle = open(path, "a")
+    if fcntl is None:
+        return handle
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        handle.close()
+        return None
+    return handle
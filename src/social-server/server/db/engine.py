@@ -0,0 +1,97 @@
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Applied on every new SQLite connection. WAL lets readers run alongside the
+# single writer, NORMAL sync is durable across app crashes in WAL mode, and the
+# busy timeout makes writers queue on the lock instead of failing.
+SQLITE_PRODUCTION_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,  # negative means KiB, so 64 MiB
+    "busy_timeout": 5000,
+    "temp_store": "MEMORY",
+}
+
+PROFILES = {
+    "dev": {"echo": True, "pool_pre_ping": False, "sqlite_pragmas": {}},
+    "production": {
+        "echo": False,
+        "pool_pre_ping": True,
+        "sqlite_pragmas": SQLITE_PRODUCTION_PRAGMAS,
+    },
+}
+
+
+# SQLSTATE for a unique index violation; sqlite3 names it instead
+UNIQUE_VIOLATION = "23505"
+SQLITE_UNIQUE_ERRORS = {"SQLITE_CONSTRAINT_UNIQUE", "SQLITE_CONSTRAINT_PRIMARYKEY"}
+
+
+def is_unique_violation(error: IntegrityError) -> bool:
+    """Whether ``error`` is a duplicate key rather than e.g. a foreign key."""
+    orig = error.orig
+    sqlstate = getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
+    if sqlstate is not None:
+        return sqlstate == UNIQUE_VIOLATION
+    if getattr(orig, "sqlite_errorname", None) is not None:
+        return orig.sqlite_errorname in SQLITE_UNIQUE_ERRORS
+    return "UNIQUE constraint failed" in str(orig)
+
+
+def create_engine(
+    url: str,
+    profile: str = "dev",
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    statement_cache_size: Optional[int] = None,
+) -> AsyncEngine:
+    """Create the async engine for ``url`` using one of ``PROFILES``.
+
+    ``statement_cache_size`` only applies to asyncpg, where it sizes both the
+    driver's and SQLAlchemy's prepared statement caches.
+    """
+    try:
+        settings = PROFILES[profile]
+    except KeyError:
+        raise ValueError(
+            f"Unknown DB profile {profile!r}, expected one of {sorted(PROFILES)}"
+        )
+
+    url = make_url(url)
+    is_sqlite = url.get_backend_name() == "sqlite"
+    kwargs = {"echo": settings["echo"], "pool_pre_ping": settings["pool_pre_ping"]}
+    # In-memory SQLite uses a single static connection, which takes no pool sizing
+    if not (is_sqlite and url.database in (None, "", ":memory:")):
+        kwargs.update(pool_size=pool_size, max_overflow=max_overflow)
+    if url.get_driver_name() == "asyncpg" and statement_cache_size is not None:
+        url = url.update_query_dict(
+            {"prepared_statement_cache_size": str(statement_cache_size)}
+        )
+        kwargs["connect_args"] = {"statement_cache_size": statement_cache_size}
+
+    if orjson is not None:
+        # JSON columns (e.g. Post.reaction_counts) decode on every row read
+        kwargs["json_deserializer"] = orjson.loads
+
+    engine = create_async_engine(url, future=True, **kwargs)
+
+    pragmas = settings["sqlite_pragmas"]
+    if is_sqlite and pragmas:
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+    return engine
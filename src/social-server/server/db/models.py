@@ -1,5 +1,6 @@
 from sqlmodel import SQLModel, Field, Relationship
-from typing import Optional, List
+from sqlalchemy import JSON, CheckConstraint, Index
+from typing import Dict, Optional, List
 from datetime import datetime, timezone
 
 
@@ -7,12 +8,18 @@ from datetime import datetime, timezone
 # User
 # ----------------------------------------
 class User(SQLModel, table=True):
+    # The trending job injects into the feeds of recently active readers
+    __table_args__ = (Index("ix_user_last_active_at", "last_active_at"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     username: str
     password_hash: str
     bio: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # Bumped by update_user and, through the event log, by opening the feed
     last_active_at: Optional[datetime] = None
+    # Unread Notification rows, kept in step by server.services.notification
+    unread_notification_count: int = Field(default=0)
 
     posts: List["Post"] = Relationship(back_populates="author")
 
@@ -21,13 +28,33 @@ class User(SQLModel, table=True):
 # Post
 # ----------------------------------------
 class Post(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_post_user_id_created_at", "user_id", "created_at"),
+        # Newest-first reads; visibility and author ride along so the viewer
+        # filter rejects rows from the index without reading them
+        Index(
+            "ix_post_created_at_visibility_user_id",
+            "created_at",
+            "visibility",
+            "user_id",
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     content_text: str
     image_url: Optional[str] = None
-    visibility: str = Field(default="public")  # public, friends-only, private
+    visibility: str = Field(default="public")  # a schemas.post.Visibility value
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: Optional[datetime] = None
+    # False when the author was above the celebrity threshold at write time;
+    # followers then pull the post into their feed on read
+    followers_fanned_out: bool = Field(default=True)
+    # Engagement counters, kept in step with Comment/Reaction writes by
+    # server.services.counters; scripts/repair_counters.py recomputes them
+    comment_count: int = Field(default=0)
+    reaction_count: int = Field(default=0)
+    reaction_counts: Dict[str, int] = Field(default_factory=dict, sa_type=JSON)
 
     author: Optional[User] = Relationship(back_populates="posts")
 
@@ -36,6 +63,13 @@ class Post(SQLModel, table=True):
 # Feed
 # ----------------------------------------
 class UserFeed(SQLModel, table=True):
+    __table_args__ = (
+        # Feed pages are a range scan over one reader's entries, newest first
+        Index("ix_userfeed_user_id_added_at_post_id", "user_id", "added_at", "post_id"),
+        Index("ix_userfeed_user_id_post_id", "user_id", "post_id"),
+        Index("ix_userfeed_post_id", "post_id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
 
     user_id: int = Field(foreign_key="user.id")  # Who the feed is for
@@ -61,6 +95,17 @@ class UserFeed(SQLModel, table=True):
 # Follow
 # ----------------------------------------
 class Follow(SQLModel, table=True):
+    __table_args__ = (
+        # One follow per pair; also covers get_followings
+        Index(
+            "ux_follow_follower_id_following_id",
+            "follower_id",
+            "following_id",
+            unique=True,
+        ),
+        Index("ix_follow_following_id_follower_id", "following_id", "follower_id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     follower_id: int = Field(foreign_key="user.id")
     following_id: int = Field(foreign_key="user.id")
@@ -71,9 +116,23 @@ class Follow(SQLModel, table=True):
 # Friendship
 # ----------------------------------------
 class Friendship(SQLModel, table=True):
+    # One row per pair of users, stored with user_id < friend_id; the unique
+    # index answers "are these two friends" in one probe whichever side asks
+    __table_args__ = (
+        CheckConstraint("user_id < friend_id", name="ck_friendship_ordered_pair"),
+        Index("ux_friendship_user_id_friend_id", "user_id", "friend_id", unique=True),
+        Index(
+            "ix_friendship_user_id_status_friend_id", "user_id", "status", "friend_id"
+        ),
+        Index(
+            "ix_friendship_friend_id_status_user_id", "friend_id", "status", "user_id"
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     friend_id: int = Field(foreign_key="user.id")
+    requester_id: int = Field(foreign_key="user.id")  # whichever side asked
     status: str  # requested, accepted, blocked
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
@@ -92,6 +151,12 @@ class Friendship(SQLModel, table=True):
 # Comment
 # ----------------------------------------
 class Comment(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_comment_post_id_created_at", "post_id", "created_at"),
+        # A reader's own comments, for ranking affinity
+        Index("ix_comment_user_id_post_id", "user_id", "post_id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     post_id: int = Field(foreign_key="post.id")
     user_id: int = Field(foreign_key="user.id")
@@ -103,6 +168,19 @@ class Comment(SQLModel, table=True):
 # Reaction
 # ----------------------------------------
 class Reaction(SQLModel, table=True):
+    __table_args__ = (
+        # One reaction of each type per user and post; also covers post lookups
+        Index(
+            "ux_reaction_post_id_user_id_type",
+            "post_id",
+            "user_id",
+            "type",
+            unique=True,
+        ),
+        # A reader's own reactions, for ranking affinity
+        Index("ix_reaction_user_id_post_id", "user_id", "post_id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     post_id: int = Field(foreign_key="post.id")
     user_id: int = Field(foreign_key="user.id")
@@ -122,6 +200,8 @@ class Tag(SQLModel, table=True):
 # PostTag (Many-to-many)
 # ----------------------------------------
 class PostTag(SQLModel, table=True):
+    __table_args__ = (Index("ix_posttag_tag_id_post_id", "tag_id", "post_id"),)
+
     post_id: int = Field(foreign_key="post.id", primary_key=True)
     tag_id: int = Field(foreign_key="tag.id", primary_key=True)
 
@@ -139,6 +219,10 @@ class Category(SQLModel, table=True):
 # PostCategory (Many-to-many)
 # ----------------------------------------
 class PostCategory(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_postcategory_category_id_post_id", "category_id", "post_id"),
+    )
+
     post_id: int = Field(foreign_key="post.id", primary_key=True)
     category_id: int = Field(foreign_key="category.id", primary_key=True)
 
@@ -160,13 +244,32 @@ class UserPostViewHistory(SQLModel, table=True):
 # Notification
 # ----------------------------------------
 class Notification(SQLModel, table=True):
+    __table_args__ = (
+        # A recipient's notifications, most recent activity first
+        Index("ix_notification_user_id_updated_at_id", "user_id", "updated_at", "id"),
+        # Unread rows a new event of the same type and post is folded into
+        Index(
+            "ix_notification_user_id_read_type_post_id",
+            "user_id",
+            "read",
+            "type",
+            "post_id",
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")  # recipient
-    actor_id: int = Field(foreign_key="user.id")
+    actor_id: int = Field(foreign_key="user.id")  # the latest actor
     post_id: Optional[int] = Field(default=None, foreign_key="post.id")
-    type: str  # comment, reaction, follow, friend_request
+    # comment, reaction, follow, friend_request, friend_accepted
+    type: str
+    # People behind the events folded into this row while it was unread, and
+    # the latest few of them, newest first
+    actor_count: int = Field(default=1)
+    actor_ids: List[int] = Field(default_factory=list, sa_type=JSON)
     read: bool = Field(default=False)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
 # ----------------------------------------
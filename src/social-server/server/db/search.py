@@ -0,0 +1,100 @@
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Index,
+    Integer,
+    MetaData,
+    Table,
+    Text,
+    func,
+    inspect,
+    literal_column,
+    null,
+    select,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.engine import make_url
+from server.common import config
+from server.db.models import Comment, Post
+
+SQLITE = make_url(config.DATABASE_URL).get_backend_name() == "sqlite"
+# Stemmed on both backends, so "running" finds "run"
+TS_CONFIG = literal_column("'english'::regconfig")
+
+# Kept apart from SQLModel.metadata: on SQLite this is an FTS5 virtual table,
+# which create_all, the migration passes and the exports must not touch
+metadata = MetaData()
+
+# One row per post and per comment, keyed by document_id. Comment rows carry
+# their post's id so the tag, category and visibility filters apply to both
+search_document = Table(
+    "search_document",
+    metadata,
+    # FTS5 keys its rows by the implicit rowid
+    Column("rowid" if SQLITE else "id", BigInteger, key="id", primary_key=True),
+    Column("post_id", Integer, nullable=False),
+    Column("comment_id", Integer),
+    Column("content", Text if SQLITE else TSVECTOR, nullable=False),
+    Index("ix_search_document_content", "content", postgresql_using="gin"),
+)
+
+CREATE_FTS5 = (
+    "CREATE VIRTUAL TABLE search_document USING fts5("
+    "content, post_id UNINDEXED, comment_id UNINDEXED, "
+    "tokenize='porter unicode61')"
+)
+
+
+def post_document_id(post_id):
+    """Posts and comments share the key space: even ids for posts, odd for comments."""
+    return post_id * 2
+
+
+def comment_document_id(comment_id):
+    return comment_id * 2 + 1
+
+
+def document_content(content_text):
+    return content_text if SQLITE else func.to_tsvector(TS_CONFIG, content_text)
+
+
+def posts_as_documents():
+    return select(
+        post_document_id(Post.id),
+        Post.id,
+        null(),
+        document_content(Post.content_text),
+    )
+
+
+def comments_as_documents():
+    return select(
+        comment_document_id(Comment.id),
+        Comment.post_id,
+        Comment.id,
+        document_content(Comment.content_text),
+    )
+
+
+def rebuild_search_index(conn):
+    # For rows written around the services, e.g. by the bulk seeder
+    columns = ["id", "post_id", "comment_id", "content"]
+    conn.execute(search_document.delete())
+    for documents in (posts_as_documents(), comments_as_documents()):
+        conn.execute(search_document.insert().from_select(columns, documents))
+
+
+def create_search_index(conn):
+    # Built, and filled from the existing posts and comments, once per database
+    if inspect(conn).has_table(search_document.name):
+        return
+    if SQLITE:
+        conn.execute(text(CREATE_FTS5))
+    else:
+        metadata.create_all(conn)
+    rebuild_search_index(conn)
+
+
+def drop_search_index(conn):
+    search_document.drop(conn, checkfirst=True)
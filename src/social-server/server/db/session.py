@@ -1,14 +1,38 @@
-from typing import AsyncGenerator
+import logging
+from typing import AsyncGenerator, Optional
 from sqlmodel import SQLModel
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel.ext.asyncio.session import AsyncSession as SQLModelAsyncSession
+from sqlalchemy import and_, case, exists, inspect, literal, or_, select, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 from contextlib import asynccontextmanager
+from server.common import config
+from server.db.engine import create_engine
+from server.db.search import create_search_index, drop_search_index
 
-DATABASE_URL = "sqlite+aiosqlite:///./social.db"
-DB_FILE = "./social.db"
+logger = logging.getLogger(__name__)
 
-engine = create_async_engine(DATABASE_URL, echo=True, future=True)
+DATABASE_URL = config.DATABASE_URL
+
+
+def sqlite_file(url: str) -> Optional[str]:
+    url = make_url(url)
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        return None
+    return url.database
+
+
+# None when the database is not a SQLite file, e.g. on PostgreSQL
+DB_FILE = sqlite_file(DATABASE_URL)
+
+engine = create_engine(
+    DATABASE_URL,
+    profile=config.DB_PROFILE,
+    pool_size=config.DB_POOL_SIZE,
+    max_overflow=config.DB_MAX_OVERFLOW,
+    statement_cache_size=config.DB_STATEMENT_CACHE_SIZE,
+)
 
 async_session = sessionmaker(
     engine, class_=SQLModelAsyncSession, expire_on_commit=False
@@ -21,6 +45,145 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
-async def init_db():
+def _repeats_key(table, index):
+    # True for a row sharing the index key with a row of lower id
+    other = table.alias()
+    return exists().where(
+        and_(
+            *(other.c[c.name] == c for c in index.columns),
+            other.c.id < table.c.id,
+        )
+    )
+
+
+def _new_unique_indexes(conn):
+    inspector = inspect(conn)
+    for table in SQLModel.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.unique and index.name not in existing:
+                yield table, index
+
+
+def create_missing_indexes(conn):
+    # create_all skips tables that already exist, so indexes added to the models
+    # later would never reach an existing database without this pass. A unique
+    # index over rows that repeat its key is left out rather than fail startup
+    blocked = set()
+    for table, index in _new_unique_indexes(conn):
+        if conn.execute(select(table.c.id).where(_repeats_key(table, index))).first():
+            logger.warning(
+                "Not building %s: %s has rows repeating its key; "
+                "python -m scripts.drop_duplicates keeps the first of each",
+                index.name,
+                table.name,
+            )
+            blocked.add(index.name)
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name not in blocked:
+                index.create(conn, checkfirst=True)
+
+
+def create_missing_columns(conn):
+    # Same gap for columns. They are added nullable, with the model's scalar
+    # default filling existing rows, since a NOT NULL column needs one on SQLite
+    inspector = inspect(conn)
+    preparer = conn.dialect.identifier_preparer
+    for table in SQLModel.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = (
+                f"ALTER TABLE {preparer.format_table(table)} "
+                f"ADD COLUMN {preparer.format_column(column)} "
+                f"{column.type.compile(conn.dialect)}"
+            )
+            if column.default is not None and column.default.is_scalar:
+                value = literal(column.default.arg, column.type).compile(
+                    dialect=conn.dialect, compile_kwargs={"literal_binds": True}
+                )
+                ddl += f" DEFAULT {value}"
+            conn.execute(text(ddl))
+
+
+def order_friendship_pairs(conn):
+    # Friendship rows used to be directed, so (a, b) and (b, a) could both
+    # exist. Before the unique pair index is built on such a database, store
+    # each pair ordered and keep one row: a block wins over an accepted
+    # friendship, which wins over a request
+    table = SQLModel.metadata.tables["friendship"]
+    if any(
+        index["name"] == "ux_friendship_user_id_friend_id"
+        for index in inspect(conn).get_indexes(table.name)
+    ):
+        return
+    conn.execute(
+        table.update()
+        .where(table.c.requester_id.is_(None))
+        .values(requester_id=table.c.user_id)
+    )
+    conn.execute(
+        table.update()
+        .where(table.c.user_id > table.c.friend_id)
+        .values(user_id=table.c.friend_id, friend_id=table.c.user_id)
+    )
+    conn.execute(table.delete().where(table.c.user_id == table.c.friend_id))
+
+    other = table.alias()
+
+    def rank(t):
+        return case(
+            (t.c.status == "blocked", 0), (t.c.status == "accepted", 1), else_=2
+        )
+
+    conn.execute(
+        table.delete().where(
+            exists().where(
+                (other.c.user_id == table.c.user_id)
+                & (other.c.friend_id == table.c.friend_id)
+                & or_(
+                    rank(other) < rank(table),
+                    and_(rank(other) == rank(table), other.c.id < table.c.id),
+                )
+            )
+        )
+    )
+
+
+def drop_duplicate_rows(conn):
+    # Unique indexes added to a populated table, e.g. on follows and reactions,
+    # cannot be built over the duplicates the old seeder could write. This
+    # keeps the lowest id per key of each index not built yet; it deletes user
+    # data, so it only runs from scripts.drop_duplicates. Post counters may then
+    # be high by the dropped reactions; python -m scripts.repair_counters
+    # rebuilds them
+    for table, index in list(_new_unique_indexes(conn)):
+        result = conn.execute(table.delete().where(_repeats_key(table, index)))
+        if result.rowcount:
+            logger.warning(
+                "Dropped %d rows of %s repeating a %s key",
+                result.rowcount,
+                table.name,
+                index.name,
+            )
+
+
+async def init_db(drop_duplicates: bool = False):
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(create_missing_columns)
+        await conn.run_sync(order_friendship_pairs)
+        if drop_duplicates:
+            await conn.run_sync(drop_duplicate_rows)
+        await conn.run_sync(create_missing_indexes)
+        await conn.run_sync(create_search_index)
+
+
+async def reset_db():
+    # Used where deleting the SQLite file is not an option, e.g. PostgreSQL
+    async with engine.begin() as conn:
+        await conn.run_sync(drop_search_index)
+        await conn.run_sync(SQLModel.metadata.drop_all)
+    await init_db()
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class BulkItemError(BaseModel):
+    index: int  # position of the item in the request array
+    detail: str
+
+
+class BulkCreateResult(BaseModel):
+    ids: List[Optional[int]]  # aligned with the request, None where the item failed
+    errors: List[BulkItemError] = []
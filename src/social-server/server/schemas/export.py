@@ -0,0 +1,4 @@
+from typing import Literal
+
+# Tables served by /export/{table}, see server.services.export.EXPORTS
+ExportTable = Literal["posts", "reactions", "follows", "friendships"]
@@ -1,19 +1,24 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
+
+FriendshipStatus = Literal["requested", "accepted", "blocked"]
 
 
 class FriendshipCreate(BaseModel):
-    user_id: int
+    user_id: int  # the requester
     friend_id: int
-    status: str  # "requested", "accepted", "blocked"
+    # Accepting is the other side's answer, through update_friendship
+    status: Literal["requested", "blocked"] = "requested"
 
 
 class FriendshipRead(BaseModel):
+    # Stored as an ordered pair, user_id < friend_id
     id: int
     user_id: int
     friend_id: int
-    status: str
+    requester_id: int
+    status: FriendshipStatus
     created_at: datetime
 
     class Config:
@@ -21,4 +26,4 @@ class FriendshipRead(BaseModel):
 
 
 class FriendshipUpdate(BaseModel):
-    status: Optional[str] = None  # Allow status updates only
+    status: Optional[FriendshipStatus] = None  # Allow status updates only
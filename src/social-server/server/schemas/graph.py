@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class GraphCounts(BaseModel):
+    user_id: int
+    followers: int
+    following: int
+    friends: int  # accepted friendships
+
+
+class FollowCheck(BaseModel):
+    user_id: int
+    following: bool
+
+
+class MutualFriends(BaseModel):
+    count: int
+    user_ids: List[int]
+
+
+class FriendSuggestion(BaseModel):
+    user_id: int
+    mutual_friends: int
@@ -0,0 +1,35 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Optional
+from server.common import config
+
+
+class NotificationRead(BaseModel):
+    id: int
+    user_id: int  # recipient
+    actor_id: int  # the latest actor
+    actor_count: int  # people behind the events folded into this row
+    actor_ids: List[int]  # the latest few of them, newest first
+    post_id: Optional[int] = None
+    type: str
+    read: bool
+    created_at: datetime
+    updated_at: datetime  # latest activity
+
+    class Config:
+        from_attributes = True
+
+
+class UnreadCount(BaseModel):
+    user_id: int
+    unread: int
+
+
+class MarkRead(BaseModel):
+    # Omitted: mark every unread notification
+    ids: Optional[List[int]] = Field(default=None, max_length=config.MAX_BULK_ITEMS)
+
+
+class MarkReadResult(BaseModel):
+    marked: int
+    unread: int
@@ -1,13 +1,34 @@
 from datetime import datetime
-from typing import Optional
+from enum import Enum
+from typing import Dict, Optional
 from pydantic import BaseModel
 
 
+class Visibility(str, Enum):
+    PUBLIC = "public"  # anyone
+    FRIENDS = "friends"  # the author and their accepted friends
+    PRIVATE = "private"  # the author only
+
+    @classmethod
+    def _missing_(cls, value):
+        # Case-insensitive, and "friends-only" as older clients spell it
+        if isinstance(value, str):
+            value = value.strip().lower()
+            value = {"friends-only": "friends"}.get(value, value)
+            for member in cls:
+                if member.value == value:
+                    return member
+        return None
+
+
 class PostCreate(BaseModel):
     user_id: int
     content_text: str
     image_url: Optional[str] = None
-    visibility: Optional[str] = "public"
+    visibility: Optional[Visibility] = Visibility.PUBLIC
+
+    class Config:
+        use_enum_values = True
 
 
 class PostRead(BaseModel):
@@ -15,9 +36,12 @@ class PostRead(BaseModel):
     user_id: int
     content_text: str
     image_url: Optional[str]
-    visibility: str
+    visibility: Visibility
     created_at: datetime
     updated_at: Optional[datetime]
+    comment_count: int = 0
+    reaction_count: int = 0
+    reaction_counts: Dict[str, int] = {}
 
     class Config:
         from_attributes = True
@@ -26,4 +50,7 @@ class PostRead(BaseModel):
 class PostUpdate(BaseModel):
     content_text: Optional[str] = None
     image_url: Optional[str] = None
-    visibility: Optional[str] = None
+    visibility: Optional[Visibility] = None
+
+    class Config:
+        use_enum_values = True
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Literal, Optional
+
+SearchKind = Literal["post", "comment"]
+
+
+class SearchHit(BaseModel):
+    kind: SearchKind
+    post_id: int
+    comment_id: Optional[int] = None  # set on comment hits
+    user_id: int  # the author of the post or comment
+    content_text: str
+    created_at: datetime
+    score: float  # relevance, higher is better; only comparable within a query
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class TrendingPost(BaseModel):
+    post_id: int
+    score: float  # weighted reactions and comments within the window
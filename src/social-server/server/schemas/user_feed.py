@@ -1,6 +1,12 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Literal, Optional
+from server.schemas.category import CategoryRead
+from server.schemas.post import PostRead, Visibility
+from server.schemas.tag import TagRead
+
+# "recent" orders by added_at, "score" by a rank score computed at read time
+FeedOrder = Literal["recent", "score"]
 
 
 class UserFeedCreate(BaseModel):
@@ -8,23 +14,35 @@ class UserFeedCreate(BaseModel):
     post_id: int
     rank_score: Optional[float] = None
     source_type: Optional[str] = "follow"
-    visibility: Optional[str] = "public"
+    visibility: Optional[Visibility] = Visibility.PUBLIC
+
+    class Config:
+        use_enum_values = True
 
 
 class UserFeedRead(BaseModel):
-    id: int
+    id: Optional[int]  # None for celebrity posts merged in at read time
     user_id: int
     post_id: int
     added_at: datetime
     rank_score: Optional[float]
     source_type: str
     is_seen: bool
-    visibility: str
+    visibility: Visibility
 
     class Config:
         from_attributes = True
 
 
+class HydratedFeedItem(UserFeedRead):
+    post: PostRead
+    author_username: str
+    comment_count: int
+    reaction_counts: Dict[str, int]  # reaction type -> count
+    tags: List[TagRead]
+    categories: List[CategoryRead]
+
+
 class UserFeedUpdate(BaseModel):
     is_seen: Optional[bool] = None
     rank_score: Optional[float] = None
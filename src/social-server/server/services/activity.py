@@ -0,0 +1,279 @@
+import asyncio
+import itertools
+import json
+import logging
+from contextlib import suppress
+from datetime import datetime
+from typing import AsyncIterator, Iterable, Optional, Set
+
+from sqlmodel import select
+
+from server.common import config
+from server.db.models import Post, PostCategory, PostTag
+from server.db.session import get_session
+from server.schemas.post import Visibility
+from server.services.cache import redis_client
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "activity"
+CLOSED = object()
+
+
+class Topics:
+    """What a subscriber wants: every listed dimension must match.
+
+    Within one dimension any value will do. ``user_ids`` matches the actor or
+    the user acted upon (the post's author, the followed user).
+    """
+
+    def __init__(
+        self,
+        types: Iterable[str] = (),
+        user_ids: Iterable[int] = (),
+        tag_ids: Iterable[int] = (),
+        category_ids: Iterable[int] = (),
+    ):
+        self.types = set(types)
+        self.user_ids = set(user_ids)
+        self.tag_ids = set(tag_ids)
+        self.category_ids = set(category_ids)
+
+    @property
+    def needs_labels(self) -> bool:
+        return bool(self.tag_ids or self.category_ids)
+
+    def matches(self, event: dict) -> bool:
+        if self.types and event["type"] not in self.types:
+            return False
+        if self.user_ids and self.user_ids.isdisjoint(
+            (event["actor_id"], event["user_id"])
+        ):
+            return False
+        if self.tag_ids and self.tag_ids.isdisjoint(event["tag_ids"]):
+            return False
+        if self.category_ids and self.category_ids.isdisjoint(event["category_ids"]):
+            return False
+        return True
+
+
+class Subscriber:
+    """A bounded buffer of matching events for one stream.
+
+    Publishing never waits on a slow reader: a full buffer drops its oldest
+    event, and ``dropped`` says how many went so the reader can catch up
+    over the REST API.
+    """
+
+    def __init__(self, topics: Topics, size: int):
+        self.topics = topics
+        self.queue: asyncio.Queue = asyncio.Queue(size)
+        self.dropped = 0
+
+    def offer(self, event) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def next(self, timeout: float):
+        """The next event, ``None`` after ``timeout`` or ``CLOSED`` at the end."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class ActivityHub:
+    """In-process pub/sub of create events.
+
+    Without a ``client`` events go straight to this process's subscribers.
+    With one, e.g. Redis or the ``LocalRedis`` stand-in, they are published
+    on ``CHANNEL`` and every worker's hub relays them to its own subscribers
+    once ``start`` has subscribed it.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        buffer_size: Optional[int] = None,
+        max_subscribers: Optional[int] = None,
+    ):
+        self.client = client
+        self.buffer_size = buffer_size or config.ACTIVITY_BUFFER_SIZE
+        self.max_subscribers = max_subscribers or config.ACTIVITY_MAX_SUBSCRIBERS
+        self.subscribers: Set[Subscriber] = set()
+        self.sequence = itertools.count(1)
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+
+    @property
+    def active(self) -> bool:
+        # Another worker may have subscribers this one cannot see
+        return self.client is not None or bool(self.subscribers)
+
+    @property
+    def needs_labels(self) -> bool:
+        return self.client is not None or any(
+            subscriber.topics.needs_labels for subscriber in self.subscribers
+        )
+
+    def subscribe(self, topics: Topics) -> Optional[Subscriber]:
+        """A new subscriber, or ``None`` when the hub is full."""
+        if len(self.subscribers) >= self.max_subscribers:
+            return None
+        subscriber = Subscriber(topics, self.buffer_size)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self.subscribers.discard(subscriber)
+
+    async def publish(self, event: dict) -> None:
+        if self.client is None:
+            self.dispatch(event)
+        else:
+            await self.client.publish(CHANNEL, json.dumps(event))
+
+    def dispatch(self, event: dict) -> None:
+        event = {**event, "seq": next(self.sequence)}
+        for subscriber in list(self.subscribers):
+            if subscriber.topics.matches(event):
+                subscriber.offer(event)
+
+    async def start(self) -> None:
+        if self.client is None or self._listener is not None:
+            return
+        self._pubsub = self.client.pubsub()
+        await self._pubsub.subscribe(CHANNEL)
+        self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        async for message in self._pubsub.listen():
+            if message["type"] != "message":
+                continue  # subscribe confirmations
+            try:
+                self.dispatch(json.loads(message["data"]))
+            except Exception:
+                logger.exception("Skipped an unreadable activity event")
+
+    async def stop(self) -> None:
+        """End every open stream and stop relaying."""
+        for subscriber in list(self.subscribers):
+            subscriber.offer(CLOSED)
+        if self._listener is not None:
+            self._listener.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+
+hub = ActivityHub(
+    redis_client(config.ACTIVITY_URL, "ACTIVITY_URL") if config.ACTIVITY_URL else None
+)
+
+
+def activity_event(
+    type: str,
+    id: int,
+    actor_id: int,
+    created_at: datetime,
+    post_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+) -> dict:
+    return {
+        "type": type,
+        "id": id,
+        "actor_id": actor_id,
+        "user_id": user_id,
+        "post_id": post_id,
+        "created_at": created_at.isoformat(),
+        "tag_ids": [],
+        "category_ids": [],
+    }
+
+
+async def _post_context(post_ids: Set[int], labels: bool):
+    """Author and visibility of each post, and its tags and categories."""
+    async with get_session() as session:
+        result = await session.exec(
+            select(Post.id, Post.user_id, Post.visibility).where(Post.id.in_(post_ids))
+        )
+        posts = {
+            post_id: {"user_id": user_id, "visibility": visibility}
+            for post_id, user_id, visibility in result.all()
+        }
+        if labels:
+            for model, column, key in (
+                (PostTag, PostTag.tag_id, "tag_ids"),
+                (PostCategory, PostCategory.category_id, "category_ids"),
+            ):
+                result = await session.exec(
+                    select(model.post_id, column).where(model.post_id.in_(post_ids))
+                )
+                for post_id, label in result.all():
+                    if post_id in posts:
+                        posts[post_id].setdefault(key, []).append(label)
+    return posts
+
+
+async def publish_activity(*events: dict) -> None:
+    """Publish create events after their rows are committed.
+
+    Free while nobody listens. Events on posts only go out for public posts,
+    carrying the post's author as ``user_id`` and its tags and categories.
+    Failures are logged: the write has succeeded and the stream is best effort.
+    """
+    if not hub.active:
+        return
+    try:
+        await _publish(events)
+    except Exception:
+        logger.exception("Dropped %d activity events", len(events))
+
+
+async def _publish(events) -> None:
+    post_ids = {event["post_id"] for event in events if event["post_id"] is not None}
+    posts = await _post_context(post_ids, hub.needs_labels) if post_ids else {}
+    for event in events:
+        if event["post_id"] is not None:
+            post = posts.get(event["post_id"])
+            if post is None or post["visibility"] != Visibility.PUBLIC.value:
+                continue
+            event["user_id"] = post["user_id"]
+            event["tag_ids"] = sorted(post.get("tag_ids", ()))
+            event["category_ids"] = sorted(post.get("category_ids", ()))
+        await hub.publish(event)
+
+
+def server_sent(event: str, data: dict, id: Optional[int] = None) -> str:
+    lines = [f"id: {id}"] if id is not None else []
+    lines += [f"event: {event}", f"data: {json.dumps(data)}"]
+    return "\n".join(lines) + "\n\n"
+
+
+async def stream_events(
+    subscriber: Subscriber, heartbeat: Optional[float] = None
+) -> AsyncIterator[str]:
+    """Server-sent events for ``subscriber`` until the hub stops.
+
+    A comment line goes out after ``heartbeat`` quiet seconds so idle
+    connections stay open, and a ``gap`` event reports dropped events.
+    """
+    heartbeat = heartbeat or config.ACTIVITY_HEARTBEAT_SECONDS
+    try:
+        while True:
+            event = await subscriber.next(heartbeat)
+            if event is CLOSED:
+                return
+            if subscriber.dropped:
+                yield server_sent("gap", {"dropped": subscriber.dropped})
+                subscriber.dropped = 0
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield server_sent(event["type"], event, event["seq"])
+    finally:
+        hub.unsubscribe(subscriber)
@@ -0,0 +1,60 @@
+from typing import Any, Callable, Dict, List, Type
+from pydantic import BaseModel, ValidationError
+from sqlmodel import SQLModel, select
+from server.schemas.bulk import BulkCreateResult, BulkItemError
+
+
+def _describe(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'item'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+class BulkBatch:
+    """Per-item bookkeeping for a bulk write.
+
+    Items are validated against ``schema`` up front; checks against the
+    database then reject further items, and whatever is left is inserted in a
+    single flush. Rejected items never fail the rest of the batch.
+    """
+
+    def __init__(self, items: List[Any], schema: Type[BaseModel]):
+        self.ids: List[Any] = [None] * len(items)
+        self.errors: List[BulkItemError] = []
+        self.valid: Dict[int, BaseModel] = {}
+        for index, item in enumerate(items):
+            try:
+                self.valid[index] = schema.model_validate(item)
+            except ValidationError as exc:
+                self.reject(index, _describe(exc))
+
+    def reject(self, index: int, detail: str) -> None:
+        self.valid.pop(index, None)
+        self.errors.append(BulkItemError(index=index, detail=detail))
+
+    async def require_existing(self, session, model: Type[SQLModel], field: str):
+        """Reject items whose ``field`` does not reference an existing ``model`` row."""
+        wanted = {getattr(item, field) for item in self.valid.values()}
+        if not wanted:
+            return
+        result = await session.exec(select(model.id).where(model.id.in_(wanted)))
+        found = set(result.all())
+        for index, item in list(self.valid.items()):
+            value = getattr(item, field)
+            if value not in found:
+                self.reject(index, f"{field}: {model.__name__} {value} not found")
+
+    async def insert(self, session, build: Callable[[BaseModel], SQLModel]) -> list:
+        """Add one row per remaining item and flush them as a single batch."""
+        rows = {index: build(item) for index, item in self.valid.items()}
+        session.add_all(rows.values())
+        await session.flush()
+        for index, row in rows.items():
+            self.ids[index] = row.id
+        return list(rows.values())
+
+    def result(self) -> BulkCreateResult:
+        return BulkCreateResult(
+            ids=self.ids, errors=sorted(self.errors, key=lambda error: error.index)
+        )
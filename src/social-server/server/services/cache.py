@@ -0,0 +1,245 @@
+import asyncio
+import fnmatch
+import pickle
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set
+
+from server.common import config
+
+MISSING = object()
+
+
+class LocalBackend:
+    """Per-process LRU store; entries expire ``ttl`` seconds after being set.
+
+    Values are kept as-is, so callers must treat cached objects as read-only.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: OrderedDict = OrderedDict()
+
+    async def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return MISSING
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self.entries[key]
+            return MISSING
+        self.entries.move_to_end(key)
+        return value
+
+    async def set(self, key, value, ttl: float) -> None:
+        self.entries[key] = (time.monotonic() + ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def delete(self, *keys) -> None:
+        for key in keys:
+            self.entries.pop(key, None)
+
+    async def clear(self) -> None:
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class RedisBackend:
+    """Stores pickled values in a Redis-like client under ``<namespace>:<key>``.
+
+    ``client`` is a ``redis.asyncio.Redis`` or the ``LocalRedis`` stand-in.
+    Expiry is Redis's; the LRU bound is the server's ``maxmemory-policy``.
+    """
+
+    def __init__(self, client, namespace: str):
+        self.client = client
+        self.namespace = namespace
+
+    def _key(self, key) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get(self, key):
+        raw = await self.client.get(self._key(key))
+        return MISSING if raw is None else pickle.loads(raw)
+
+    async def set(self, key, value, ttl: float) -> None:
+        await self.client.set(
+            self._key(key), pickle.dumps(value), px=max(1, int(ttl * 1000))
+        )
+
+    async def delete(self, *keys) -> None:
+        if keys:
+            await self.client.delete(*(self._key(key) for key in keys))
+
+    async def clear(self) -> None:
+        keys = [key async for key in self.client.scan_iter(match=self._key("*"))]
+        if keys:
+            await self.client.delete(*keys)
+
+
+class LocalRedis:
+    """In-memory stand-in for the subset of ``redis.asyncio.Redis`` used here.
+
+    Lets the serialised ``RedisBackend`` path, and the activity stream's
+    pub/sub, run without a Redis server, e.g. in tests or a single worker
+    started with ``CACHE_URL=memory://`` or ``ACTIVITY_URL=memory://``. It
+    lives in one process, so it shares nothing between workers.
+    """
+
+    def __init__(self):
+        self.data: Dict[str, tuple] = {}
+        self.channels: Dict[str, Set["LocalPubSub"]] = {}
+
+    def _live(self, key: str) -> Optional[bytes]:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._live(key)
+
+    async def set(self, key: str, value: bytes, px: Optional[int] = None) -> bool:
+        expires_at = None if px is None else time.monotonic() + px / 1000
+        self.data[key] = (expires_at, value)
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def scan_iter(self, match: str = "*"):
+        for key in list(self.data):
+            if fnmatch.fnmatchcase(key, match) and self._live(key) is not None:
+                yield key
+
+    async def publish(self, channel: str, message) -> int:
+        receivers = self.channels.get(channel, set())
+        for pubsub in receivers:
+            pubsub.messages.put_nowait(
+                {"type": "message", "channel": channel, "data": message}
+            )
+        return len(receivers)
+
+    def pubsub(self) -> "LocalPubSub":
+        return LocalPubSub(self)
+
+
+class LocalPubSub:
+    """The ``redis.asyncio`` PubSub subset used with ``LocalRedis``."""
+
+    def __init__(self, client: LocalRedis):
+        self.client = client
+        self.messages: asyncio.Queue = asyncio.Queue()
+
+    async def subscribe(self, *channels: str) -> None:
+        for channel in channels:
+            self.client.channels.setdefault(channel, set()).add(self)
+
+    async def unsubscribe(self, *channels: str) -> None:
+        for channel in channels or list(self.client.channels):
+            self.client.channels.get(channel, set()).discard(self)
+
+    async def listen(self):
+        while True:
+            yield await self.messages.get()
+
+    async def aclose(self) -> None:
+        await self.unsubscribe()
+
+
+def redis_client(url: str, setting: str = "CACHE_URL"):
+    """Client for ``CACHE_URL`` or ``ACTIVITY_URL``: ``memory://`` or a
+    ``redis://`` URL."""
+    if url == "memory://":
+        return LocalRedis()
+    try:
+        import redis.asyncio as redis
+    except ImportError as exc:
+        raise RuntimeError(
+            f"{setting}={url} needs the redis package (pip install redis)"
+        ) from exc
+    return redis.Redis.from_url(url)
+
+
+class Cache:
+    """Read-through cache for one entity type with hit/miss counters.
+
+    ``get_or_load`` returns the cached value or awaits ``load`` and stores its
+    result; ``None`` results are not cached. Writers call ``invalidate`` after
+    committing. A load that overlaps an invalidation in this process is
+    returned but not stored, so it cannot put back the value just replaced.
+    """
+
+    def __init__(self, name: str, ttl: float, max_entries: int, client=None):
+        self.name = name
+        self.ttl = ttl
+        self.backend = (
+            LocalBackend(max_entries) if client is None else RedisBackend(client, name)
+        )
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+
+    async def get_or_load(self, key: Hashable, load: Callable[[], Awaitable[Any]]):
+        if self.ttl <= 0:
+            return await load()
+        value = await self.backend.get(key)
+        if value is not MISSING:
+            self.hits += 1
+            return value
+        self.misses += 1
+        generation = self.generation
+        value = await load()
+        if value is not None and generation == self.generation:
+            await self.backend.set(key, value, self.ttl)
+        return value
+
+    async def invalidate(self, *keys: Hashable) -> None:
+        self.generation += 1
+        await self.backend.delete(*keys)
+
+    async def clear(self) -> None:
+        self.generation += 1
+        await self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": (
+                len(self.backend) if isinstance(self.backend, LocalBackend) else None
+            ),
+        }
+
+
+_client = redis_client(config.CACHE_URL) if config.CACHE_URL else None
+
+user_cache = Cache("user", config.CACHE_USER_TTL, config.CACHE_MAX_ENTRIES, _client)
+post_cache = Cache("post", config.CACHE_POST_TTL, config.CACHE_MAX_ENTRIES, _client)
+# Tag and category lists are cached whole under a single key
+tag_cache = Cache("tag", config.CACHE_TAXONOMY_TTL, 1, _client)
+category_cache = Cache("category", config.CACHE_TAXONOMY_TTL, 1, _client)
+
+CACHES = {
+    cache.name: cache for cache in (user_cache, post_cache, tag_cache, category_cache)
+}
+ALL = "all"
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: cache.stats() for name, cache in CACHES.items()}
+
+
+async def clear_caches() -> None:
+    for cache in CACHES.values():
+        await cache.clear()
@@ -3,6 +3,7 @@ from typing import List
 from server.db.models import Category
 from server.schemas.category import CategoryCreate
 from server.db.session import get_session
+from server.services.cache import ALL, category_cache
 
 
 async def create_category(data: CategoryCreate) -> Category:
@@ -11,10 +12,15 @@ async def create_category(data: CategoryCreate) -> Category:
         session.add(category)
         await session.commit()
         await session.refresh(category)
-        return category
+    await category_cache.invalidate(ALL)
+    return category
 
 
-async def get_all_categories() -> List[Category]:
+async def _load_categories() -> List[Category]:
     async with get_session() as session:
         result = await session.exec(select(Category))
         return result.all()
+
+
+async def get_all_categories() -> List[Category]:
+    return await category_cache.get_or_load(ALL, _load_categories)
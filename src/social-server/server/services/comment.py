@@ -1,23 +1,89 @@
+from typing import Any, List, Optional, Tuple
 from sqlmodel import select
-from server.db.models import Comment
+from server.db.models import Comment, Post, User
 from server.db.session import get_session
+from server.common.pagination import clamp_limit, page_of, paginate
+from server.schemas.bulk import BulkCreateResult
 from server.schemas.comment import CommentCreate
+from server.services.activity import activity_event, publish_activity
+from server.services.bulk import BulkBatch
+from server.services.cache import post_cache
+from server.services.counters import add_comments
+from server.services.events import record_notification
+from server.services.search import index_comments, unindex_comment
+
+
+def _activity(comment: Comment) -> dict:
+    return activity_event(
+        "comment",
+        comment.id,
+        comment.user_id,
+        comment.created_at,
+        post_id=comment.post_id,
+    )
 
 
 async def create_comment(comment_data: CommentCreate):
     async with get_session() as session:
         comment = Comment(**comment_data.model_dump())
         session.add(comment)
+        await add_comments(session, [comment.post_id])
+        await session.flush()
+        await index_comments(session, [comment.id])
         await session.commit()
         await session.refresh(comment)
-        return comment
+    # Cached posts carry the comment counter
+    await post_cache.invalidate(comment.post_id)
+    await record_notification("comment", comment.user_id, post_id=comment.post_id)
+    await publish_activity(_activity(comment))
+    return comment
 
 
-async def get_comments_for_post(post_id: int):
+async def create_comments_bulk(items: List[Any]) -> BulkCreateResult:
+    batch = BulkBatch(items, CommentCreate)
     async with get_session() as session:
-        result = await session.exec(
-            select(Comment)
-            .where(Comment.post_id == post_id)
-            .order_by(Comment.created_at)
+        await batch.require_existing(session, Post, "post_id")
+        await batch.require_existing(session, User, "user_id")
+        comments = await batch.insert(
+            session, lambda data: Comment(**data.model_dump())
         )
-        return result.all()
+        await add_comments(session, [comment.post_id for comment in comments])
+        await index_comments(session, [comment.id for comment in comments])
+        await session.commit()
+    await post_cache.invalidate(*{comment.post_id for comment in comments})
+    for comment in comments:
+        await record_notification("comment", comment.user_id, post_id=comment.post_id)
+    await publish_activity(*map(_activity, comments))
+    return batch.result()
+
+
+async def delete_comment(comment_id: int):
+    async with get_session() as session:
+        result = await session.exec(select(Comment).where(Comment.id == comment_id))
+        comment = result.first()
+        if not comment:
+            return False
+        await session.delete(comment)
+        await add_comments(session, [comment.post_id], sign=-1)
+        await unindex_comment(session, comment_id)
+        await session.commit()
+    await post_cache.invalidate(comment.post_id)
+    return True
+
+
+COMMENT_ORDER = [Comment.created_at, Comment.id]
+
+
+async def get_comments_for_post(
+    post_id: int, cursor: Optional[str] = None, limit: Optional[int] = None
+) -> Tuple[List[Comment], Optional[str]]:
+    limit = clamp_limit(limit)
+    statement = paginate(
+        select(Comment).where(Comment.post_id == post_id),
+        COMMENT_ORDER,
+        cursor,
+        limit,
+    )
+    async with get_session() as session:
+        result = await session.exec(statement)
+        return page_of(result.all(), COMMENT_ORDER, limit)
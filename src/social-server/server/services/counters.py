@@ -0,0 +1,123 @@
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import bindparam, func
+from sqlmodel import select
+from server.db.models import Comment, Post, Reaction
+
+post_table = Post.__table__
+
+REPAIR_BATCH_SIZE = 10_000
+
+
+def _bump(column):
+    return (
+        post_table.update()
+        .where(post_table.c.id == bindparam("post_key"))
+        .values({column.key: column + bindparam("delta")})
+    )
+
+
+async def add_comments(session, post_ids: Iterable[int], sign: int = 1) -> None:
+    """Add one to ``comment_count`` per occurrence of a post id (``sign=-1`` removes)."""
+    deltas = Counter(post_ids)
+    if deltas:
+        await session.exec(
+            _bump(post_table.c.comment_count),
+            params=[
+                {"post_key": post_id, "delta": sign * n}
+                for post_id, n in sorted(deltas.items())
+            ],
+        )
+
+
+async def add_reactions(
+    session, reactions: Iterable[Tuple[int, str]], sign: int = 1
+) -> None:
+    """Count ``(post_id, type)`` pairs into ``reaction_count`` and ``reaction_counts``.
+
+    The total is bumped first: that UPDATE takes the row lock, so the
+    read-modify-write of the per-type breakdown that follows cannot interleave
+    with another writer. Posts are touched in id order to avoid deadlocks.
+    """
+    deltas = Counter(reactions)
+    per_post = Counter()
+    for (post_id, _), n in deltas.items():
+        per_post[post_id] += n
+    if not per_post:
+        return
+
+    await session.exec(
+        _bump(post_table.c.reaction_count),
+        params=[
+            {"post_key": post_id, "delta": sign * n}
+            for post_id, n in sorted(per_post.items())
+        ],
+    )
+    result = await session.exec(
+        select(Post.id, Post.reaction_counts).where(Post.id.in_(per_post))
+    )
+    breakdowns = {post_id: dict(counts or {}) for post_id, counts in result.all()}
+    for (post_id, reaction_type), n in deltas.items():
+        counts = breakdowns.get(post_id)
+        if counts is None:
+            continue
+        counts[reaction_type] = counts.get(reaction_type, 0) + sign * n
+        if counts[reaction_type] <= 0:
+            del counts[reaction_type]
+    await _write_breakdowns(session, breakdowns)
+
+
+async def _write_breakdowns(session, breakdowns: Dict[int, dict]) -> None:
+    if breakdowns:
+        await session.exec(
+            post_table.update()
+            .where(post_table.c.id == bindparam("post_key"))
+            .values(reaction_counts=bindparam("counts")),
+            params=[
+                {"post_key": post_id, "counts": counts}
+                for post_id, counts in sorted(breakdowns.items())
+            ],
+        )
+
+
+async def recompute_counters(session, post_ids: Optional[Iterable[int]] = None) -> int:
+    """Rebuild the engagement counters from Comment and Reaction rows.
+
+    Covers every post unless ``post_ids`` is given. Totals are set with one
+    correlated UPDATE; breakdowns are rebuilt from a single GROUP BY and
+    written back ``REPAIR_BATCH_SIZE`` posts at a time. Returns the number of
+    posts whose totals were rewritten.
+    """
+    comments = (
+        select(func.count()).where(Comment.post_id == post_table.c.id).scalar_subquery()
+    )
+    reactions = (
+        select(func.count())
+        .where(Reaction.post_id == post_table.c.id)
+        .scalar_subquery()
+    )
+    reset = post_table.update().values(
+        comment_count=comments, reaction_count=reactions, reaction_counts={}
+    )
+    breakdown = (
+        select(Reaction.post_id, Reaction.type, func.count())
+        .group_by(Reaction.post_id, Reaction.type)
+        .order_by(Reaction.post_id)
+    )
+    if post_ids is not None:
+        post_ids = set(post_ids)
+        reset = reset.where(post_table.c.id.in_(post_ids))
+        breakdown = breakdown.where(Reaction.post_id.in_(post_ids))
+
+    result = await session.exec(reset)
+    updated = result.rowcount
+
+    result = await session.stream(breakdown)
+    breakdowns: Dict[int, dict] = {}
+    async for post_id, reaction_type, count in result:
+        if post_id not in breakdowns and len(breakdowns) >= REPAIR_BATCH_SIZE:
+            await _write_breakdowns(session, breakdowns)
+            breakdowns = {}
+        breakdowns.setdefault(post_id, {})[reaction_type] = count
+    await _write_breakdowns(session, breakdowns)
+    return updated
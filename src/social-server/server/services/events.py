@@ -0,0 +1,195 @@
+import asyncio
+import logging
+from collections import defaultdict
+from contextlib import suppress
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, insert
+
+from server.common import config
+from server.db.models import User, UserPostViewHistory
+from server.db.session import get_session
+from server.services.notification import write_notifications
+
+logger = logging.getLogger(__name__)
+
+
+user_table = User.__table__
+
+_touch_user = (
+    user_table.update()
+    .where(user_table.c.id == bindparam("user_key"))
+    .values(last_active_at=bindparam("seen_at"))
+)
+
+
+async def _insert_views(session, rows: List[dict]) -> None:
+    await session.exec(insert(UserPostViewHistory), params=rows)
+
+
+async def _touch_users(session, rows: List[dict]) -> None:
+    # One update per reader, to their latest read in the batch
+    latest: Dict[int, datetime] = {}
+    for row in rows:
+        latest[row["user_id"]] = max(
+            row["seen_at"], latest.get(row["user_id"], row["seen_at"])
+        )
+    await session.exec(
+        _touch_user,
+        params=[
+            {"user_key": user_id, "seen_at": seen_at}
+            for user_id, seen_at in sorted(latest.items())
+        ],
+    )
+
+
+# Each kind of event is written once per batch, with every queued event of
+# that kind, inside the batch's transaction
+WRITERS = {
+    "view": _insert_views,
+    "active": _touch_users,
+    "notification": write_notifications,
+}
+
+Event = Tuple[str, dict]
+
+
+class EventLog:
+    """Write-behind queue for rows that no request reads back right away.
+
+    ``record`` puts an event on a bounded queue and returns; a background
+    task writes them in one transaction per batch, once ``batch_size`` events
+    are waiting or the oldest has waited ``flush_seconds``. A full queue makes
+    ``record`` wait for room, which slows producers to the database's pace
+    instead of buffering without limit. Until ``start`` and after ``stop``
+    events are written as they come.
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_seconds: Optional[float] = None,
+    ):
+        self.max_size = max_size or config.EVENT_QUEUE_SIZE
+        self.batch_size = batch_size or config.EVENT_BATCH_SIZE
+        self.flush_seconds = (
+            flush_seconds if flush_seconds is not None else config.EVENT_FLUSH_SECONDS
+        )
+        self.written = self.failed = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._filled = asyncio.Event()
+        self._collected = 0
+        self._closing = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(self.max_size)
+        self._filled = asyncio.Event()
+        self._closing = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Write everything queued so far, then go back to writing inline."""
+        if not self.running:
+            return
+        task, self._task = self._task, None
+        self._closing = True
+        self._filled.set()
+        await self._queue.put(None)
+        await task
+
+    async def record(self, kind: str, **params) -> None:
+        if kind not in WRITERS:
+            raise ValueError(f"Unknown event kind {kind!r}")
+        if not self.running:
+            await self._write([(kind, params)])
+            return
+        if self._queue.full():
+            self._filled.set()
+        await self._queue.put((kind, params))
+        if self._collected + self._queue.qsize() >= self.batch_size:
+            self._filled.set()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            event = await self._queue.get()
+            if event is None:
+                return
+            batch = [event]
+            deadline = loop.time() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                try:
+                    event = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0 or self._closing:
+                        break
+                    self._collected = len(batch)
+                    self._filled.clear()
+                    with suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(self._filled.wait(), remaining)
+                    continue
+                if event is None:
+                    await self._write(batch)
+                    return
+                batch.append(event)
+            self._collected = 0
+            await self._write(batch)
+
+    async def _write(self, batch: List[Event]) -> None:
+        by_kind: Dict[str, List[dict]] = defaultdict(list)
+        for kind, params in batch:
+            by_kind[kind].append(params)
+        try:
+            async with get_session() as session:
+                for kind, rows in by_kind.items():
+                    await WRITERS[kind](session, rows)
+                await session.commit()
+        except Exception:
+            # Losing a batch of views or notifications beats stalling the queue
+            self.failed += len(batch)
+            logger.exception("Dropped %d events the database refused", len(batch))
+        else:
+            self.written += len(batch)
+
+
+event_log = EventLog()
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def record_view(user_id: int, post_id: int) -> None:
+    await event_log.record("view", user_id=user_id, post_id=post_id, viewed_at=_now())
+
+
+async def record_active(user_id: int) -> None:
+    """Note that ``user_id`` opened their feed, see ``User.last_active_at``."""
+    await event_log.record("active", user_id=user_id, seen_at=_now())
+
+
+async def record_notification(
+    type: str,
+    actor_id: int,
+    user_id: Optional[int] = None,
+    post_id: Optional[int] = None,
+) -> None:
+    """Queue a notification for ``user_id``, or for the author of ``post_id``."""
+    await event_log.record(
+        "notification",
+        type=type,
+        actor_id=actor_id,
+        user_id=user_id,
+        post_id=post_id,
+        created_at=_now(),
+    )
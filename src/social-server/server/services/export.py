@@ -0,0 +1,54 @@
+import json
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from sqlmodel import select
+from server.db.models import Follow, Friendship, Post, Reaction
+from server.db.session import get_session
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+EXPORT_BATCH_SIZE = 1_000  # rows fetched, encoded and sent per chunk
+
+EXPORTS = {
+    "posts": Post,
+    "reactions": Reaction,
+    "follows": Follow,
+    "friendships": Friendship,
+}
+
+
+def _encode(record: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_UTC_Z)
+    return json.dumps(record, default=datetime.isoformat).encode()
+
+
+def export_query(
+    model, since: Optional[datetime] = None, after_id: Optional[int] = None
+):
+    statement = select(*model.__table__.c).order_by(model.id)
+    if since is not None:
+        statement = statement.where(model.created_at >= since)
+    if after_id is not None:
+        statement = statement.where(model.id > after_id)
+    return statement
+
+
+async def stream_ndjson(statement) -> AsyncIterator[bytes]:
+    """Yield the rows of ``statement`` as NDJSON, one chunk per batch.
+
+    Rows come off a server-side cursor ``EXPORT_BATCH_SIZE`` at a time, so
+    memory stays flat however many rows the table holds.
+    """
+    async with get_session() as session:
+        result = await session.stream(
+            statement.execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        fields = None
+        async for rows in result.partitions():
+            fields = fields or tuple(result.keys())
+            yield b"".join(_encode(dict(zip(fields, row))) + b"\n" for row in rows)
@@ -1,17 +1,40 @@
 from typing import List
 from sqlmodel import select
+from sqlalchemy.exc import IntegrityError
+from server.db.engine import is_unique_violation
 from server.db.models import Follow
 from server.db.session import get_session
 from server.schemas.follow import FollowCreate
+from server.services.activity import activity_event, publish_activity
+from server.services.events import record_notification
+from server.services.graph import index as graph
 
 
 async def create_follow(follow_data: FollowCreate):
     async with get_session() as session:
         new_follow = Follow(**follow_data.model_dump())
         session.add(new_follow)
-        await session.commit()
+        try:
+            await session.commit()
+        except IntegrityError as error:
+            if is_unique_violation(error):
+                return None  # already following
+            raise
         await session.refresh(new_follow)
-        return new_follow
+        graph.follow_changed(new_follow.follower_id, new_follow.following_id, True)
+    await record_notification(
+        "follow", new_follow.follower_id, user_id=new_follow.following_id
+    )
+    await publish_activity(
+        activity_event(
+            "follow",
+            new_follow.id,
+            new_follow.follower_id,
+            new_follow.created_at,
+            user_id=new_follow.following_id,
+        )
+    )
+    return new_follow
 
 
 async def get_follow_by_id(follow_id: int):
@@ -42,4 +65,5 @@ async def delete_follow(follow_id: int):
             return False
         await session.delete(follow)
         await session.commit()
+        graph.follow_changed(follow.follower_id, follow.following_id, False)
         return True
@@ -1,17 +1,72 @@
-from typing import List
+from typing import List, Optional, Tuple
 from sqlmodel import select
+from sqlalchemy import union_all
+from sqlalchemy.exc import IntegrityError
+from server.db.engine import is_unique_violation
 from server.db.models import Friendship
 from server.db.session import get_session
 from server.schemas.friendship import FriendshipCreate, FriendshipUpdate
+from server.services.events import record_notification
+from server.services.graph import index as graph
+
+# A request is answered once; an accepted friendship can still turn into a
+# block. Undoing either means deleting the row
+TRANSITIONS = {
+    "requested": {"accepted", "blocked"},
+    "accepted": {"blocked"},
+    "blocked": set(),
+}
+
+
+class FriendshipTransitionError(ValueError):
+    pass
+
+
+def ordered_pair(user_id: int, friend_id: int) -> Tuple[int, int]:
+    """The pair as stored: one row per two users, lower id first."""
+    return (user_id, friend_id) if user_id < friend_id else (friend_id, user_id)
+
+
+def accepted_friend_ids(user_id: int):
+    # A friend can sit on either side of the ordered pair, never on both
+    return union_all(
+        select(Friendship.friend_id.label("user_id")).where(
+            (Friendship.user_id == user_id) & (Friendship.status == "accepted")
+        ),
+        select(Friendship.user_id.label("user_id")).where(
+            (Friendship.friend_id == user_id) & (Friendship.status == "accepted")
+        ),
+    )
 
 
 async def create_friendship(data: FriendshipCreate):
+    """Store a friendship between two users; ``None`` if the pair already has one."""
+    if data.user_id == data.friend_id:
+        return None
+    user_id, friend_id = ordered_pair(data.user_id, data.friend_id)
     async with get_session() as session:
-        friendship = Friendship(**data.model_dump())
+        friendship = Friendship(
+            user_id=user_id,
+            friend_id=friend_id,
+            requester_id=data.user_id,
+            status=data.status,
+        )
         session.add(friendship)
-        await session.commit()
+        try:
+            await session.commit()
+        except IntegrityError as error:
+            if is_unique_violation(error):
+                return None  # the pair already has a row, in either direction
+            raise
         await session.refresh(friendship)
-        return friendship
+        graph.friendship_changed(
+            friendship.user_id, friendship.friend_id, friendship.status
+        )
+    if friendship.status == "requested":
+        await record_notification(
+            "friend_request", data.user_id, user_id=data.friend_id
+        )
+    return friendship
 
 
 async def get_friendship_by_id(friendship_id: int):
@@ -22,15 +77,43 @@ async def get_friendship_by_id(friendship_id: int):
         return result.first()
 
 
+async def get_friendship_between(user_id: int, other_id: int) -> Optional[Friendship]:
+    user_id, friend_id = ordered_pair(user_id, other_id)
+    async with get_session() as session:
+        result = await session.exec(
+            select(Friendship).where(
+                (Friendship.user_id == user_id) & (Friendship.friend_id == friend_id)
+            )
+        )
+        return result.first()
+
+
 async def get_friendships_for_user(user_id: int) -> List[Friendship]:
     async with get_session() as session:
         result = await session.exec(
-            select(Friendship).where(Friendship.user_id == user_id)
+            select(Friendship)
+            .where((Friendship.user_id == user_id) | (Friendship.friend_id == user_id))
+            .order_by(Friendship.id)
+        )
+        return result.all()
+
+
+async def get_friend_ids(user_id: int) -> List[int]:
+    """Ids of ``user_id``'s accepted friends, read off the two pair indexes."""
+    async with get_session() as session:
+        friends = accepted_friend_ids(user_id).subquery()
+        result = await session.exec(
+            select(friends.c.user_id).order_by(friends.c.user_id)
         )
         return result.all()
 
 
 async def update_friendship(friendship_id: int, data: FriendshipUpdate):
+    """Move a friendship along ``TRANSITIONS``.
+
+    Returns ``None`` if there is no such friendship and raises
+    ``FriendshipTransitionError`` for a move the status does not allow.
+    """
     async with get_session() as session:
         result = await session.exec(
             select(Friendship).where(Friendship.id == friendship_id)
@@ -38,11 +121,28 @@ async def update_friendship(friendship_id: int, data: FriendshipUpdate):
         friendship = result.first()
         if not friendship:
             return None
-        for key, value in data.model_dump(exclude_unset=True).items():
-            setattr(friendship, key, value)
+        status = data.status
+        if status is None or status == friendship.status:
+            return friendship
+        if status not in TRANSITIONS[friendship.status]:
+            raise FriendshipTransitionError(
+                f"Cannot change a {friendship.status} friendship to {status}"
+            )
+        friendship.status = status
         await session.commit()
         await session.refresh(friendship)
-        return friendship
+        graph.friendship_changed(
+            friendship.user_id, friendship.friend_id, friendship.status
+        )
+    if status == "accepted":
+        requester = friendship.requester_id
+        other = (
+            friendship.friend_id
+            if requester == friendship.user_id
+            else friendship.user_id
+        )
+        await record_notification("friend_accepted", other, user_id=requester)
+    return friendship
 
 
 async def delete_friendship(friendship_id: int):
@@ -55,4 +155,5 @@ async def delete_friendship(friendship_id: int):
             return False
         await session.delete(friendship)
         await session.commit()
+        graph.friendship_changed(friendship.user_id, friendship.friend_id, None)
         return True
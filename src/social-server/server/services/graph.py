@@ -0,0 +1,240 @@
+import asyncio
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlmodel import select
+
+from server.common import config
+from server.db.models import Follow, Friendship
+from server.db.session import get_session
+
+EMPTY = np.empty(0, np.int64)
+
+
+class Adjacency:
+    """Directed edges as sorted neighbour arrays in CSR form.
+
+    ``indices[indptr[u]:indptr[u + 1]]`` holds the neighbours of ``u`` as of
+    the build; edges added or removed since then live in small per-node sets
+    until the next build, so writes never reshuffle the arrays.
+    """
+
+    def __init__(self, sources: np.ndarray = EMPTY, targets: np.ndarray = EMPTY):
+        order = np.lexsort((targets, sources))
+        sources, targets = sources[order], targets[order]
+        if len(sources):
+            keep = np.ones(len(sources), bool)
+            keep[1:] = (sources[1:] != sources[:-1]) | (targets[1:] != targets[:-1])
+            sources, targets = sources[keep], targets[keep]
+        size = int(sources[-1]) + 1 if len(sources) else 0
+        self.indptr = np.zeros(size + 1, np.int64)
+        np.cumsum(np.bincount(sources, minlength=size), out=self.indptr[1:])
+        self.indices = targets
+        self.added: Dict[int, Set[int]] = {}
+        self.removed: Dict[int, Set[int]] = {}
+
+    def _row(self, node: int) -> np.ndarray:
+        if 0 <= node < len(self.indptr) - 1:
+            return self.indices[self.indptr[node] : self.indptr[node + 1]]
+        return EMPTY
+
+    def _built(self, node: int, other: int) -> bool:
+        row = self._row(node)
+        at = np.searchsorted(row, other)
+        return at < len(row) and row[at] == other
+
+    def has(self, node: int, other: int) -> bool:
+        if other in self.added.get(node, ()):
+            return True
+        if other in self.removed.get(node, ()):
+            return False
+        return bool(self._built(node, other))
+
+    def add(self, node: int, other: int) -> None:
+        if self._built(node, other):
+            self.removed.get(node, set()).discard(other)
+        else:
+            self.added.setdefault(node, set()).add(other)
+
+    def remove(self, node: int, other: int) -> None:
+        if self._built(node, other):
+            self.removed.setdefault(node, set()).add(other)
+        else:
+            self.added.get(node, set()).discard(other)
+
+    def degree(self, node: int) -> int:
+        return (
+            len(self._row(node))
+            + len(self.added.get(node, ()))
+            - len(self.removed.get(node, ()))
+        )
+
+    def neighbours(self, node: int) -> np.ndarray:
+        """Sorted neighbour ids of ``node``."""
+        row = self._row(node)
+        removed, added = self.removed.get(node), self.added.get(node)
+        if removed:
+            row = row[~np.isin(row, list(removed))]
+        if added:
+            row = np.union1d(row, np.fromiter(added, np.int64, len(added)))
+        return row
+
+
+def _columns(rows, width: int) -> List[np.ndarray]:
+    if not rows:
+        return [EMPTY] * width
+    return [np.array(column, np.int64) for column in zip(*rows)]
+
+
+class GraphIndex:
+    """Follows and accepted friendships of every user, held in memory.
+
+    Built from the tables on first use and again once older than
+    ``GRAPH_MAX_AGE_SECONDS``; the follow and friendship services report
+    their writes after commit, so this process sees them straight away.
+    """
+
+    def __init__(self, max_age: Optional[float] = None):
+        self.max_age = max_age
+        self.reset()
+
+    def reset(self) -> None:
+        self.following = Adjacency()
+        self.followers = Adjacency()
+        # Accepted friends, and anyone with a friendship row in any status
+        self.friends = Adjacency()
+        self.linked = Adjacency()
+        self.built_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        # Writes reported while a build reads the tables, replayed onto it
+        self._pending: Optional[List[Tuple]] = None
+
+    @property
+    def stale(self) -> bool:
+        if self.built_at is None:
+            return True
+        max_age = (
+            self.max_age if self.max_age is not None else config.GRAPH_MAX_AGE_SECONDS
+        )
+        return max_age > 0 and time.monotonic() - self.built_at > max_age
+
+    async def ready(self) -> "GraphIndex":
+        if self.stale:
+            async with self._lock:
+                if self.stale:
+                    await self.build()
+        return self
+
+    async def build(self) -> None:
+        self._pending = []
+        try:
+            async with get_session() as session:
+                result = await session.exec(
+                    select(Follow.follower_id, Follow.following_id)
+                )
+                followers, followings = _columns(result.all(), 2)
+                result = await session.exec(
+                    select(
+                        Friendship.user_id,
+                        Friendship.friend_id,
+                        Friendship.status == "accepted",
+                    )
+                )
+                users, friends, accepted = _columns(result.all(), 3)
+            accepted = accepted.astype(bool)
+            self.following = Adjacency(followers, followings)
+            self.followers = Adjacency(followings, followers)
+            # One row per pair, both ends see the other
+            self.friends = Adjacency(
+                np.concatenate([users[accepted], friends[accepted]]),
+                np.concatenate([friends[accepted], users[accepted]]),
+            )
+            self.linked = Adjacency(
+                np.concatenate([users, friends]), np.concatenate([friends, users])
+            )
+            self.built_at = time.monotonic()
+            for change in self._pending:
+                self._apply(*change)
+        finally:
+            self._pending = None
+
+    def _apply(self, kind: str, a: int, b: int, state) -> None:
+        # state: whether a follow exists, or the pair's friendship status
+        if kind == "follow":
+            for edges, node, other in ((self.following, a, b), (self.followers, b, a)):
+                if state:
+                    edges.add(node, other)
+                else:
+                    edges.remove(node, other)
+            return
+        for edges, present in (
+            (self.friends, state == "accepted"),
+            (self.linked, state),
+        ):
+            for node, other in ((a, b), (b, a)):
+                if present:
+                    edges.add(node, other)
+                else:
+                    edges.remove(node, other)
+
+    def _report(self, *change) -> None:
+        if self._pending is not None:
+            self._pending.append(change)
+        if self.built_at is not None:
+            self._apply(*change)
+
+    def follow_changed(self, follower_id: int, following_id: int, exists: bool):
+        self._report("follow", follower_id, following_id, exists)
+
+    def friendship_changed(self, user_id: int, friend_id: int, status: Optional[str]):
+        """Report a pair's friendship status after a write, ``None`` once deleted."""
+        self._report("friendship", user_id, friend_id, status)
+
+
+index = GraphIndex()
+
+
+async def get_counts(user_id: int) -> Dict[str, int]:
+    graph = await index.ready()
+    return {
+        "user_id": user_id,
+        "followers": graph.followers.degree(user_id),
+        "following": graph.following.degree(user_id),
+        "friends": graph.friends.degree(user_id),
+    }
+
+
+async def is_following(user_id: int, target_ids: Iterable[int]) -> Dict[int, bool]:
+    graph = await index.ready()
+    return {target: graph.following.has(user_id, target) for target in target_ids}
+
+
+async def get_mutual_friends(user_id: int, other_id: int) -> List[int]:
+    graph = await index.ready()
+    return np.intersect1d(
+        graph.friends.neighbours(user_id),
+        graph.friends.neighbours(other_id),
+        assume_unique=True,
+    ).tolist()
+
+
+async def get_friend_suggestions(user_id: int, limit: int) -> List[Tuple[int, int]]:
+    """People two friendship hops away, as ``(user_id, mutual friends)``.
+
+    Ranked by mutual friends, then id. Existing friends, pending requests and
+    blocks in either direction are left out.
+    """
+    graph = await index.ready()
+    friends = graph.friends.neighbours(user_id)
+    if not len(friends):
+        return []
+    reach = np.concatenate([graph.friends.neighbours(friend) for friend in friends])
+    candidates, shared = np.unique(reach, return_counts=True)
+    keep = (candidates != user_id) & ~np.isin(
+        candidates, graph.linked.neighbours(user_id)
+    )
+    candidates, shared = candidates[keep], shared[keep]
+    # np.unique sorted by id, a stable sort on the counts keeps that as tiebreak
+    best = np.argsort(-shared, kind="stable")[:limit]
+    return list(zip(candidates[best].tolist(), shared[best].tolist()))
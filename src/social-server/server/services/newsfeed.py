@@ -0,0 +1,282 @@
+from sqlalchemy import cast, exists, func, insert, literal, null, union_all
+from typing import Dict, List, Optional, Set
+from sqlmodel import select
+from server.common import config
+from server.common.fast_json import read_columns
+from server.common.pagination import paginate
+from server.db.models import (
+    Category,
+    Follow,
+    Friendship,
+    Post,
+    PostCategory,
+    PostTag,
+    Tag,
+    User,
+    UserFeed,
+)
+from server.schemas.post import PostRead
+from server.services.visibility import FRIENDS_VISIBILITIES, only_visible_entries
+
+# Keyset order of a reader's feed; pulled rows have no id, so post_id breaks ties
+FEED_ORDER = [UserFeed.added_at, UserFeed.post_id]
+
+FEED_COLUMNS = [
+    "user_id",
+    "post_id",
+    "added_at",
+    "source_type",
+    "is_seen",
+    "visibility",
+]
+
+
+def fan_out_select(posts: List[Post]):
+    """Select the ``FEED_COLUMNS`` rows that fan ``posts`` out to their readers.
+
+    Friends see public and friends-only posts, followers only public ones whose
+    ``followers_fanned_out`` flag is set. A reader who is both a friend and a
+    follower gets a single ``friend`` entry. Private posts reach nobody.
+    """
+    post_ids = [post.id for post in posts]
+    author_ids = {post.user_id for post in posts}
+    accepted = Friendship.status == "accepted"
+
+    def friend_rows(author_col, reader_col):
+        return (
+            select(
+                reader_col,
+                Post.id,
+                Post.created_at,
+                literal("friend"),
+                literal(False),
+                Post.visibility,
+            )
+            .join(Friendship, author_col == Post.user_id)
+            .where(
+                Post.id.in_(post_ids)
+                & Post.visibility.in_(("public",) + FRIENDS_VISIBILITIES)
+                & author_col.in_(author_ids)
+                & accepted
+                & (reader_col != Post.user_id)
+            )
+        )
+
+    is_friend = exists().where(
+        accepted
+        & (
+            (
+                (Friendship.user_id == Post.user_id)
+                & (Friendship.friend_id == Follow.follower_id)
+            )
+            | (
+                (Friendship.friend_id == Post.user_id)
+                & (Friendship.user_id == Follow.follower_id)
+            )
+        )
+    )
+    follower_rows = (
+        select(
+            Follow.follower_id,
+            Post.id,
+            Post.created_at,
+            literal("follow"),
+            literal(False),
+            Post.visibility,
+        )
+        .join(Follow, Follow.following_id == Post.user_id)
+        .where(
+            Post.id.in_(post_ids)
+            & (Post.visibility == "public")
+            & (Post.followers_fanned_out == True)  # noqa: E712
+            & (Follow.follower_id != Post.user_id)
+            & ~is_friend
+        )
+    )
+
+    # A friend sits on either side of the ordered pair, never on both, and
+    # follower rows leave friends out, so the parts never overlap
+    return union_all(
+        friend_rows(Friendship.user_id, Friendship.friend_id),
+        friend_rows(Friendship.friend_id, Friendship.user_id),
+        follower_rows,
+    )
+
+
+async def celebrity_authors(session, author_ids) -> Set[int]:
+    if not author_ids:
+        return set()
+    result = await session.exec(
+        select(Follow.following_id)
+        .where(Follow.following_id.in_(author_ids))
+        .group_by(Follow.following_id)
+        .having(func.count() > config.CELEBRITY_FOLLOWER_THRESHOLD)
+    )
+    return set(result.all())
+
+
+async def fan_out_posts(session, posts: List[Post]) -> None:
+    """Push ``posts`` into their readers' feeds with a single INSERT ... SELECT.
+
+    Runs inside the caller's transaction so the posts and their feed entries
+    commit together. ``posts`` must already be flushed so their ids are known.
+    Public posts by authors above ``CELEBRITY_FOLLOWER_THRESHOLD`` only go to
+    friends; followers pick them up in ``feed_query`` instead.
+    """
+    if not posts:
+        return
+
+    public = [post for post in posts if post.visibility == "public"]
+    celebrities = await celebrity_authors(session, {post.user_id for post in public})
+    for post in public:
+        if post.user_id in celebrities:
+            post.followers_fanned_out = False
+    # The INSERT ... SELECT reads the flag back from the post table
+    await session.flush()
+
+    await session.exec(
+        insert(UserFeed).from_select(FEED_COLUMNS, fan_out_select(posts))
+    )
+
+
+async def fan_out_post(session, post: Post) -> None:
+    await fan_out_posts(session, [post])
+
+
+def stored_entries(user_id: int):
+    """A reader's stored ``UserFeed`` rows, less posts they may no longer see."""
+    entries = select(
+        UserFeed.id,
+        UserFeed.user_id,
+        UserFeed.post_id,
+        UserFeed.added_at,
+        UserFeed.rank_score,
+        UserFeed.source_type,
+        UserFeed.is_seen,
+        UserFeed.visibility,
+    ).where(UserFeed.user_id == user_id)
+    return only_visible_entries(entries, user_id)
+
+
+def pulled_entries(user_id: int):
+    """Public posts by followed celebrity authors, shaped like ``UserFeed`` rows.
+
+    Pulled entries carry ``id=None`` and otherwise match what a full fan-out
+    would have written: only posts written once the reader followed, since a
+    fan-out reaches the followers of the moment. Posts the reader already has
+    a stored entry for (e.g. as a friend) are left out.
+    """
+    return (
+        select(
+            # Typed NULLs, PostgreSQL will not unify an untyped NULL with integer
+            cast(null(), UserFeed.__table__.c.id.type).label("id"),
+            literal(user_id).label("user_id"),
+            Post.id.label("post_id"),
+            Post.created_at.label("added_at"),
+            cast(null(), UserFeed.__table__.c.rank_score.type).label("rank_score"),
+            literal("follow").label("source_type"),
+            literal(False).label("is_seen"),
+            Post.visibility,
+        )
+        .join(Follow, Follow.following_id == Post.user_id)
+        .where(
+            (Follow.follower_id == user_id)
+            & (Follow.created_at <= Post.created_at)
+            & (Post.user_id != user_id)
+            & (Post.followers_fanned_out == False)  # noqa: E712
+            & (Post.visibility == "public")
+            & ~exists().where(
+                (UserFeed.user_id == user_id) & (UserFeed.post_id == Post.id)
+            )
+        )
+    )
+
+
+def feed_query(
+    user_id: int, cursor: Optional[str] = None, limit: int = config.DEFAULT_PAGE_SIZE
+):
+    """Select one page of a reader's feed, newest first, as ``UserFeed``-shaped rows.
+
+    Stored entries are merged with ``pulled_entries``. Both sides are
+    keyset-paginated on ``(added_at, post_id)`` before the merge, so a page
+    reads at most ``2 * (limit + 1)`` index entries.
+    """
+    stored = paginate(
+        stored_entries(user_id), FEED_ORDER, cursor, limit, descending=True
+    )
+    pulled = paginate(
+        pulled_entries(user_id),
+        [Post.created_at, Post.id],
+        cursor,
+        limit,
+        descending=True,
+    )
+
+    # SQLite only accepts ORDER BY/LIMIT inside a compound through subqueries
+    feed = union_all(
+        select(*stored.subquery().c), select(*pulled.subquery().c)
+    ).subquery()
+    feed_order = [feed.c.added_at, feed.c.post_id]
+    return paginate(select(*feed.c), feed_order, None, limit, descending=True)
+
+
+async def hydrate_posts(session, post_ids, as_rows: bool = False) -> Dict[int, dict]:
+    """Load posts with author, counts, tags and categories in two statements.
+
+    Returns a dict per post id with ``post``, ``author_username``,
+    ``comment_count``, ``reaction_counts``, ``tags`` and ``categories``.
+    With ``as_rows`` each ``post`` is a plain row of the ``PostRead`` columns
+    instead of a ``Post``.
+    """
+    post_ids = set(post_ids)
+    if not post_ids:
+        return {}
+
+    # Counts come from the denormalised columns on Post
+    columns = read_columns(Post, PostRead) if as_rows else [Post]
+    result = await session.exec(
+        select(*columns, User.username)
+        .join(User, User.id == Post.user_id)
+        .where(Post.id.in_(post_ids))
+    )
+    details = {
+        post.id: {
+            "post": post,
+            "author_username": username,
+            "comment_count": post.comment_count,
+            "reaction_counts": post.reaction_counts,
+            "tags": [],
+            "categories": [],
+        }
+        for post, username in (
+            (row, row.username) if as_rows else tuple(row) for row in result.all()
+        )
+    }
+
+    # Tags and categories share one round trip; tags carry an empty description
+    labels = union_all(
+        select(
+            PostTag.post_id,
+            literal("tags").label("kind"),
+            Tag.id,
+            Tag.name,
+            literal("").label("description"),
+        )
+        .join(Tag, Tag.id == PostTag.tag_id)
+        .where(PostTag.post_id.in_(post_ids)),
+        select(
+            PostCategory.post_id,
+            literal("categories"),
+            Category.id,
+            Category.name,
+            Category.description,
+        )
+        .join(Category, Category.id == PostCategory.category_id)
+        .where(PostCategory.post_id.in_(post_ids)),
+    ).subquery()
+    result = await session.exec(select(*labels.c).order_by(labels.c.id))
+    for post_id, kind, label_id, name, description in result.all():
+        label = {"id": label_id, "name": name, "description": description}
+        details[post_id][kind].append(label)
+
+    return details
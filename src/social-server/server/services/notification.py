@@ -0,0 +1,219 @@
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, bindparam, func, or_, update
+from sqlmodel import select
+from server.db.models import Notification, Post, User
+from server.db.session import get_session
+from server.common.pagination import clamp_limit, page_of, paginate
+
+user_table = User.__table__
+
+UNREAD = Notification.read == False  # noqa: E712
+
+# Events of one type on one post (or on none, e.g. follows) fold into a
+# single unread row per recipient: "12 people reacted to your post"
+Key = Tuple[int, str, Optional[int]]
+# Actors remembered per row, so a repeat by one of them is not counted again
+RECENT_ACTORS = 10
+
+_bump_unread = (
+    user_table.update()
+    .where(user_table.c.id == bindparam("user_key"))
+    .values(
+        unread_notification_count=user_table.c.unread_notification_count
+        + bindparam("delta")
+    )
+)
+
+
+class Burst:
+    """Events for one key within a batch: distinct actors, latest last."""
+
+    def __init__(self):
+        self.actors: Dict[int, None] = {}
+        self.first_at: Optional[datetime] = None
+        self.last_at: Optional[datetime] = None
+
+    def add(self, actor_id: int, at: datetime) -> None:
+        self.actors.pop(actor_id, None)
+        self.actors[actor_id] = None
+        self.first_at = self.first_at or at
+        self.last_at = at
+
+    @property
+    def latest_actor(self) -> int:
+        return next(reversed(self.actors))
+
+    def recent(self, before: List[int] = ()) -> List[int]:
+        actors = list(reversed(self.actors))
+        return (actors + [a for a in before if a not in self.actors])[:RECENT_ACTORS]
+
+
+async def _recipients(session, events: List[dict]) -> List[dict]:
+    # Comments and reactions notify the post's author, read once per batch
+    post_ids = {e["post_id"] for e in events if e.get("user_id") is None}
+    authors = {}
+    if post_ids:
+        result = await session.exec(
+            select(Post.id, Post.user_id).where(Post.id.in_(post_ids))
+        )
+        authors = dict(result.all())
+    resolved = []
+    for event in events:
+        user_id = event.get("user_id")
+        if user_id is None:
+            user_id = authors.get(event["post_id"])
+        # Nobody is told about their own actions, or about deleted posts
+        if user_id is not None and user_id != event["actor_id"]:
+            resolved.append({**event, "user_id": user_id})
+    return resolved
+
+
+async def write_notifications(session, events: List[dict]) -> None:
+    """Turn a batch of events into Notification rows and unread counts.
+
+    Events carry ``type``, ``actor_id``, ``created_at`` and a ``post_id``
+    and/or recipient ``user_id``. A burst on one key updates the recipient's
+    unread row for it if there is one, else inserts one, so the unread count
+    only moves when a new row appears.
+    """
+    bursts: Dict[Key, Burst] = {}
+    for event in await _recipients(session, events):
+        key = (event["user_id"], event["type"], event.get("post_id"))
+        bursts.setdefault(key, Burst()).add(event["actor_id"], event["created_at"])
+    if not bursts:
+        return
+
+    result = await session.exec(
+        select(
+            Notification.id,
+            Notification.user_id,
+            Notification.type,
+            Notification.post_id,
+            Notification.actor_ids,
+        ).where(UNREAD & or_(*map(_unread_key, bursts)))
+    )
+    unread = {(row.user_id, row.type, row.post_id): row for row in result.all()}
+
+    created = []
+    for key, burst in bursts.items():
+        row = unread.get(key)
+        if row is not None:
+            # Beyond the remembered few, a returning actor counts again
+            added = len(set(burst.actors) - set(row.actor_ids))
+            # Skipped if the recipient read it meanwhile; then it starts anew
+            result = await session.exec(
+                update(Notification)
+                .where((Notification.id == row.id) & UNREAD)
+                .values(
+                    actor_id=burst.latest_actor,
+                    actor_ids=burst.recent(row.actor_ids),
+                    actor_count=Notification.actor_count + added,
+                    updated_at=burst.last_at,
+                )
+            )
+            if result.rowcount:
+                continue
+        user_id, type, post_id = key
+        created.append(
+            {
+                "user_id": user_id,
+                "actor_id": burst.latest_actor,
+                "post_id": post_id,
+                "type": type,
+                "actor_count": len(burst.actors),
+                "actor_ids": burst.recent(),
+                "read": False,
+                "created_at": burst.first_at,
+                "updated_at": burst.last_at,
+            }
+        )
+    if created:
+        await session.exec(Notification.__table__.insert(), params=created)
+        await _add_unread(session, Counter(row["user_id"] for row in created))
+
+
+def _unread_key(key: Key):
+    # Matches ix_notification_user_id_read_type_post_id, one range per key
+    user_id, type, post_id = key
+    return and_(
+        Notification.user_id == user_id,
+        Notification.type == type,
+        (
+            Notification.post_id.is_(None)
+            if post_id is None
+            else Notification.post_id == post_id
+        ),
+    )
+
+
+async def _add_unread(session, deltas: Dict[int, int]) -> None:
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if deltas:
+        await session.exec(
+            _bump_unread,
+            params=[
+                {"user_key": user_id, "delta": delta}
+                for user_id, delta in sorted(deltas.items())
+            ],
+        )
+
+
+NOTIFICATION_ORDER = [Notification.updated_at, Notification.id]
+
+
+async def get_notifications_for_user(
+    user_id: int,
+    unread_only: bool = False,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Tuple[List[Notification], Optional[str]]:
+    """One page of ``user_id``'s notifications, latest activity first."""
+    limit = clamp_limit(limit)
+    statement = select(Notification).where(Notification.user_id == user_id)
+    if unread_only:
+        statement = statement.where(UNREAD)
+    statement = paginate(statement, NOTIFICATION_ORDER, cursor, limit, descending=True)
+    async with get_session() as session:
+        result = await session.exec(statement)
+        return page_of(result.all(), NOTIFICATION_ORDER, limit)
+
+
+async def get_unread_count(user_id: int) -> Optional[int]:
+    """The badge count, read off the user row; ``None`` for an unknown user."""
+    async with get_session() as session:
+        result = await session.exec(
+            select(User.unread_notification_count).where(User.id == user_id)
+        )
+        return result.first()
+
+
+async def mark_read(user_id: int, ids: Optional[Iterable[int]] = None) -> int:
+    """Mark ``ids``, or every unread notification of ``user_id``, as read.
+
+    Ids that are not the user's or are already read are skipped. Returns how
+    many were marked.
+    """
+    statement = update(Notification).where((Notification.user_id == user_id) & UNREAD)
+    if ids is not None:
+        statement = statement.where(Notification.id.in_(set(ids)))
+    async with get_session() as session:
+        result = await session.exec(statement.values(read=True))
+        marked = result.rowcount
+        await _add_unread(session, {user_id: -marked})
+        await session.commit()
+        return marked
+
+
+async def recompute_unread_counts(session) -> int:
+    """Rebuild every user's unread count from the Notification rows."""
+    unread = (
+        select(func.count())
+        .where((Notification.user_id == user_table.c.id) & UNREAD)
+        .scalar_subquery()
+    )
+    result = await session.exec(
+        user_table.update().values(unread_notification_count=unread)
+    )
+    return result.rowcount
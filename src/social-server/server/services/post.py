@@ -1,30 +1,89 @@
-from typing import List
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import delete, update
 from sqlmodel import select
-from server.db.models import Post
+from server.db.models import Post, User, UserFeed
 from server.db.session import get_session
-from server.schemas.post import PostCreate, PostUpdate
-from datetime import datetime
+from server.common.fast_json import read_columns
+from server.common.pagination import clamp_limit, page_of, paginate
+from server.services.activity import activity_event, publish_activity
+from server.services.bulk import BulkBatch
+from server.services.cache import post_cache
+from server.services.newsfeed import fan_out_post, fan_out_posts
+from server.services.search import index_posts, unindex_post
+from server.services.visibility import only_visible
+from server.schemas.bulk import BulkCreateResult
+from server.schemas.post import PostCreate, PostRead, PostUpdate
+from datetime import datetime, timezone
+
+
+def _activity(post: Post) -> dict:
+    return activity_event(
+        "post", post.id, post.user_id, post.created_at, post_id=post.id
+    )
 
 
 async def create_post(post_data: PostCreate):
     async with get_session() as session:
         new_post = Post(**post_data.model_dump())
         session.add(new_post)
+        await session.flush()
+        await fan_out_post(session, new_post)
+        await index_posts(session, [new_post.id])
         await session.commit()
         await session.refresh(new_post)
-        return new_post
+    await publish_activity(_activity(new_post))
+    return new_post
 
 
-async def get_post_by_id(post_id: int):
+async def create_posts_bulk(items: List[Any]) -> BulkCreateResult:
+    batch = BulkBatch(items, PostCreate)
+    async with get_session() as session:
+        await batch.require_existing(session, User, "user_id")
+        posts = await batch.insert(session, lambda data: Post(**data.model_dump()))
+        await fan_out_posts(session, posts)
+        await index_posts(session, [post.id for post in posts])
+        await session.commit()
+    await publish_activity(*map(_activity, posts))
+    return batch.result()
+
+
+async def _load_post(post_id: int):
     async with get_session() as session:
         result = await session.exec(select(Post).where(Post.id == post_id))
         return result.first()
 
 
-async def get_all_posts():
+async def get_post_by_id(post_id: int):
+    return await post_cache.get_or_load(post_id, lambda: _load_post(post_id))
+
+
+POST_ORDER = [Post.created_at, Post.id]
+# Plain row tuples shaped like PostRead, for the fast JSON path
+POST_READ_COLUMNS = read_columns(Post, PostRead)
+
+
+def _posts(as_rows: bool):
+    return select(*POST_READ_COLUMNS) if as_rows else select(Post)
+
+
+async def get_all_posts(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    as_rows: bool = False,
+    viewer_id: Optional[int] = None,
+) -> Tuple[List[Post], Optional[str]]:
+    """One page of the posts ``viewer_id`` may read, newest first."""
+    limit = clamp_limit(limit)
+    statement = paginate(
+        only_visible(_posts(as_rows), viewer_id),
+        POST_ORDER,
+        cursor,
+        limit,
+        descending=True,
+    )
     async with get_session() as session:
-        result = await session.exec(select(Post))
-        return result.all()
+        result = await session.exec(statement)
+        return page_of(result.all(), POST_ORDER, limit)
 
 
 async def update_post(post_id: int, post_data: PostUpdate):
@@ -33,12 +92,23 @@ async def update_post(post_id: int, post_data: PostUpdate):
         post = result.first()
         if not post:
             return None
-        for key, value in post_data.model_dump(exclude_unset=True).items():
+        changes = post_data.model_dump(exclude_unset=True)
+        for key, value in changes.items():
             setattr(post, key, value)
-        post.updated_at = datetime.now()
+        post.updated_at = datetime.now(timezone.utc)
+        if "visibility" in changes:
+            # Feed reads trust the entries' snapshot for public posts
+            await session.exec(
+                update(UserFeed)
+                .where(UserFeed.post_id == post_id)
+                .values(visibility=post.visibility)
+            )
+        if "content_text" in changes:
+            await index_posts(session, [post_id])
         await session.commit()
         await session.refresh(post)
-        return post
+    await post_cache.invalidate(post_id)
+    return post
 
 
 async def delete_post(post_id: int):
@@ -47,12 +117,33 @@ async def delete_post(post_id: int):
         post = result.first()
         if not post:
             return False
+        # The entries fan-out wrote would outlive it and short feed pages
+        await session.exec(delete(UserFeed).where(UserFeed.post_id == post_id))
         await session.delete(post)
+        await unindex_post(session, post_id)
         await session.commit()
-        return True
+    await post_cache.invalidate(post_id)
+    return True
 
 
-async def get_posts_by_user_id(user_id: int) -> List[Post]:
+async def get_posts_by_user_id(
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    as_rows: bool = False,
+    viewer_id: Optional[int] = None,
+) -> Tuple[List[Post], Optional[str]]:
+    """One page of ``user_id``'s posts that ``viewer_id`` may read, newest first."""
+    limit = clamp_limit(limit)
+    statement = paginate(
+        only_visible(
+            _posts(as_rows).where(Post.user_id == user_id), viewer_id, user_id
+        ),
+        POST_ORDER,
+        cursor,
+        limit,
+        descending=True,
+    )
     async with get_session() as session:
-        result = await session.exec(select(Post).where(Post.user_id == user_id))
-        return result.all()
+        result = await session.exec(statement)
+        return page_of(result.all(), POST_ORDER, limit)
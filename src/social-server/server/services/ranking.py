@@ -0,0 +1,359 @@
+import math
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, func, union_all
+from sqlmodel import select
+
+from server.common import config
+from server.common.pagination import encode_cursor
+from server.db.models import Comment, Post, PostCategory, PostTag, Reaction, UserFeed
+from server.db.session import get_session
+from server.services.newsfeed import pulled_entries, stored_entries
+
+# Base score per feed source; unknown sources get DEFAULT_SOURCE_WEIGHT
+SOURCE_WEIGHTS = {"friend": 1.0, "follow": 0.7, "trending": 0.5, "recommended": 0.4}
+DEFAULT_SOURCE_WEIGHT = 0.3
+ENGAGEMENT_WEIGHT = 0.5
+AFFINITY_WEIGHT = 0.8
+COMMENT_WEIGHT = 2.0  # a comment counts as much as two reactions
+ENGAGEMENT_SATURATION = 1_000  # weighted engagement that earns the full weight
+
+# Affinity keys pack (user, label) into one int64. Labels are tag ids * 2 and
+# category ids * 2 + 1, so both share one key space.
+LABEL_SPACE = 1 << 32
+
+
+def tag_label(tag_id: int) -> int:
+    return tag_id * 2
+
+
+def category_label(category_id: int) -> int:
+    return category_id * 2 + 1
+
+
+RANK_BATCH_USERS = 500
+# Most recent stored entries, and as many pulled (celebrity) posts, scored on
+# each ranked feed read
+RANK_READ_WINDOW = 500
+
+feed_table = UserFeed.__table__
+
+
+class RankedEntry(NamedTuple):
+    id: Optional[int]
+    user_id: int
+    post_id: int
+    added_at: datetime
+    rank_score: float
+    source_type: str
+    is_seen: bool
+    visibility: str
+
+
+def timestamp_of(value: datetime) -> float:
+    # SQLite hands back naive UTC timestamps
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+@dataclass
+class Candidates:
+    """Column arrays for a batch of (reader, post) pairs to score."""
+
+    user_ids: np.ndarray
+    post_ids: np.ndarray
+    source_weights: np.ndarray
+    created_at: np.ndarray  # POSIX seconds
+    comment_counts: np.ndarray
+    reaction_counts: np.ndarray
+
+    @classmethod
+    def from_rows(cls, rows: Sequence) -> "Candidates":
+        """Build from rows with ``user_id``, ``post_id``, ``source_type``,
+        ``created_at``, ``comment_count`` and ``reaction_count``."""
+        return cls(
+            user_ids=np.fromiter((r.user_id for r in rows), np.int64, len(rows)),
+            post_ids=np.fromiter((r.post_id for r in rows), np.int64, len(rows)),
+            source_weights=np.fromiter(
+                (
+                    SOURCE_WEIGHTS.get(r.source_type, DEFAULT_SOURCE_WEIGHT)
+                    for r in rows
+                ),
+                np.float64,
+                len(rows),
+            ),
+            created_at=np.fromiter(
+                (timestamp_of(r.created_at) for r in rows), np.float64, len(rows)
+            ),
+            comment_counts=np.fromiter(
+                (r.comment_count for r in rows), np.float64, len(rows)
+            ),
+            reaction_counts=np.fromiter(
+                (r.reaction_count for r in rows), np.float64, len(rows)
+            ),
+        )
+
+
+@dataclass
+class Affinity:
+    """Per-reader label weights in [0, 1], sorted by packed key."""
+
+    keys: np.ndarray
+    weights: np.ndarray
+
+    def lookup(self, keys: np.ndarray) -> np.ndarray:
+        if not len(self.keys):
+            return np.zeros(len(keys))
+        index = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        return np.where(self.keys[index] == keys, self.weights[index], 0.0)
+
+
+@dataclass
+class PostLabels:
+    """One (post, label) pair per tag or category on a post."""
+
+    post_ids: np.ndarray
+    labels: np.ndarray
+
+
+def score(
+    candidates: Candidates, affinity: Affinity, labels: PostLabels, now: float
+) -> np.ndarray:
+    """Score every candidate in one pass over the batch.
+
+    ``recency * (source + ENGAGEMENT_WEIGHT * engagement + AFFINITY_WEIGHT *
+    affinity)``, where recency halves every ``RANK_HALF_LIFE_HOURS``,
+    engagement is log-scaled comments and reactions capped at 1, and affinity
+    is the reader's mean weight over the post's tags and categories.
+    """
+    n = len(candidates.post_ids)
+    age_hours = np.maximum(now - candidates.created_at, 0.0) / 3600.0
+    recency = np.exp2(-age_hours / config.RANK_HALF_LIFE_HOURS)
+
+    weighted = COMMENT_WEIGHT * candidates.comment_counts + candidates.reaction_counts
+    engagement = np.minimum(np.log1p(weighted) / math.log1p(ENGAGEMENT_SATURATION), 1.0)
+
+    # Expand each candidate into one row per label on its post, look the
+    # (reader, label) pairs up, then average back per candidate
+    order = np.argsort(labels.post_ids, kind="stable")
+    label_posts, label_keys = labels.post_ids[order], labels.labels[order]
+    starts = np.searchsorted(label_posts, candidates.post_ids, "left")
+    counts = np.searchsorted(label_posts, candidates.post_ids, "right") - starts
+    owner = np.repeat(np.arange(n), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    keys = (
+        candidates.user_ids[owner] * LABEL_SPACE
+        + label_keys[np.repeat(starts, counts) + offsets]
+    )
+    totals = np.bincount(owner, affinity.lookup(keys), minlength=n)
+    post_affinity = np.divide(totals, counts, out=np.zeros(n), where=counts > 0)
+
+    return recency * (
+        candidates.source_weights
+        + ENGAGEMENT_WEIGHT * engagement
+        + AFFINITY_WEIGHT * post_affinity
+    )
+
+
+async def load_affinity(session, user_ids: Iterable[int]) -> Affinity:
+    """Weight each reader's tags and categories by their reactions and comments.
+
+    Weights are counts divided by the reader's top count.
+    """
+    user_ids = list(user_ids)
+    interactions = union_all(
+        select(Reaction.user_id, Reaction.post_id).where(
+            Reaction.user_id.in_(user_ids)
+        ),
+        select(Comment.user_id, Comment.post_id).where(Comment.user_id.in_(user_ids)),
+    ).subquery()
+    by_tag = (
+        select(interactions.c.user_id, PostTag.tag_id * 2, func.count())
+        .join(PostTag, PostTag.post_id == interactions.c.post_id)
+        .group_by(interactions.c.user_id, PostTag.tag_id)
+    )
+    by_category = (
+        select(interactions.c.user_id, PostCategory.category_id * 2 + 1, func.count())
+        .join(PostCategory, PostCategory.post_id == interactions.c.post_id)
+        .group_by(interactions.c.user_id, PostCategory.category_id)
+    )
+    result = await session.exec(union_all(by_tag, by_category))
+    rows = result.all()
+    if not rows:
+        return Affinity(np.empty(0, np.int64), np.empty(0))
+
+    users, labels, counts = (np.array(column) for column in zip(*rows))
+    keys = users.astype(np.int64) * LABEL_SPACE + labels.astype(np.int64)
+    order = np.argsort(keys)
+    keys, users, counts = keys[order], users[order], counts[order].astype(float)
+    _, first = np.unique(users, return_index=True)
+    top = np.maximum.reduceat(counts, first)
+    top = np.repeat(top, np.diff(np.append(first, len(users))))
+    return Affinity(keys, counts / top)
+
+
+async def load_labels(session, post_ids) -> PostLabels:
+    """Tags and categories of ``post_ids``, a list or a select of post ids."""
+    result = await session.exec(
+        union_all(
+            select(PostTag.post_id, PostTag.tag_id * 2).where(
+                PostTag.post_id.in_(post_ids)
+            ),
+            select(PostCategory.post_id, PostCategory.category_id * 2 + 1).where(
+                PostCategory.post_id.in_(post_ids)
+            ),
+        )
+    )
+    rows = result.all()
+    if not rows:
+        return PostLabels(np.empty(0, np.int64), np.empty(0, np.int64))
+    posts, labels = zip(*rows)
+    return PostLabels(np.array(posts, np.int64), np.array(labels, np.int64))
+
+
+async def _rank_batch(session, user_ids: List[int], now: float) -> int:
+    result = await session.exec(
+        select(
+            UserFeed.id,
+            UserFeed.user_id,
+            UserFeed.post_id,
+            UserFeed.source_type,
+            Post.created_at,
+            Post.comment_count,
+            Post.reaction_count,
+        )
+        .join(Post, Post.id == UserFeed.post_id)
+        .where(UserFeed.user_id.in_(user_ids))
+    )
+    rows = result.all()
+    if not rows:
+        return 0
+    affinity = await load_affinity(session, user_ids)
+    labels = await load_labels(
+        session,
+        select(UserFeed.post_id).where(UserFeed.user_id.in_(user_ids)).distinct(),
+    )
+    scores = score(Candidates.from_rows(rows), affinity, labels, now)
+    await session.exec(
+        feed_table.update()
+        .where(feed_table.c.id == bindparam("feed_id"))
+        .values(rank_score=bindparam("score")),
+        params=[
+            {"feed_id": row.id, "score": value}
+            for row, value in zip(rows, scores.tolist())
+        ],
+    )
+    return len(rows)
+
+
+async def rank_feeds(
+    user_ids: Optional[Iterable[int]] = None,
+    now: Optional[datetime] = None,
+    batch_size: int = RANK_BATCH_USERS,
+) -> int:
+    """Recompute ``UserFeed.rank_score`` for every stored entry of ``user_ids``.
+
+    The scores are a snapshot at ``now`` for offline use such as exports;
+    ``ranked_feed_page`` scores entries afresh on every read.
+    All readers with feed entries are ranked when ``user_ids`` is None.
+    Readers are processed ``batch_size`` at a time, one transaction per
+    batch. Returns the number of entries scored.
+    """
+    now = timestamp_of(now or datetime.now(timezone.utc))
+    scored = 0
+    if user_ids is not None:
+        user_ids = sorted(set(user_ids))
+        for start in range(0, len(user_ids), batch_size):
+            async with get_session() as session:
+                scored += await _rank_batch(
+                    session, user_ids[start : start + batch_size], now
+                )
+                await session.commit()
+        return scored
+
+    last = 0
+    while True:
+        async with get_session() as session:
+            result = await session.exec(
+                select(UserFeed.user_id)
+                .where(UserFeed.user_id > last)
+                .distinct()
+                .order_by(UserFeed.user_id)
+                .limit(batch_size)
+            )
+            batch = list(result.all())
+            if not batch:
+                return scored
+            scored += await _rank_batch(session, batch, now)
+            await session.commit()
+        last = batch[-1]
+
+
+async def ranked_feed_page(
+    session,
+    user_id: int,
+    after: Optional[Sequence],
+    limit: int,
+    now: Optional[datetime] = None,
+) -> Tuple[List[RankedEntry], Optional[str]]:
+    """One page of a reader's feed, highest score first.
+
+    The ``RANK_READ_WINDOW`` most recent stored entries and as many pulled
+    celebrity posts are scored together here, at one ``now``, so both halves
+    compare; the stored ``rank_score`` is not used. ``after`` is the decoded
+    ``(score, post_id, now)`` cursor of the previous page; later pages score at
+    the first page's ``now`` so entries cannot drift past it.
+    """
+    if after:
+        now = after[2]
+    else:
+        now = timestamp_of(now or datetime.now(timezone.utc))
+    recent = (
+        stored_entries(user_id)
+        .order_by(UserFeed.added_at.desc(), UserFeed.post_id.desc())
+        .limit(RANK_READ_WINDOW)
+        .subquery()
+    )
+    stored = select(
+        recent,
+        Post.created_at.label("created_at"),
+        Post.comment_count,
+        Post.reaction_count,
+    ).join(Post, Post.id == recent.c.post_id)
+    pulled = (
+        pulled_entries(user_id)
+        .add_columns(
+            Post.created_at.label("created_at"),
+            Post.comment_count,
+            Post.reaction_count,
+        )
+        .order_by(Post.created_at.desc(), Post.id.desc())
+        .limit(RANK_READ_WINDOW)
+    )
+    rows = []
+    for statement in (stored, pulled):
+        result = await session.exec(statement)
+        rows += result.all()
+    if not rows:
+        return [], None
+
+    affinity = await load_affinity(session, [user_id])
+    labels = await load_labels(session, [row.post_id for row in rows])
+    scores = score(Candidates.from_rows(rows), affinity, labels, now)
+    entries = []
+    for row, value in zip(rows, scores.tolist()):
+        if after and (value, row.post_id) >= (after[0], after[1]):
+            continue
+        fields = {key: getattr(row, key) for key in RankedEntry._fields}
+        entries.append(RankedEntry(**{**fields, "rank_score": value}))
+
+    entries.sort(key=lambda entry: (entry.rank_score, entry.post_id), reverse=True)
+    if len(entries) <= limit:
+        return entries, None
+    entries = entries[:limit]
+    last = entries[-1]
+    return entries, encode_cursor([last.rank_score, last.post_id, now])
@@ -1,19 +1,134 @@
+from typing import Any, List, Optional, Tuple
 from sqlmodel import select
-from server.db.models import Reaction
+from sqlalchemy.exc import IntegrityError
+from server.db.engine import is_unique_violation
+from server.db.models import Post, Reaction, User
 from server.db.session import get_session
+from server.common.pagination import clamp_limit, page_of, paginate
+from server.schemas.bulk import BulkCreateResult
 from server.schemas.reaction import ReactionCreate
+from server.services.activity import activity_event, publish_activity
+from server.services.bulk import BulkBatch
+from server.services.cache import post_cache
+from server.services.counters import add_reactions
+from server.services.events import record_notification
+
+
+def _activity(reaction: Reaction) -> dict:
+    return activity_event(
+        "reaction",
+        reaction.id,
+        reaction.user_id,
+        reaction.created_at,
+        post_id=reaction.post_id,
+    )
 
 
 async def create_reaction(data: ReactionCreate):
     async with get_session() as session:
         reaction = Reaction(**data.model_dump())
         session.add(reaction)
+        try:
+            await session.flush()
+        except IntegrityError as error:
+            if is_unique_violation(error):
+                return None  # same reaction type already given
+            raise
+        await add_reactions(session, [(reaction.post_id, reaction.type)])
         await session.commit()
         await session.refresh(reaction)
-        return reaction
+    # Cached posts carry the reaction counters
+    await post_cache.invalidate(reaction.post_id)
+    await record_notification("reaction", reaction.user_id, post_id=reaction.post_id)
+    await publish_activity(_activity(reaction))
+    return reaction
+
+
+async def _reject_existing(session, batch: BulkBatch) -> int:
+    """Reject repeats of an existing (post, user, type) or of an earlier item.
+
+    Returns how many items were rejected.
+    """
+    post_ids = {item.post_id for item in batch.valid.values()}
+    user_ids = {item.user_id for item in batch.valid.values()}
+    if not post_ids:
+        return 0
+    result = await session.exec(
+        select(Reaction.post_id, Reaction.user_id, Reaction.type).where(
+            Reaction.post_id.in_(post_ids) & Reaction.user_id.in_(user_ids)
+        )
+    )
+    seen = set(result.all())
+    rejected = 0
+    for index, item in list(batch.valid.items()):
+        key = (item.post_id, item.user_id, item.type)
+        if key in seen:
+            batch.reject(index, "Reaction already exists")
+            rejected += 1
+        seen.add(key)
+    return rejected
+
+
+async def create_reactions_bulk(items: List[Any]) -> BulkCreateResult:
+    batch = BulkBatch(items, ReactionCreate)
+    async with get_session() as session:
+        await batch.require_existing(session, Post, "post_id")
+        await batch.require_existing(session, User, "user_id")
+        # Checked up front so the unique index cannot fail the whole insert
+        await _reject_existing(session, batch)
+        while True:
+            try:
+                async with session.begin_nested():
+                    reactions = await batch.insert(
+                        session, lambda data: Reaction(**data.model_dump())
+                    )
+                break
+            except IntegrityError as error:
+                # A concurrent writer got in after the check: reject what it
+                # added and insert the rest
+                if not is_unique_violation(error) or not await _reject_existing(
+                    session, batch
+                ):
+                    raise
+        await add_reactions(
+            session, [(reaction.post_id, reaction.type) for reaction in reactions]
+        )
+        await session.commit()
+    await post_cache.invalidate(*{reaction.post_id for reaction in reactions})
+    for reaction in reactions:
+        await record_notification(
+            "reaction", reaction.user_id, post_id=reaction.post_id
+        )
+    await publish_activity(*map(_activity, reactions))
+    return batch.result()
+
+
+async def delete_reaction(reaction_id: int):
+    async with get_session() as session:
+        result = await session.exec(select(Reaction).where(Reaction.id == reaction_id))
+        reaction = result.first()
+        if not reaction:
+            return False
+        await session.delete(reaction)
+        await add_reactions(session, [(reaction.post_id, reaction.type)], sign=-1)
+        await session.commit()
+    await post_cache.invalidate(reaction.post_id)
+    return True
+
+
+REACTION_ORDER = [Reaction.id]
 
 
-async def get_reactions_for_post(post_id: int):
+async def get_reactions_for_post(
+    post_id: int, cursor: Optional[str] = None, limit: Optional[int] = None
+) -> Tuple[List[Reaction], Optional[str]]:
+    limit = clamp_limit(limit)
+    statement = paginate(
+        select(Reaction).where(Reaction.post_id == post_id),
+        REACTION_ORDER,
+        cursor,
+        limit,
+    )
     async with get_session() as session:
-        result = await session.exec(select(Reaction).where(Reaction.post_id == post_id))
-        return result.all()
+        result = await session.exec(statement)
+        return page_of(result.all(), REACTION_ORDER, limit)
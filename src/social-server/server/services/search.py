@@ -0,0 +1,153 @@
+import re
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import Float, case, cast, func, literal_column, or_
+from sqlmodel import select
+from server.db.models import Comment, Post, PostCategory, PostTag
+from server.db.search import (
+    SQLITE,
+    TS_CONFIG,
+    comment_document_id,
+    comments_as_documents,
+    post_document_id,
+    posts_as_documents,
+    search_document,
+)
+from server.db.session import get_session
+from server.common.pagination import clamp_limit, page_of, paginate
+from server.schemas.search import SearchKind
+from server.services.visibility import only_visible
+
+DOCUMENT_COLUMNS = ["id", "post_id", "comment_id", "content"]
+
+
+async def _reindex(session, document_ids: List[int], documents) -> None:
+    # Delete first: a changed document replaces its row, and an id reused by
+    # the database must not collide with a leftover one
+    await session.exec(
+        search_document.delete().where(search_document.c.id.in_(document_ids))
+    )
+    if documents is not None:
+        await session.exec(
+            search_document.insert().from_select(DOCUMENT_COLUMNS, documents)
+        )
+
+
+# The write services call these inside their own transaction, after a flush
+# has given new rows their ids, so the index commits or rolls back with them
+async def index_posts(session, post_ids: Iterable[int]) -> None:
+    post_ids = list(post_ids)
+    if post_ids:
+        await _reindex(
+            session,
+            [post_document_id(post_id) for post_id in post_ids],
+            posts_as_documents().where(Post.id.in_(post_ids)),
+        )
+
+
+async def index_comments(session, comment_ids: Iterable[int]) -> None:
+    comment_ids = list(comment_ids)
+    if comment_ids:
+        await _reindex(
+            session,
+            [comment_document_id(comment_id) for comment_id in comment_ids],
+            comments_as_documents().where(Comment.id.in_(comment_ids)),
+        )
+
+
+async def unindex_post(session, post_id: int) -> None:
+    # Its comments' rows stay until they are deleted; reads join the post
+    await _reindex(session, [post_document_id(post_id)], None)
+
+
+async def unindex_comment(session, comment_id: int) -> None:
+    await _reindex(session, [comment_document_id(comment_id)], None)
+
+
+def _match(query: str):
+    """The full-text condition and a relevance score, higher is better.
+
+    Every word must match. Words are quoted for FTS5 so operators and
+    punctuation in the input are never parsed as query syntax.
+    """
+    if SQLITE:
+        terms = " ".join(f'"{word}"' for word in re.findall(r"\w+", query))
+        table = literal_column(search_document.name)
+        return search_document.c.content.match(terms), -func.bm25(table)
+    tsquery = func.plainto_tsquery(TS_CONFIG, query)
+    # Normalisation 1 divides by 1 + log(length): longer documents need more
+    # hits to rank level, as with BM25
+    return search_document.c.content.op("@@")(tsquery), func.ts_rank_cd(
+        search_document.c.content, tsquery, 1
+    )
+
+
+async def search(
+    query: str,
+    kind: Optional[SearchKind] = None,
+    tag_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    viewer_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Tuple[list, Optional[str]]:
+    """One page of posts and comments matching ``query``, best match first.
+
+    Ranked by BM25 on SQLite and ``ts_rank_cd`` on PostgreSQL. Comments are
+    filtered by their post's tags and categories, and only come from posts
+    ``viewer_id`` may read.
+    """
+    limit = clamp_limit(limit)
+    if not re.search(r"\w", query):
+        return [], None
+    condition, score = _match(query)
+    matches = select(
+        search_document.c.id.label("id"),
+        search_document.c.post_id,
+        search_document.c.comment_id,
+        cast(score, Float).label("score"),
+    ).where(condition)
+    if kind == "post":
+        matches = matches.where(search_document.c.comment_id.is_(None))
+    elif kind == "comment":
+        matches = matches.where(search_document.c.comment_id.is_not(None))
+    if tag_id is not None:
+        matches = matches.where(
+            search_document.c.post_id.in_(
+                select(PostTag.post_id).where(PostTag.tag_id == tag_id)
+            )
+        )
+    if category_id is not None:
+        matches = matches.where(
+            search_document.c.post_id.in_(
+                select(PostCategory.post_id).where(
+                    PostCategory.category_id == category_id
+                )
+            )
+        )
+    # Scored in a subquery so the keyset below can compare against the score
+    hits = matches.subquery()
+    order = [hits.c.score, hits.c.id]
+    statement = (
+        select(
+            hits.c.id,
+            hits.c.score,
+            case((hits.c.comment_id.is_(None), "post"), else_="comment").label("kind"),
+            hits.c.post_id,
+            hits.c.comment_id,
+            func.coalesce(Comment.user_id, Post.user_id).label("user_id"),
+            func.coalesce(Comment.content_text, Post.content_text).label(
+                "content_text"
+            ),
+            func.coalesce(Comment.created_at, Post.created_at).label("created_at"),
+        )
+        .join(Post, Post.id == hits.c.post_id)
+        .outerjoin(Comment, Comment.id == hits.c.comment_id)
+        # Rows deleted around the services leave their documents behind
+        .where(or_(hits.c.comment_id.is_(None), Comment.id.is_not(None)))
+    )
+    statement = paginate(
+        only_visible(statement, viewer_id), order, cursor, limit, descending=True
+    )
+    async with get_session() as session:
+        result = await session.exec(statement)
+        return page_of(result.all(), order, limit)
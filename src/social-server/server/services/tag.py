@@ -2,6 +2,7 @@ from sqlmodel import select
 from server.db.models import Tag, PostTag
 from server.db.session import get_session
 from server.schemas.tag import TagCreate
+from server.services.cache import ALL, tag_cache
 from typing import List
 
 
@@ -11,10 +12,15 @@ async def create_tag(data: TagCreate) -> Tag:
         session.add(tag)
         await session.commit()
         await session.refresh(tag)
-        return tag
+    await tag_cache.invalidate(ALL)
+    return tag
 
 
-async def get_all_tags() -> List[Tag]:
+async def _load_tags() -> List[Tag]:
     async with get_session() as session:
         result = await session.exec(select(Tag))
         return result.all()
+
+
+async def get_all_tags() -> List[Tag]:
+    return await tag_cache.get_or_load(ALL, _load_tags)
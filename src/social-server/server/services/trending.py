@@ -0,0 +1,328 @@
+import asyncio
+import heapq
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import insert
+from sqlmodel import select
+
+from server.common import config
+from server.db.models import Comment, Post, Reaction, User, UserFeed
+from server.db.session import get_session
+from server.services.cache import MISSING, RedisBackend, redis_client
+from server.services.ranking import (
+    COMMENT_WEIGHT,
+    LABEL_SPACE,
+    load_affinity,
+    load_labels,
+    timestamp_of,
+)
+
+logger = logging.getLogger(__name__)
+
+BUCKET_SECONDS = 300
+INGEST_BATCH = 5_000  # new reactions (and comments) read per query
+INJECT_BATCH_USERS = 100
+TOP_LABELS_PER_USER = 3
+LISTS_KEY = "lists"
+
+
+class SlidingCounter:
+    """Weighted event counts per key over the last ``window`` seconds.
+
+    Events land in ``BUCKET_SECONDS`` wide buckets; expiring a bucket
+    subtracts it from the running totals, so neither adding nor expiring
+    rescans the window.
+    """
+
+    def __init__(self, window: float, bucket: float = BUCKET_SECONDS):
+        self.window = window
+        self.bucket = bucket
+        self.buckets: Dict[int, Counter] = {}
+        self.totals: Counter = Counter()
+
+    def add(self, key, weight: float, at: float, now: float) -> bool:
+        if at <= now - self.window:
+            return False
+        self.buckets.setdefault(int(at // self.bucket), Counter())[key] += weight
+        self.totals[key] += weight
+        return True
+
+    def expire(self, now: float) -> Set:
+        """Drop buckets that left the window; return keys whose total hit zero."""
+        oldest = int((now - self.window) // self.bucket)
+        gone = set()
+        for index in [index for index in self.buckets if index <= oldest]:
+            for key, weight in self.buckets.pop(index).items():
+                self.totals[key] -= weight
+                if self.totals[key] <= 1e-9:
+                    del self.totals[key]
+                    gone.add(key)
+        return gone
+
+    def top(self, k: int, keys=None) -> List[Tuple[int, float]]:
+        items = (
+            self.totals.items()
+            if keys is None
+            else ((key, self.totals[key]) for key in keys if key in self.totals)
+        )
+        return heapq.nlargest(k, items, key=lambda item: (item[1], item[0]))
+
+
+class TrendingTracker:
+    """Sliding-window trending posts, global and per tag/category.
+
+    Each ``tick`` reads only reactions and comments newer than the last ones
+    it saw, then injects trending posts into a slice of the feeds of readers
+    active in the last ``TRENDING_ACTIVE_SECONDS``. Per-label
+    lists reuse the global post totals, filtered by the posts carrying the
+    label, so a post's events are only counted once.
+
+    Counts only grow until their bucket expires: deleting a reaction or a
+    comment does not lower a post's score.
+    """
+
+    def __init__(self, window: Optional[float] = None):
+        self.counter = SlidingCounter(window or config.TRENDING_WINDOW_HOURS * 3600)
+        self.last_reaction_id: Optional[int] = None
+        self.last_comment_id: Optional[int] = None
+        # False while either table has more new events than one batch read
+        self.caught_up = True
+        # Only posts with events in the window are tracked here
+        self.post_labels: Dict[int, List[int]] = {}
+        self.post_authors: Dict[int, int] = {}
+        self.label_posts: Dict[int, Set[int]] = {}
+        self.next_user_id = 0
+        # Set once this process runs the job; the other workers read its lists
+        self.ticked = False
+
+    def top(self, k: int = None, label: Optional[int] = None):
+        """``(post_id, score)`` pairs, best first, optionally for one label."""
+        k = k or config.TRENDING_TOP_K
+        keys = None if label is None else self.label_posts.get(label, ())
+        return self.counter.top(k, keys)
+
+    def lists(self) -> Dict[Optional[int], List[Tuple[int, float]]]:
+        """Every list ``top`` can serve, global under ``None``, for sharing."""
+        return {
+            label: self.top(config.MAX_PAGE_SIZE, label)
+            for label in [None, *self.label_posts]
+        }
+
+    async def _read_events(self, session, model, last_id, since: datetime):
+        statement = select(model.id, model.post_id, model.created_at)
+        if last_id is None:
+            # First tick: one scan for the events already in the window
+            statement = statement.where(model.created_at >= since)
+        else:
+            statement = statement.where(model.id > last_id)
+        result = await session.exec(statement.order_by(model.id).limit(INGEST_BATCH))
+        return result.all()
+
+    async def ingest(self, session, now: float) -> int:
+        since = datetime.fromtimestamp(now - self.counter.window, timezone.utc)
+        reactions = await self._read_events(
+            session, Reaction, self.last_reaction_id, since
+        )
+        comments = await self._read_events(
+            session, Comment, self.last_comment_id, since
+        )
+        if reactions:
+            self.last_reaction_id = reactions[-1].id
+        elif self.last_reaction_id is None:
+            self.last_reaction_id = await self._max_id(session, Reaction)
+        if comments:
+            self.last_comment_id = comments[-1].id
+        elif self.last_comment_id is None:
+            self.last_comment_id = await self._max_id(session, Comment)
+        self.caught_up = max(len(reactions), len(comments)) < INGEST_BATCH
+
+        new_posts = {row.post_id for row in reactions + comments}
+        await self._track_posts(session, new_posts - set(self.post_authors))
+        for rows, weight in ((reactions, 1.0), (comments, COMMENT_WEIGHT)):
+            for row in rows:
+                # Events on non-public posts are never tracked
+                if row.post_id in self.post_authors:
+                    at = timestamp_of(row.created_at)
+                    self.counter.add(row.post_id, weight, at, now)
+
+        stale = {post_id for post_id in new_posts if post_id not in self.counter.totals}
+        for post_id in self.counter.expire(now) | stale:
+            for label in self.post_labels.pop(post_id, ()):
+                posts = self.label_posts.get(label)
+                if posts is not None:
+                    posts.discard(post_id)
+                    if not posts:
+                        del self.label_posts[label]
+            self.post_authors.pop(post_id, None)
+        return len(reactions) + len(comments)
+
+    async def _max_id(self, session, model) -> int:
+        result = await session.exec(select(model.id).order_by(model.id.desc()).limit(1))
+        return result.first() or 0
+
+    async def _track_posts(self, session, post_ids: Set[int]) -> None:
+        if not post_ids:
+            return
+        # Only public posts may reach strangers' feeds
+        result = await session.exec(
+            select(Post.id, Post.user_id).where(
+                Post.id.in_(post_ids) & (Post.visibility == "public")
+            )
+        )
+        for post_id, user_id in result.all():
+            self.post_authors[post_id] = user_id
+            self.post_labels[post_id] = []
+        labels = await load_labels(session, list(post_ids))
+        for post_id, label in zip(labels.post_ids.tolist(), labels.labels.tolist()):
+            if post_id in self.post_labels:
+                self.post_labels[post_id].append(label)
+                self.label_posts.setdefault(label, set()).add(post_id)
+
+    async def _inject_batch(self, session, user_ids: List[int], now: float) -> int:
+        trending = [post_id for post_id, _ in self.top()]
+        affinity = await load_affinity(session, user_ids)
+        # Keys sort by user first, so each reader's labels are one slice
+        users = affinity.keys // LABEL_SPACE
+        labels = affinity.keys % LABEL_SPACE
+        favourites: Dict[int, List[int]] = {}
+        for user_id in user_ids:
+            lo, hi = np.searchsorted(users, [user_id, user_id + 1])
+            best = np.argsort(-affinity.weights[lo:hi], kind="stable")
+            favourites[user_id] = labels[lo:hi][best][:TOP_LABELS_PER_USER].tolist()
+
+        wanted: Dict[int, Dict[int, str]] = {}
+        for user_id in user_ids:
+            picks = {post_id: "trending" for post_id in trending}
+            for label in favourites[user_id]:
+                for post_id, _ in self.top(label=label):
+                    picks.setdefault(post_id, "recommended")
+            wanted[user_id] = {
+                post_id: source
+                for post_id, source in picks.items()
+                if self.post_authors.get(post_id) not in (None, user_id)
+            }
+        candidates = set().union(*(picks.keys() for picks in wanted.values()))
+        if not candidates:
+            return 0
+
+        result = await session.exec(
+            select(UserFeed.user_id, UserFeed.post_id).where(
+                UserFeed.user_id.in_(user_ids) & UserFeed.post_id.in_(candidates)
+            )
+        )
+        existing = set(result.all())
+        added_at = datetime.fromtimestamp(now, timezone.utc)
+        rows = [
+            dict(
+                user_id=user_id,
+                post_id=post_id,
+                added_at=added_at,
+                source_type=source,
+                is_seen=False,
+                visibility="public",
+            )
+            for user_id, picks in wanted.items()
+            for post_id, source in picks.items()
+            if (user_id, post_id) not in existing
+        ]
+        if rows:
+            await session.exec(insert(UserFeed), params=rows)
+        return len(rows)
+
+    async def tick(self, budget: Optional[float] = None, now: Optional[float] = None):
+        """Ingest new events, then inject into user feeds until ``budget`` runs out.
+
+        Ingest repeats until it has caught up, or logs a warning if the budget
+        runs out first. Active readers are visited in id order,
+        ``INJECT_BATCH_USERS`` per transaction, resuming where the previous tick
+        stopped. Returns ``(events, injected)``.
+        """
+        budget = budget if budget is not None else config.TRENDING_TICK_BUDGET_MS / 1000
+        deadline = time.monotonic() + budget
+        now = now or time.time()
+        self.ticked = True
+        events = 0
+        while True:
+            async with get_session() as session:
+                events += await self.ingest(session, now)
+            if self.caught_up:
+                break
+            if time.monotonic() >= deadline:
+                logger.warning(
+                    "Trending ingest is behind: read %d events this tick, "
+                    "more are waiting",
+                    events,
+                )
+                break
+            await asyncio.sleep(0)
+        injected = 0
+        # Feeds nobody opens lately are left alone, keeping writes in step
+        # with readers rather than with every account
+        active_since = datetime.fromtimestamp(
+            now - config.TRENDING_ACTIVE_SECONDS, timezone.utc
+        )
+        if not self.counter.totals:
+            return events, injected
+
+        while time.monotonic() < deadline:
+            async with get_session() as session:
+                result = await session.exec(
+                    select(User.id)
+                    .where(
+                        (User.last_active_at >= active_since)
+                        & (User.id > self.next_user_id)
+                    )
+                    .order_by(User.id)
+                    .limit(INJECT_BATCH_USERS)
+                )
+                user_ids = list(result.all())
+                if not user_ids:
+                    self.next_user_id = 0  # full pass done, start over next tick
+                    break
+                injected += await self._inject_batch(session, user_ids, now)
+                await session.commit()
+            self.next_user_id = user_ids[-1]
+            # Let request handlers run between batches
+            await asyncio.sleep(0)
+        return events, injected
+
+
+tracker = TrendingTracker()
+# Only the worker holding the job lock ticks a tracker; it shares its lists
+# with the others through CACHE_URL
+shared_lists = (
+    RedisBackend(redis_client(config.CACHE_URL), "trending")
+    if config.CACHE_URL
+    else None
+)
+
+
+async def top_posts(k: Optional[int] = None, label: Optional[int] = None):
+    """``(post_id, score)`` pairs from this process's tracker if it runs the
+    job, else from the lists the one that does last shared."""
+    k = k or config.TRENDING_TOP_K
+    if tracker.ticked or shared_lists is None:
+        return tracker.top(k, label)
+    lists = await shared_lists.get(LISTS_KEY)
+    if lists is MISSING:
+        return []
+    return lists.get(label, [])[:k]
+
+
+async def run_trending_job(interval: Optional[float] = None) -> None:
+    """Tick ``tracker`` every ``interval`` seconds until cancelled."""
+    interval = interval or config.TRENDING_INTERVAL_SECONDS
+    while True:
+        try:
+            await tracker.tick()
+            if shared_lists is not None:
+                # Expires if this worker stops ticking, rather than go stale
+                await shared_lists.set(LISTS_KEY, tracker.lists(), 3 * interval)
+        except Exception:
+            logger.exception("Trending tick failed")
+        await asyncio.sleep(interval)
@@ -1,10 +1,13 @@
 from server.db.models import User
 from server.db.session import get_session
-from server.schemas.user import UserCreate, UserUpdate
+from server.common.fast_json import read_columns
+from server.common.pagination import clamp_limit, page_of, paginate
+from server.schemas.user import UserCreate, UserRead, UserUpdate
+from server.services.cache import user_cache
 from sqlmodel import select
 from sqlalchemy.orm import selectinload
 from datetime import datetime, timezone
-from typing import List
+from typing import List, Optional, Tuple
 
 
 async def create_user(user_data: UserCreate) -> User:
@@ -20,13 +23,33 @@ async def create_user(user_data: UserCreate) -> User:
         return user
 
 
-async def get_all_users() -> List[User]:
+USER_ORDER = [User.id]
+USER_READ_COLUMNS = read_columns(User, UserRead)
+
+
+async def get_all_users(
+    cursor: Optional[str] = None, limit: Optional[int] = None, as_rows: bool = False
+) -> Tuple[List[User], Optional[str]]:
+    limit = clamp_limit(limit)
+    source = select(*USER_READ_COLUMNS) if as_rows else select(User)
+    statement = paginate(source, USER_ORDER, cursor, limit)
+    async with get_session() as session:
+        result = await session.exec(statement)
+        return page_of(result.all(), USER_ORDER, limit)
+
+
+async def _load_user(user_id: int) -> User | None:
     async with get_session() as session:
-        result = await session.exec(select(User))
-        return result.all()
+        result = await session.exec(select(User).where(User.id == user_id))
+        return result.first()
 
 
 async def get_user(user_id: int) -> User | None:
+    """The user without their posts, served from ``user_cache`` when possible."""
+    return await user_cache.get_or_load(user_id, lambda: _load_user(user_id))
+
+
+async def get_user_with_posts(user_id: int) -> User | None:
     async with get_session() as session:
         result = await session.exec(
             select(User).options(selectinload(User.posts)).where(User.id == user_id)
@@ -50,7 +73,8 @@ async def update_user(user_id: int, user_data: UserUpdate) -> User | None:
         user.last_active_at = datetime.now(timezone.utc)
         await session.commit()
         await session.refresh(user)
-        return user
+    await user_cache.invalidate(user_id)
+    return user
 
 
 async def delete_user(user_id: int) -> bool:
@@ -62,4 +86,5 @@ async def delete_user(user_id: int) -> bool:
 
         await session.delete(user)
         await session.commit()
-        return True
+    await user_cache.invalidate(user_id)
+    return True
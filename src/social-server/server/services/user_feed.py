@@ -1,9 +1,14 @@
-from server.db.models import UserFeed
+from server.db.models import Post, User, UserFeed
 from server.db.session import get_session
-from server.schemas.user_feed import UserFeedCreate, UserFeedUpdate
+from server.services.newsfeed import FEED_ORDER, feed_query, hydrate_posts
+from server.common.pagination import clamp_limit, decode_cursor, page_of
+from server.schemas.bulk import BulkCreateResult
+from server.schemas.user_feed import FeedOrder, UserFeedCreate, UserFeedUpdate
+from server.services.bulk import BulkBatch
+from server.services.ranking import ranked_feed_page
 from sqlmodel import select
 from datetime import datetime
-from typing import List
+from typing import Any, List, Optional, Tuple
 
 
 async def create_user_feed(feed_data: UserFeedCreate):
@@ -15,20 +20,70 @@ async def create_user_feed(feed_data: UserFeedCreate):
         return new_feed
 
 
+async def create_user_feeds_bulk(items: List[Any]) -> BulkCreateResult:
+    batch = BulkBatch(items, UserFeedCreate)
+    async with get_session() as session:
+        await batch.require_existing(session, User, "user_id")
+        await batch.require_existing(session, Post, "post_id")
+        await batch.insert(session, lambda data: UserFeed(**data.model_dump()))
+        await session.commit()
+    return batch.result()
+
+
 async def get_user_feed_by_id(feed_id: int):
     async with get_session() as session:
         result = await session.exec(select(UserFeed).where(UserFeed.id == feed_id))
         return result.first()
 
 
-async def get_feeds_for_user(user_id: int) -> List[UserFeed]:
+async def _feed_page(session, user_id, prepared, limit, order: FeedOrder):
+    if order == "score":
+        return await ranked_feed_page(session, user_id, prepared, limit)
+    result = await session.exec(prepared)
+    return page_of(result.all(), FEED_ORDER, limit)
+
+
+def _prepare(user_id, cursor, limit, order: FeedOrder):
+    # Resolved before a session opens so a bad cursor surfaces as a 400
+    if order == "score":
+        # (score, post_id, now) as written by ranked_feed_page
+        return decode_cursor(cursor, 3, (float, int, float)) if cursor else None
+    return feed_query(user_id, cursor, limit)
+
+
+async def get_feeds_for_user(
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    order: FeedOrder = "recent",
+) -> Tuple[List[UserFeed], Optional[str]]:
+    limit = clamp_limit(limit)
+    prepared = _prepare(user_id, cursor, limit, order)
+    async with get_session() as session:
+        return await _feed_page(session, user_id, prepared, limit, order)
+
+
+async def get_hydrated_feed_for_user(
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    order: FeedOrder = "recent",
+    as_rows: bool = False,
+) -> Tuple[List[dict], Optional[str]]:
+    """One feed page with each entry's post, author, counts and labels attached."""
+    limit = clamp_limit(limit)
+    prepared = _prepare(user_id, cursor, limit, order)
     async with get_session() as session:
-        result = await session.exec(
-            select(UserFeed)
-            .where(UserFeed.user_id == user_id)
-            .order_by(UserFeed.added_at.desc())
+        feeds, next_cursor = await _feed_page(session, user_id, prepared, limit, order)
+        details = await hydrate_posts(
+            session, [feed.post_id for feed in feeds], as_rows
         )
-        return result.all()
+    items = [
+        {**feed._asdict(), **details[feed.post_id]}
+        for feed in feeds
+        if feed.post_id in details
+    ]
+    return items, next_cursor
 
 
 async def update_user_feed(feed_id: int, feed_data: UserFeedUpdate):
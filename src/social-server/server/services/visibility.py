@@ -0,0 +1,76 @@
+from typing import Optional
+from sqlalchemy import Integer, and_, bindparam, case, exists, literal, or_
+from server.db.models import Friendship, Post, UserFeed
+from server.schemas.post import Visibility
+from server.services.friendship import ordered_pair
+
+PUBLIC = Visibility.PUBLIC.value
+# Rows written before the values were normalised may still say "friends-only"
+FRIENDS_VISIBILITIES = (Visibility.FRIENDS.value, "friends-only")
+
+# The conditions are built once around these parameters and bound per query:
+# building them afresh costs more than the filtering itself on a page read
+VIEWER = bindparam("viewer_id", type_=Integer)
+LOW = bindparam("low_id", type_=Integer)
+HIGH = bindparam("high_id", type_=Integer)
+
+# Plain binds: a list of values would be an expanding IN, which SQLAlchemy
+# renders into the SQL string again on every execution
+_FRIENDS_POST = Post.visibility.in_([literal(value) for value in FRIENDS_VISIBILITIES])
+
+
+def _are_friends(low, high):
+    """EXISTS an accepted friendship, probing the unique pair index once."""
+    return exists().where(
+        (Friendship.user_id == low)
+        & (Friendship.friend_id == high)
+        & (Friendship.status == "accepted")
+    )
+
+
+# Anyone reads public posts, authors all of theirs and accepted friends
+# friends posts. Private posts, and any unknown value, reach only the author
+VISIBLE_POST = or_(
+    Post.visibility == PUBLIC,
+    Post.user_id == VIEWER,
+    and_(
+        _FRIENDS_POST,
+        _are_friends(
+            # The pair ordered the way it is stored
+            case((Post.user_id < VIEWER, Post.user_id), else_=VIEWER),
+            case((Post.user_id < VIEWER, VIEWER), else_=Post.user_id),
+        ),
+    ),
+)
+# One author's posts, read by someone else: the friendship check no longer
+# depends on the row, so the database runs it once per query
+VISIBLE_AUTHOR_POST = or_(
+    Post.visibility == PUBLIC, and_(_FRIENDS_POST, _are_friends(LOW, HIGH))
+)
+# Entries snapshot their post's visibility, kept in step by update_post.
+# Public ones pass without a lookup; the rest are checked against the post as
+# it is now, e.g. after an unfriending
+VISIBLE_FEED_ENTRY = (UserFeed.visibility == PUBLIC) | exists().where(
+    (Post.id == UserFeed.post_id) & VISIBLE_POST
+)
+
+
+def only_visible(statement, viewer_id: Optional[int], author_id: Optional[int] = None):
+    """Filter a select over ``Post`` to the posts ``viewer_id`` may read.
+
+    Pass ``author_id`` when the statement already selects only that author's
+    posts. Without a viewer only public posts pass.
+    """
+    if viewer_id is None:
+        return statement.where(Post.visibility == PUBLIC)
+    if author_id is None:
+        return statement.where(VISIBLE_POST).params(viewer_id=viewer_id)
+    if author_id == viewer_id:
+        return statement
+    low, high = ordered_pair(viewer_id, author_id)
+    return statement.where(VISIBLE_AUTHOR_POST).params(low_id=low, high_id=high)
+
+
+def only_visible_entries(statement, reader_id: int):
+    """Filter a select over ``UserFeed`` to the entries ``reader_id`` may read."""
+    return statement.where(VISIBLE_FEED_ENTRY).params(viewer_id=reader_id)
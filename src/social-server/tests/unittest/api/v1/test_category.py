@@ -21,6 +21,14 @@ async def test_create_category():
 async def test_assign_category_to_post():
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url=base_url) as ac:
+        user_resp = await ac.post(
+            "/api/v1/users/", json={"username": "categorizer", "password": "123"}
+        )
+        post_resp = await ac.post(
+            "/api/v1/posts/",
+            json={"user_id": user_resp.json()["id"], "content_text": "File me"},
+        )
+        post_id = post_resp.json()["id"]
         category_resp = await ac.post(
             "/api/v1/categories/",
             json={"name": "Lifestyle", "description": "Life tips and self-care"},
@@ -28,7 +36,8 @@ async def test_assign_category_to_post():
         category_id = category_resp.json()["id"]
 
         assign_resp = await ac.post(
-            "/api/v1/categories/assign", json={"post_id": 1, "category_id": category_id}
+            "/api/v1/categories/assign",
+            json={"post_id": post_id, "category_id": category_id},
         )
         assert assign_resp.status_code == 200
-        assert assign_resp.json()["post_id"] == 1
+        assert assign_resp.json()["post_id"] == post_id
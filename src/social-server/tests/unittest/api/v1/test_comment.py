@@ -12,13 +12,16 @@ async def test_create_comment(mocker):
 
     mock_session = MagicMock()
     mock_session.add = MagicMock()
+    mock_session.flush = AsyncMock()
+    mock_session.exec = AsyncMock()  # comment_count bump, search index
     mock_session.commit = AsyncMock()
     mock_session.refresh = AsyncMock()
 
-    async def fake_refresh(obj):
-        obj.id = 1
+    def fake_flush():
+        comment = mock_session.add.call_args.args[0]
+        comment.id = 1
 
-    mock_session.refresh.side_effect = fake_refresh
+    mock_session.flush.side_effect = fake_flush
 
     mocker.patch(
         "server.services.comment.get_session",
@@ -1,6 +1,8 @@
+import sqlite3
 import pytest
 from httpx import AsyncClient, ASGITransport
 from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.exc import IntegrityError
 from server import app
 from server.db.models import Follow
 from server.common.config import base_url
@@ -37,6 +39,35 @@ async def test_create_follow(mocker):
         assert data["following_id"] == 2
 
 
+@pytest.mark.asyncio
+async def test_create_duplicate_follow(mocker):
+    payload = {"follower_id": 1, "following_id": 2}
+
+    mock_session = MagicMock()
+    mock_session.add = MagicMock()
+    mock_session.commit = AsyncMock(
+        side_effect=IntegrityError(
+            "INSERT",
+            {},
+            sqlite3.IntegrityError(
+                "UNIQUE constraint failed: follow.follower_id, follow.following_id"
+            ),
+        )
+    )
+
+    mocker.patch(
+        "server.services.follow.get_session",
+        return_value=AsyncMock(
+            __aenter__=AsyncMock(return_value=mock_session), __aexit__=AsyncMock()
+        ),
+    )
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=base_url) as ac:
+        resp = await ac.post("/api/v1/follows/", json=payload)
+        assert resp.status_code == 409
+
+
 @pytest.mark.asyncio
 async def test_get_follow_by_id(mocker):
     fake_follow = Follow(id=1, follower_id=1, following_id=2)
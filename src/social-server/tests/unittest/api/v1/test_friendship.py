@@ -9,7 +9,7 @@ from server.common.config import base_url
 @pytest.mark.asyncio
 async def test_create_friendship(mocker):
     payload = {"user_id": 1, "friend_id": 2, "status": "requested"}
-    fake_friendship = Friendship(id=1, **payload)
+    fake_friendship = Friendship(id=1, requester_id=1, **payload)
 
     mock_session = MagicMock()
     mock_session.add = MagicMock()
@@ -40,7 +40,9 @@ async def test_create_friendship(mocker):
 
 @pytest.mark.asyncio
 async def test_get_friendship_by_id(mocker):
-    fake_friendship = Friendship(id=1, user_id=1, friend_id=2, status="accepted")
+    fake_friendship = Friendship(
+        id=1, user_id=1, friend_id=2, requester_id=1, status="accepted"
+    )
 
     mock_result = MagicMock()
     mock_result.first.return_value = fake_friendship
@@ -66,8 +68,8 @@ async def test_get_friendship_by_id(mocker):
 @pytest.mark.asyncio
 async def test_get_friendships_for_user(mocker):
     fake_friendships = [
-        Friendship(id=1, user_id=10, friend_id=11, status="accepted"),
-        Friendship(id=2, user_id=10, friend_id=12, status="requested"),
+        Friendship(id=1, user_id=10, friend_id=11, requester_id=10, status="accepted"),
+        Friendship(id=2, user_id=10, friend_id=12, requester_id=10, status="requested"),
     ]
 
     mock_result = MagicMock()
@@ -94,7 +96,9 @@ async def test_get_friendships_for_user(mocker):
 
 @pytest.mark.asyncio
 async def test_update_friendship(mocker):
-    fake_friendship = Friendship(id=1, user_id=1, friend_id=2, status="requested")
+    fake_friendship = Friendship(
+        id=1, user_id=1, friend_id=2, requester_id=1, status="requested"
+    )
     updated_fields = {"status": "accepted"}
 
     mock_result = MagicMock()
@@ -122,7 +126,9 @@ async def test_update_friendship(mocker):
 
 @pytest.mark.asyncio
 async def test_delete_friendship(mocker):
-    fake_friendship = Friendship(id=1, user_id=1, friend_id=2, status="requested")
+    fake_friendship = Friendship(
+        id=1, user_id=1, friend_id=2, requester_id=1, status="requested"
+    )
 
     mock_result = MagicMock()
     mock_result.first.return_value = fake_friendship
@@ -4,6 +4,7 @@ from unittest.mock import AsyncMock, MagicMock
 from server import app
 from server.db.models import Post
 from server.common.config import base_url
+from server.services.cache import post_cache
 
 
 @pytest.mark.asyncio
@@ -13,13 +14,18 @@ async def test_create_post(mocker):
 
     mock_session = MagicMock()
     mock_session.add = MagicMock()
+    mock_session.flush = AsyncMock()
+    mock_follower_count = MagicMock()
+    mock_follower_count.one.return_value = 0
+    mock_session.exec = AsyncMock(return_value=mock_follower_count)
     mock_session.commit = AsyncMock()
     mock_session.refresh = AsyncMock()
 
-    async def fake_refresh(post):
+    def fake_flush():
+        post = mock_session.add.call_args.args[0]
         post.id = 1
 
-    mock_session.refresh.side_effect = fake_refresh
+    mock_session.flush.side_effect = fake_flush
 
     mocker.patch(
         "server.services.post.get_session",
@@ -36,6 +42,9 @@ async def test_create_post(mocker):
         assert data["content_text"] == "My first post"
         assert data["id"] == 1
         assert data["user_id"] == 1
+        # Follower count check, a single bulk insert for the fan-out, then the
+        # search document's delete and insert
+        assert mock_session.exec.await_count == 4
 
 
 @pytest.mark.asyncio
@@ -100,6 +109,44 @@ async def test_get_post_by_id(mocker):
         assert data["content_text"] == "Lone content"
 
 
+@pytest.mark.asyncio
+async def test_get_post_by_id_revalidates_with_etag(mocker):
+    fake_post = Post(
+        id=1, content_text="Lone content", user_id=1, created_at="2025-01-01T00:00:00"
+    )
+
+    mock_result = MagicMock()
+    mock_result.first.return_value = fake_post
+
+    mock_session = MagicMock()
+    mock_session.exec = AsyncMock(return_value=mock_result)
+
+    mocker.patch(
+        "server.services.post.get_session",
+        return_value=AsyncMock(
+            __aenter__=AsyncMock(return_value=mock_session), __aexit__=AsyncMock()
+        ),
+    )
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=base_url) as ac:
+        resp = await ac.get("/api/v1/posts/1")
+        etag = resp.headers["ETag"]
+        assert "must-revalidate" in resp.headers["Cache-Control"]
+
+        resp = await ac.get("/api/v1/posts/1", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.content == b""
+        assert resp.headers["ETag"] == etag
+
+        # A new comment changes the representation, so the old tag misses
+        fake_post.comment_count = 1
+        await post_cache.clear()
+        resp = await ac.get("/api/v1/posts/1", headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.headers["ETag"] != etag
+
+
 @pytest.mark.asyncio
 async def test_update_post(mocker):
     fake_post = Post(
@@ -199,3 +246,39 @@ async def test_get_posts_by_user_id(mocker):
         assert all(post["user_id"] == 42 for post in data)
         assert data[0]["content_text"] == "Post 1"
         assert data[1]["content_text"] == "Post 2"
+
+
+@pytest.mark.asyncio
+async def test_get_all_posts_paginated(mocker):
+    fake_posts = [
+        Post(
+            id=i,
+            content_text=f"Content {i}",
+            user_id=1,
+            created_at=f"2025-01-0{i}T00:00:00Z",
+        )
+        for i in (3, 2, 1)
+    ]
+
+    mock_result = MagicMock()
+    mock_result.all.return_value = fake_posts
+
+    mock_session = MagicMock()
+    mock_session.exec = AsyncMock(return_value=mock_result)
+
+    mocker.patch(
+        "server.services.post.get_session",
+        return_value=AsyncMock(
+            __aenter__=AsyncMock(return_value=mock_session), __aexit__=AsyncMock()
+        ),
+    )
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=base_url) as ac:
+        resp = await ac.get("/api/v1/posts/", params={"limit": 2})
+        assert resp.status_code == 200
+        assert [post["id"] for post in resp.json()] == [3, 2]
+        assert resp.headers["X-Next-Cursor"]
+
+        resp = await ac.get("/api/v1/posts/", params={"cursor": "garbage"})
+        assert resp.status_code == 400
@@ -1,8 +1,10 @@
+import sqlite3
 import pytest
 from httpx import AsyncClient, ASGITransport
 from server import app
 from server.db.models import Reaction
 from unittest.mock import MagicMock, AsyncMock
+from sqlalchemy.exc import IntegrityError
 from server.common.config import base_url
 
 
@@ -12,6 +14,11 @@ async def test_create_reaction(mocker):
 
     mock_session = MagicMock()
     mock_session.add = MagicMock()
+    mock_session.flush = AsyncMock()
+    # Reaction counter updates; the post's breakdown reads back empty
+    mock_session.exec = AsyncMock(
+        return_value=MagicMock(all=MagicMock(return_value=[]))
+    )
     mock_session.commit = AsyncMock()
     mock_session.refresh = AsyncMock()
 
@@ -35,6 +42,35 @@ async def test_create_reaction(mocker):
         assert data["type"] == "like"
 
 
+@pytest.mark.asyncio
+async def test_create_duplicate_reaction(mocker):
+    payload = {"post_id": 1, "user_id": 42, "type": "like"}
+
+    mock_session = MagicMock()
+    mock_session.add = MagicMock()
+    mock_session.flush = AsyncMock(
+        side_effect=IntegrityError(
+            "INSERT",
+            {},
+            sqlite3.IntegrityError(
+                "UNIQUE constraint failed: reaction.post_id, reaction.user_id, reaction.type"
+            ),
+        )
+    )
+
+    mocker.patch(
+        "server.services.reaction.get_session",
+        return_value=AsyncMock(
+            __aenter__=AsyncMock(return_value=mock_session), __aexit__=AsyncMock()
+        ),
+    )
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=base_url) as ac:
+        resp = await ac.post("/api/v1/reactions/", json=payload)
+        assert resp.status_code == 409
+
+
 @pytest.mark.asyncio
 async def test_get_reactions_for_post(mocker):
     fake_reactions = [
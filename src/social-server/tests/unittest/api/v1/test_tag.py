@@ -18,11 +18,19 @@ async def test_create_tag():
 async def test_assign_tag_to_post():
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url=base_url) as ac:
+        user_resp = await ac.post(
+            "/api/v1/users/", json={"username": "tagger", "password": "123"}
+        )
+        post_resp = await ac.post(
+            "/api/v1/posts/",
+            json={"user_id": user_resp.json()["id"], "content_text": "Tag me"},
+        )
+        post_id = post_resp.json()["id"]
         tag_resp = await ac.post("/api/v1/tags/", json={"name": "drama"})
         tag_id = tag_resp.json()["id"]
 
         resp = await ac.post(
-            "/api/v1/tags/assign", json={"post_id": 1, "tag_id": tag_id}
+            "/api/v1/tags/assign", json={"post_id": post_id, "tag_id": tag_id}
         )
         assert resp.status_code == 200
-        assert resp.json()["post_id"] == 1
+        assert resp.json()["post_id"] == post_id
@@ -0,0 +1,38 @@
+import os
+import tempfile
+
+# Run against a throwaway SQLite file unless a database is given, e.g.
+# DATABASE_URL=postgresql+asyncpg://postgres@localhost:5432/social_test pytest
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'test_social.db')}",
+)
+
+import pytest  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+from sqlmodel.ext.asyncio.session import AsyncSession  # noqa: E402
+from server.db.search import search_document  # noqa: E402
+from server.db.session import engine, init_db  # noqa: E402
+from server.services.cache import clear_caches  # noqa: E402
+from server.services.graph import index as graph_index  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+async def database():
+    await init_db()
+    # Cached rows would outlive the mocks and table wipes between tests
+    await clear_caches()
+    graph_index.reset()
+    yield
+    # Pooled connections are bound to this test's event loop
+    await engine.dispose()
+
+
+@pytest.fixture
+async def db_session(database):
+    async with engine.begin() as conn:
+        for table in reversed(SQLModel.metadata.sorted_tables):
+            await conn.execute(table.delete())
+        await conn.execute(search_document.delete())
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
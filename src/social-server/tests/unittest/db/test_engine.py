@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import create_engine as create_sync_engine, event, insert, text
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import SQLModel
+from server.db.engine import create_engine, is_unique_violation
+from server.db.models import Follow, User
+
+
+async def _pragma(engine, name):
+    async with engine.connect() as conn:
+        return (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+
+
+@pytest.mark.asyncio
+async def test_production_profile_applies_sqlite_pragmas(tmp_path):
+    engine = create_engine(f"sqlite+aiosqlite:///{tmp_path / 'prod.db'}", "production")
+
+    assert engine.echo is False
+    assert await _pragma(engine, "journal_mode") == "wal"
+    assert await _pragma(engine, "synchronous") == 1  # NORMAL
+    assert await _pragma(engine, "busy_timeout") == 5000
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_dev_profile_keeps_driver_defaults(tmp_path):
+    engine = create_engine(f"sqlite+aiosqlite:///{tmp_path / 'dev.db'}", "dev")
+
+    assert engine.echo is True
+    assert await _pragma(engine, "journal_mode") == "delete"
+    await engine.dispose()
+
+
+def test_in_memory_database_skips_pool_sizing():
+    engine = create_engine("sqlite+aiosqlite:///:memory:", "production")
+    assert engine.url.database == ":memory:"
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError):
+        create_engine("sqlite+aiosqlite:///:memory:", "turbo")
+
+
+def test_is_unique_violation_tells_duplicates_from_foreign_keys(tmp_path):
+    engine = create_sync_engine(f"sqlite:///{tmp_path / 'fk.db'}")
+
+    @event.listens_for(engine, "connect")
+    def enforce_foreign_keys(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User).values(id=1, username="a", password_hash="x"))
+        conn.execute(insert(User).values(id=2, username="b", password_hash="x"))
+        conn.execute(insert(Follow).values(follower_id=1, following_id=2))
+
+    errors = []
+    for values in (
+        {"follower_id": 1, "following_id": 2},
+        {"follower_id": 1, "following_id": 9},
+    ):
+        with pytest.raises(IntegrityError) as caught, engine.begin() as conn:
+            conn.execute(insert(Follow).values(**values))
+        errors.append(is_unique_violation(caught.value))
+    assert errors == [True, False]
+    engine.dispose()
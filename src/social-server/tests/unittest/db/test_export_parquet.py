@@ -0,0 +1,62 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from server.db.models import Post, Tag, User
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.dataset as ds  # noqa: E402
+from scripts.export_parquet import arrow_schema, export_all  # noqa: E402
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _read(out, table):
+    return ds.dataset(str(out / table), format="parquet").to_table().to_pylist()
+
+
+def test_schema_follows_model_columns():
+    schema = arrow_schema(Post.__table__)
+    assert schema.field("id").type == pa.int64()
+    assert not schema.field("id").nullable
+    assert schema.field("created_at").type == pa.timestamp("us", tz="UTC")
+    assert schema.field("updated_at").nullable
+    assert schema.field("followers_fanned_out").type == pa.bool_()
+    assert schema.field("reaction_counts").type == pa.string()
+
+
+@pytest.mark.asyncio
+async def test_incremental_export_appends_new_rows(db_session, tmp_path):
+    user = User(username="author", password_hash="x", created_at=START)
+    db_session.add_all([user, Tag(name="news")])
+    await db_session.flush()
+    db_session.add_all(
+        [
+            Post(user_id=user.id, content_text="a", created_at=START),
+            Post(user_id=user.id, content_text="b", created_at=START),
+        ]
+    )
+    await db_session.commit()
+
+    counts = await export_all(str(tmp_path), tables=["post", "tag"])
+    assert counts == {"tag": 1, "post": 2}
+    posts = _read(tmp_path, "post")
+    assert [post["content_text"] for post in posts] == ["a", "b"]
+    assert posts[0]["created_at"] == START
+    assert posts[0]["reaction_counts"] == "{}"
+
+    db_session.add(
+        Post(user_id=user.id, content_text="c", created_at=START + timedelta(hours=1))
+    )
+    await db_session.commit()
+    counts = await export_all(str(tmp_path), incremental=True, tables=["post", "tag"])
+    assert counts == {"tag": 1, "post": 1}
+    assert sorted(post["content_text"] for post in _read(tmp_path, "post")) == [
+        "a",
+        "b",
+        "c",
+    ]
+    # Tables without a time column are replaced, not appended
+    assert len(_read(tmp_path, "tag")) == 1
+
+    # A full run starts over
+    await export_all(str(tmp_path), tables=["post"])
+    assert len(_read(tmp_path, "post")) == 3
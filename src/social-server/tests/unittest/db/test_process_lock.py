@@ -0,0 +1,12 @@
+from server.common.process_lock import try_lock
+
+
+def test_only_one_holder_until_released():
+    first = try_lock("test-job")
+    assert first is not None
+    assert try_lock("test-job") is None
+    first.close()
+
+    again = try_lock("test-job")
+    assert again is not None
+    again.close()
@@ -0,0 +1,132 @@
+from sqlalchemy import create_engine, inspect, text
+from sqlmodel import SQLModel
+from server.db.session import (
+    create_missing_columns,
+    create_missing_indexes,
+    drop_duplicate_rows,
+    order_friendship_pairs,
+)
+
+
+def test_create_missing_columns_adds_new_model_columns(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE post DROP COLUMN comment_count"))
+        conn.execute(
+            text(
+                "INSERT INTO post (user_id, content_text, visibility, created_at, "
+                "followers_fanned_out, reaction_count, reaction_counts) "
+                "VALUES (1, 'old', 'public', '2025-01-01', 1, 0, '{}')"
+            )
+        )
+
+    with engine.begin() as conn:
+        create_missing_columns(conn)
+        create_missing_columns(conn)  # no-op once the schema matches
+        columns = {column["name"] for column in inspect(conn).get_columns("post")}
+        count = conn.execute(text("SELECT comment_count FROM post")).scalar()
+
+    assert "comment_count" in columns
+    assert count == 0
+    engine.dispose()
+
+
+def test_order_friendship_pairs_keeps_one_row_per_pair(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        # The directed table, before pairs were ordered
+        conn.execute(text("DROP TABLE friendship"))
+        conn.execute(
+            text(
+                "CREATE TABLE friendship (id INTEGER PRIMARY KEY, user_id INTEGER, "
+                "friend_id INTEGER, status VARCHAR, created_at DATETIME)"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO friendship (user_id, friend_id, status, created_at) "
+                "VALUES (1, 2, 'requested', '2025-01-01'), "
+                "(2, 1, 'accepted', '2025-01-01'), "
+                "(3, 1, 'blocked', '2025-01-01'), "
+                "(1, 3, 'accepted', '2025-01-01'), "
+                "(4, 4, 'accepted', '2025-01-01'), "
+                "(5, 2, 'requested', '2025-01-01')"
+            )
+        )
+
+    with engine.begin() as conn:
+        create_missing_columns(conn)
+        order_friendship_pairs(conn)
+        create_missing_indexes(conn)
+        order_friendship_pairs(conn)  # no-op once the unique index exists
+        rows = conn.execute(
+            text(
+                "SELECT user_id, friend_id, requester_id, status FROM friendship "
+                "ORDER BY user_id, friend_id"
+            )
+        ).all()
+
+    assert [tuple(row) for row in rows] == [
+        (1, 2, 2, "accepted"),
+        (1, 3, 3, "blocked"),
+        (2, 5, 5, "requested"),
+    ]
+    engine.dispose()
+
+
+def test_drop_duplicate_rows_keeps_the_first_row_per_key(tmp_path, caplog):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        # Before the unique indexes, the seeder could repeat a follow
+        conn.execute(text("DROP INDEX ux_follow_follower_id_following_id"))
+        conn.execute(text("DROP INDEX ux_reaction_post_id_user_id_type"))
+        conn.execute(
+            text(
+                "INSERT INTO follow (follower_id, following_id, created_at) "
+                "VALUES (1, 2, '2025-01-01'), (1, 2, '2025-01-02'), "
+                "(2, 1, '2025-01-01'), (1, 2, '2025-01-03')"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO reaction (post_id, user_id, type, created_at) "
+                "VALUES (1, 1, 'like', '2025-01-01'), (1, 1, 'wow', '2025-01-01'), "
+                "(1, 1, 'like', '2025-01-02')"
+            )
+        )
+
+    def ids(conn, table):
+        return list(conn.execute(text(f"SELECT id FROM {table} ORDER BY id")).scalars())
+
+    def unique_indexes(conn):
+        return {
+            index["name"]
+            for table in ("follow", "reaction")
+            for index in inspect(conn).get_indexes(table)
+            if index["unique"]
+        }
+
+    # Startup deletes nothing: it leaves the indexes out and says why
+    with engine.begin() as conn:
+        create_missing_indexes(conn)
+        assert ids(conn, "follow") == [1, 2, 3, 4]
+        assert unique_indexes(conn) == set()
+    assert "Not building ux_follow_follower_id_following_id" in caplog.text
+
+    caplog.clear()
+    with engine.begin() as conn:
+        drop_duplicate_rows(conn)
+        create_missing_indexes(conn)
+        drop_duplicate_rows(conn)  # no-op once the unique indexes exist
+        assert ids(conn, "follow") == [1, 3]
+        assert ids(conn, "reaction") == [1, 2]
+        assert unique_indexes(conn) == {
+            "ux_follow_follower_id_following_id",
+            "ux_reaction_post_id_user_id_type",
+        }
+    assert "Dropped 2 rows of follow" in caplog.text
+    assert "Dropped 1 rows of reaction" in caplog.text
+    engine.dispose()
@@ -0,0 +1,210 @@
+import asyncio
+import json
+import pytest
+from datetime import datetime, timezone
+from httpx import AsyncClient, ASGITransport
+from server import app
+from server.common import config
+from server.db.models import Category, Post, PostCategory, PostTag, Tag, User
+from server.schemas.comment import CommentCreate
+from server.schemas.follow import FollowCreate
+from server.schemas.post import PostCreate
+from server.schemas.reaction import ReactionCreate
+from server.services.activity import (
+    ActivityHub,
+    Topics,
+    activity_event,
+    hub,
+    stream_events,
+)
+from server.services.cache import LocalRedis
+from server.services.comment import create_comment
+from server.services.follow import create_follow
+from server.services.post import create_post
+from server.services.reaction import create_reaction
+
+
+def _event(type="comment", actor_id=1, user_id=2, tag_ids=(), category_ids=()):
+    event = activity_event(
+        type, 1, actor_id, datetime.now(timezone.utc), post_id=1, user_id=user_id
+    )
+    return {**event, "tag_ids": list(tag_ids), "category_ids": list(category_ids)}
+
+
+def _drain(subscriber):
+    events = []
+    while not subscriber.queue.empty():
+        events.append(subscriber.queue.get_nowait())
+    return events
+
+
+async def _setup(db_session):
+    author = User(username="author", password_hash="x")
+    fan = User(username="fan", password_hash="x")
+    tag = Tag(name="python")
+    category = Category(name="tech", description="")
+    db_session.add_all([author, fan, tag, category])
+    await db_session.flush()
+    public = Post(user_id=author.id, content_text="open")
+    private = Post(user_id=author.id, content_text="closed", visibility="private")
+    db_session.add_all([public, private])
+    await db_session.flush()
+    db_session.add_all(
+        [
+            PostTag(post_id=public.id, tag_id=tag.id),
+            PostCategory(post_id=public.id, category_id=category.id),
+        ]
+    )
+    await db_session.commit()
+    return author.id, fan.id, public.id, private.id, tag.id, category.id
+
+
+def test_topics_match_every_given_dimension():
+    assert Topics().matches(_event())
+    assert Topics(types=["comment", "post"]).matches(_event())
+    assert not Topics(types=["follow"]).matches(_event())
+    # A user filter sees what they do and what is done to them
+    assert Topics(user_ids=[1]).matches(_event())
+    assert Topics(user_ids=[2]).matches(_event())
+    assert not Topics(user_ids=[3]).matches(_event())
+    labelled = _event(tag_ids=[5, 6], category_ids=[7])
+    assert Topics(tag_ids=[6, 9], category_ids=[7]).matches(labelled)
+    assert not Topics(tag_ids=[6], category_ids=[8]).matches(labelled)
+    assert not Topics(types=["comment"], tag_ids=[5]).matches(_event())
+
+
+@pytest.mark.asyncio
+async def test_a_slow_subscriber_loses_its_oldest_events():
+    local = ActivityHub(buffer_size=2)
+    slow = local.subscribe(Topics())
+    picky = local.subscribe(Topics(types=["follow"]))
+    for actor_id in (1, 2, 3):
+        await local.publish(_event(actor_id=actor_id))
+
+    assert [e["actor_id"] for e in _drain(slow)] == [2, 3]
+    assert slow.dropped == 1
+    assert _drain(picky) == [] and picky.dropped == 0
+
+    full = ActivityHub(max_subscribers=1)
+    assert full.subscribe(Topics()) is not None
+    assert full.subscribe(Topics()) is None
+
+
+@pytest.mark.asyncio
+async def test_stream_reports_gaps_heartbeats_and_ends_on_stop():
+    local = ActivityHub(buffer_size=1)
+    subscriber = local.subscribe(Topics())
+    await local.publish(_event(actor_id=1))
+    await local.publish(_event(actor_id=2))
+
+    stream = stream_events(subscriber, heartbeat=0.01)
+    gap = await stream.__anext__()
+    assert gap == 'event: gap\ndata: {"dropped": 1}\n\n'
+    event = await stream.__anext__()
+    lines = event.splitlines()
+    assert lines[:2] == ["id: 2", "event: comment"]
+    assert json.loads(lines[2][len("data: ") :])["actor_id"] == 2
+    assert await stream.__anext__() == ": keep-alive\n\n"
+
+    await local.stop()
+    with pytest.raises(StopAsyncIteration):
+        await stream.__anext__()
+
+
+@pytest.mark.asyncio
+async def test_workers_share_events_through_the_broker():
+    broker = LocalRedis()
+    workers = [ActivityHub(broker), ActivityHub(broker)]
+    for worker in workers:
+        await worker.start()
+    subscribers = [worker.subscribe(Topics()) for worker in workers]
+    try:
+        # Published by one worker, seen by the streams on both
+        await workers[0].publish(_event(actor_id=7))
+        for subscriber in subscribers:
+            event = await subscriber.next(1)
+            assert event["actor_id"] == 7
+    finally:
+        for worker in workers:
+            await worker.stop()
+    assert broker.channels["activity"] == set()
+
+
+@pytest.mark.asyncio
+async def test_creates_publish_public_activity_with_labels(db_session):
+    author, fan, public, private, tag, category = await _setup(db_session)
+    everything = hub.subscribe(Topics())
+    tagged = hub.subscribe(Topics(tag_ids=[tag], category_ids=[category]))
+    try:
+        await create_comment(
+            CommentCreate(post_id=public, user_id=fan, content_text="nice")
+        )
+        await create_comment(
+            CommentCreate(post_id=private, user_id=fan, content_text="shh")
+        )
+        await create_reaction(ReactionCreate(post_id=public, user_id=fan, type="like"))
+        await create_follow(FollowCreate(follower_id=fan, following_id=author))
+        post = await create_post(PostCreate(user_id=author, content_text="new"))
+
+        events = _drain(everything)
+        assert [(e["type"], e["actor_id"], e["user_id"]) for e in events] == [
+            ("comment", fan, author),
+            ("reaction", fan, author),
+            ("follow", fan, author),
+            ("post", author, author),
+        ]
+        assert events[0]["tag_ids"] == [tag]
+        assert events[0]["category_ids"] == [category]
+        assert events[-1]["post_id"] == post.id
+        # The new post has no tags yet, and the follow is on no post
+        assert [e["type"] for e in _drain(tagged)] == ["comment", "reaction"]
+    finally:
+        hub.unsubscribe(everything)
+        hub.unsubscribe(tagged)
+
+
+@pytest.mark.asyncio
+async def test_a_failing_broker_does_not_fail_the_write(db_session, monkeypatch):
+    _, fan, public, _, _, _ = await _setup(db_session)
+
+    class DownBroker:
+        async def publish(self, channel, message):
+            raise ConnectionError("broker down")
+
+    monkeypatch.setattr(hub, "client", DownBroker())
+    comment = await create_comment(
+        CommentCreate(post_id=public, user_id=fan, content_text="still saved")
+    )
+    assert comment.id is not None
+
+
+@pytest.mark.asyncio
+async def test_stream_route(db_session, monkeypatch):
+    author, fan, public, _, _, _ = await _setup(db_session)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=config.base_url) as client:
+        url = "/api/v1/activity/stream"
+        # The transport hands the body over once the stream ends
+        request = asyncio.create_task(
+            client.get(url, params={"type": ["reaction"], "user_id": [author]})
+        )
+        while not hub.subscribers:
+            await asyncio.sleep(0.01)
+        await create_comment(
+            CommentCreate(post_id=public, user_id=fan, content_text="nice")
+        )
+        await create_reaction(ReactionCreate(post_id=public, user_id=fan, type="wow"))
+        await hub.stop()
+        response = await asyncio.wait_for(request, 1)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.text.count("event: reaction\n") == 1
+        assert "event: comment" not in response.text
+        assert not hub.subscribers
+
+        monkeypatch.setattr(hub, "max_subscribers", 0)
+        response = await client.get(url)
+        assert response.status_code == 503
+        response = await client.get(url, params={"type": "view"})
+        assert response.status_code == 422
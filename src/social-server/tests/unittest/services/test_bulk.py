@@ -0,0 +1,105 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlmodel import select
+from server import app
+from server.common import config
+from server.common.config import base_url
+from server.db.models import Follow, Post, Reaction, User, UserFeed
+from server.services import reaction as reaction_service
+from server.services.reaction import create_reactions_bulk
+
+
+async def _users(session, count):
+    users = [User(username=f"user{i}", password_hash="x") for i in range(count)]
+    session.add_all(users)
+    await session.commit()
+    return users
+
+
+@pytest.mark.asyncio
+async def test_bulk_posts_report_bad_items_and_fan_out(db_session):
+    author, follower = await _users(db_session, 2)
+    db_session.add(Follow(follower_id=follower.id, following_id=author.id))
+    await db_session.commit()
+    items = [
+        {"user_id": author.id, "content_text": "one"},
+        {"user_id": author.id},
+        {"user_id": 999999, "content_text": "ghost"},
+        {"user_id": author.id, "content_text": "two"},
+    ]
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=base_url) as ac:
+        resp = await ac.post("/api/v1/posts/bulk", json=items)
+
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["ids"][1] is None and data["ids"][2] is None
+    assert None not in (data["ids"][0], data["ids"][3])
+    assert [error["index"] for error in data["errors"]] == [1, 2]
+    assert "content_text" in data["errors"][0]["detail"]
+    assert "not found" in data["errors"][1]["detail"]
+
+    result = await db_session.exec(
+        select(UserFeed.post_id).where(UserFeed.user_id == follower.id)
+    )
+    assert set(result.all()) == {data["ids"][0], data["ids"][3]}
+
+
+@pytest.mark.asyncio
+async def test_bulk_reactions_skip_duplicates(db_session):
+    (user,) = await _users(db_session, 1)
+    post = Post(user_id=user.id, content_text="hi")
+    db_session.add(post)
+    await db_session.commit()
+    item = {"post_id": post.id, "user_id": user.id, "type": "like"}
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=base_url) as ac:
+        first = await ac.post("/api/v1/reactions/bulk", json=[item, item])
+        second = await ac.post("/api/v1/reactions/bulk", json=[item])
+
+    assert first.json()["ids"][1] is None
+    assert first.json()["errors"] == [{"index": 1, "detail": "Reaction already exists"}]
+    assert second.json()["ids"] == [None]
+
+
+@pytest.mark.asyncio
+async def test_bulk_reactions_survive_a_concurrent_duplicate(db_session, monkeypatch):
+    (user,) = await _users(db_session, 1)
+    post = Post(user_id=user.id, content_text="hi")
+    db_session.add(post)
+    await db_session.commit()
+    post_id, user_id = post.id, user.id
+    checked = reaction_service._reject_existing
+
+    async def raced(session, batch):
+        rejected = await checked(session, batch)
+        if not rejected:
+            # Another request adds the like between the check and the insert
+            db_session.add(Reaction(post_id=post_id, user_id=user_id, type="like"))
+            await db_session.commit()
+        return rejected
+
+    monkeypatch.setattr(reaction_service, "_reject_existing", raced)
+    result = await create_reactions_bulk(
+        [
+            {"post_id": post_id, "user_id": user_id, "type": "like"},
+            {"post_id": post_id, "user_id": user_id, "type": "wow"},
+        ]
+    )
+
+    assert result.ids[0] is None and result.ids[1] is not None
+    assert [error.detail for error in result.errors] == ["Reaction already exists"]
+    await db_session.refresh(post)
+    assert post.reaction_counts == {"wow": 1}
+
+
+@pytest.mark.asyncio
+async def test_bulk_rejects_oversized_batch():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=base_url) as ac:
+        resp = await ac.post(
+            "/api/v1/comments/bulk", json=[{}] * (config.MAX_BULK_ITEMS + 1)
+        )
+    assert resp.status_code == 422
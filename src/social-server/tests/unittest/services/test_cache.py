@@ -0,0 +1,121 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from server import app
+from server.common.config import base_url
+from server.db.models import Post, User
+from server.schemas.comment import CommentCreate
+from server.schemas.post import PostUpdate
+from server.schemas.tag import TagCreate
+from server.services import cache as cache_module
+from server.services.cache import (
+    Cache,
+    LocalBackend,
+    LocalRedis,
+    post_cache,
+    tag_cache,
+)
+from server.services.comment import create_comment
+from server.services.post import get_post_by_id, update_post
+from server.services.tag import create_tag, get_all_tags
+
+
+class Loader:
+    def __init__(self, value="v"):
+        self.value = value
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+@pytest.mark.asyncio
+async def test_local_backend_evicts_least_recently_used_and_expired(monkeypatch):
+    backend = LocalBackend(max_entries=2)
+    await backend.set("a", 1, ttl=10)
+    await backend.set("b", 2, ttl=10)
+    await backend.get("a")  # "b" is now the least recently used
+    await backend.set("c", 3, ttl=10)
+    assert await backend.get("b") is cache_module.MISSING
+    assert await backend.get("a") == 1
+
+    now = cache_module.time.monotonic()
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now + 11)
+    assert await backend.get("a") is cache_module.MISSING
+
+
+@pytest.mark.parametrize("client", [None, LocalRedis()])
+@pytest.mark.asyncio
+async def test_cache_reads_through_and_counts(client):
+    cache = Cache("thing", ttl=60, max_entries=10, client=client)
+    load = Loader({"id": 1})
+
+    assert await cache.get_or_load(1, load) == {"id": 1}
+    assert await cache.get_or_load(1, load) == {"id": 1}
+    assert load.calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    await cache.invalidate(1)
+    await cache.get_or_load(1, load)
+    assert load.calls == 2
+
+    # Misses for absent rows are not cached
+    missing = Loader(None)
+    await cache.get_or_load(2, missing)
+    await cache.get_or_load(2, missing)
+    assert missing.calls == 2
+
+    await cache.clear()
+    await cache.get_or_load(1, load)
+    assert load.calls == 3
+    assert cache.stats()["hit_rate"] == pytest.approx(1 / 6)
+
+
+@pytest.mark.asyncio
+async def test_load_overlapping_invalidation_is_not_stored():
+    cache = Cache("thing", ttl=60, max_entries=10)
+
+    async def stale_load():
+        await cache.invalidate(1)  # a writer commits while the read is in flight
+        return "stale"
+
+    assert await cache.get_or_load(1, stale_load) == "stale"
+    assert await cache.get_or_load(1, Loader("fresh")) == "fresh"
+
+
+@pytest.mark.asyncio
+async def test_post_cache_invalidated_by_writes(db_session):
+    user = User(username="author", password_hash="x")
+    db_session.add(user)
+    await db_session.flush()
+    post = Post(user_id=user.id, content_text="before")
+    db_session.add(post)
+    await db_session.commit()
+
+    assert (await get_post_by_id(post.id)).content_text == "before"
+    hits = post_cache.hits
+    await get_post_by_id(post.id)
+    assert post_cache.hits == hits + 1
+
+    await update_post(post.id, PostUpdate(content_text="after"))
+    assert (await get_post_by_id(post.id)).content_text == "after"
+
+    await create_comment(
+        CommentCreate(post_id=post.id, user_id=user.id, content_text="hi")
+    )
+    assert (await get_post_by_id(post.id)).comment_count == 1
+
+
+@pytest.mark.asyncio
+async def test_tag_list_invalidated_by_create(db_session):
+    assert await get_all_tags() == []
+    await create_tag(TagCreate(name="news"))
+    assert [tag.name for tag in await get_all_tags()] == ["news"]
+    assert tag_cache.misses >= 2
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=base_url) as ac:
+        resp = await ac.get("/api/v1/cache/stats")
+    assert resp.status_code == 200
+    assert set(resp.json()) == {"user", "post", "tag", "category"}
+    assert resp.json()["tag"]["misses"] == tag_cache.misses
@@ -0,0 +1,78 @@
+import pytest
+from sqlmodel import select
+from server.db.models import Post, User
+from server.schemas.comment import CommentCreate
+from server.schemas.reaction import ReactionCreate
+from server.services.comment import create_comment, delete_comment
+from server.services.counters import recompute_counters
+from server.services.reaction import (
+    create_reaction,
+    create_reactions_bulk,
+    delete_reaction,
+)
+
+
+async def _post(session):
+    users = [User(username=f"user{i}", password_hash="x") for i in range(3)]
+    session.add_all(users)
+    await session.flush()
+    post = Post(user_id=users[0].id, content_text="hi")
+    session.add(post)
+    await session.commit()
+    return post, users
+
+
+async def _counters(session, post_id):
+    result = await session.exec(
+        select(Post.comment_count, Post.reaction_count, Post.reaction_counts).where(
+            Post.id == post_id
+        )
+    )
+    return tuple(result.one())
+
+
+@pytest.mark.asyncio
+async def test_counters_follow_creates_and_deletes(db_session):
+    post, users = await _post(db_session)
+
+    comment = await create_comment(
+        CommentCreate(post_id=post.id, user_id=users[1].id, content_text="nice")
+    )
+    like = await create_reaction(
+        ReactionCreate(post_id=post.id, user_id=users[1].id, type="like")
+    )
+    await create_reaction(
+        ReactionCreate(post_id=post.id, user_id=users[2].id, type="like")
+    )
+    # A rejected duplicate leaves the counters alone
+    assert not await create_reaction(
+        ReactionCreate(post_id=post.id, user_id=users[2].id, type="like")
+    )
+    await create_reactions_bulk(
+        [{"post_id": post.id, "user_id": users[2].id, "type": "wow"}]
+    )
+    assert await _counters(db_session, post.id) == (1, 3, {"like": 2, "wow": 1})
+
+    await delete_comment(comment.id)
+    await delete_reaction(like.id)
+    assert await _counters(db_session, post.id) == (0, 2, {"like": 1, "wow": 1})
+
+
+@pytest.mark.asyncio
+async def test_recompute_counters_repairs_drift(db_session):
+    post, users = await _post(db_session)
+    await create_comment(
+        CommentCreate(post_id=post.id, user_id=users[1].id, content_text="nice")
+    )
+    await create_reaction(
+        ReactionCreate(post_id=post.id, user_id=users[1].id, type="love")
+    )
+    post.comment_count, post.reaction_count = 7, 0
+    post.reaction_counts = {"haha": 3}
+    db_session.add(post)
+    await db_session.commit()
+
+    assert await recompute_counters(db_session) == 1
+    await db_session.commit()
+
+    assert await _counters(db_session, post.id) == (1, 1, {"love": 1})
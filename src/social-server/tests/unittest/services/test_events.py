@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+from datetime import datetime, timezone
+from sqlmodel import select
+from server.db.models import Notification, Post, User, UserPostViewHistory
+from server.schemas.reaction import ReactionCreate
+from server.services.events import EventLog
+from server.services.reaction import create_reaction
+
+
+async def _views(db_session):
+    result = await db_session.exec(select(UserPostViewHistory.post_id))
+    return sorted(result.all())
+
+
+async def _setup(db_session):
+    author = User(username="author", password_hash="x")
+    reader = User(username="reader", password_hash="x")
+    db_session.add_all([author, reader])
+    await db_session.flush()
+    post = Post(user_id=author.id, content_text="hi")
+    db_session.add(post)
+    await db_session.commit()
+    return author.id, reader.id, post.id
+
+
+def _view(user_id, post_id):
+    return {
+        "user_id": user_id,
+        "post_id": post_id,
+        "viewed_at": datetime.now(timezone.utc),
+    }
+
+
+class CountingLog(EventLog):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batches = []
+
+    async def _write(self, batch):
+        self.batches.append(len(batch))
+        await super()._write(batch)
+
+
+@pytest.mark.asyncio
+async def test_events_are_written_in_batches(db_session):
+    _, reader, post = await _setup(db_session)
+    log = CountingLog(batch_size=3, flush_seconds=60)
+    log.start()
+    for _ in range(7):
+        await log.record("view", **_view(reader, post))
+    await asyncio.sleep(0.05)
+    # Two full batches; the seventh waits for more company or the clock
+    assert log.batches == [3, 3]
+
+    await log.stop()
+    assert log.batches == [3, 3, 1] and log.written == 7
+    assert await _views(db_session) == [post] * 7
+
+
+@pytest.mark.asyncio
+async def test_a_partial_batch_is_written_after_flush_seconds(db_session):
+    _, reader, post = await _setup(db_session)
+    log = CountingLog(batch_size=100, flush_seconds=0.05)
+    log.start()
+    await log.record("view", **_view(reader, post))
+    await log.record("view", **_view(reader, post))
+    await asyncio.sleep(0.2)
+    assert log.batches == [2]
+    await log.stop()
+    assert log.batches == [2]
+
+
+@pytest.mark.asyncio
+async def test_a_full_queue_holds_producers_back(db_session):
+    _, reader, post = await _setup(db_session)
+    gate = asyncio.Event()
+
+    class SlowLog(EventLog):
+        async def _write(self, batch):
+            await gate.wait()
+            await super()._write(batch)
+
+    log = SlowLog(max_size=2, batch_size=1, flush_seconds=60)
+    log.start()
+    for _ in range(3):  # one being written, two queued
+        await log.record("view", **_view(reader, post))
+    blocked = asyncio.create_task(log.record("view", **_view(reader, post)))
+    await asyncio.sleep(0.05)
+    assert not blocked.done()
+
+    gate.set()
+    await asyncio.wait_for(blocked, 1)
+    await log.stop()
+    assert log.written == 4
+
+
+@pytest.mark.asyncio
+async def test_reactions_notify_the_author(db_session):
+    author, reader, post = await _setup(db_session)
+    # The shared log is not started outside the app, so it writes inline
+    await create_reaction(ReactionCreate(post_id=post, user_id=reader, type="like"))
+    await create_reaction(ReactionCreate(post_id=post, user_id=author, type="like"))
+
+    result = await db_session.exec(select(Notification))
+    notifications = result.all()
+    assert [(n.user_id, n.actor_id, n.post_id, n.type) for n in notifications] == [
+        (author, reader, post, "reaction")
+    ]
+    assert notifications[0].read is False
@@ -0,0 +1,75 @@
+import json
+import pytest
+from datetime import datetime, timedelta, timezone
+from httpx import AsyncClient, ASGITransport
+from server import app
+from server.common import config
+from server.db.models import Follow, Friendship, Post, Reaction, User
+from server.services import export
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+async def _export(ac, table, **params):
+    resp = await ac.get(f"/api/v1/export/{table}", params=params)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    return [json.loads(line) for line in resp.text.splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_export_streams_all_rows_in_batches(db_session, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 2)
+    users = [User(username=f"user{i}", password_hash="x") for i in range(3)]
+    db_session.add_all(users)
+    await db_session.flush()
+    posts = [
+        Post(
+            user_id=users[0].id,
+            content_text=f"post {i}",
+            created_at=START + timedelta(hours=i),
+        )
+        for i in range(5)
+    ]
+    db_session.add_all(posts)
+    await db_session.flush()
+    db_session.add_all(
+        [
+            Reaction(post_id=posts[0].id, user_id=users[1].id, type="like"),
+            Follow(follower_id=users[1].id, following_id=users[0].id),
+            Friendship(
+                user_id=users[0].id,
+                friend_id=users[2].id,
+                requester_id=users[0].id,
+                status="accepted",
+            ),
+        ]
+    )
+    await db_session.commit()
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=config.base_url) as ac:
+        exported = await _export(ac, "posts")
+        since = await _export(
+            ac, "posts", since=(START + timedelta(hours=3)).isoformat()
+        )
+        after = await _export(ac, "posts", after_id=posts[1].id)
+        reactions = await _export(ac, "reactions")
+        follows = await _export(ac, "follows")
+        friendships = await _export(ac, "friendships")
+        unknown = await ac.get("/api/v1/export/users")
+
+    assert [row["id"] for row in exported] == [post.id for post in posts]
+    assert exported[0]["content_text"] == "post 0"
+    assert exported[0]["reaction_counts"] == {}
+    assert datetime.fromisoformat(exported[0]["created_at"].replace("Z", "+00:00"))
+    assert [row["content_text"] for row in since] == ["post 3", "post 4"]
+    assert [row["id"] for row in after] == [post.id for post in posts[2:]]
+    assert reactions[0]["type"] == "like"
+    assert follows[0]["following_id"] == users[0].id
+    assert friendships[0]["status"] == "accepted"
+    assert unknown.status_code == 422
+
+    # One chunk per batch of EXPORT_BATCH_SIZE rows
+    chunks = [chunk async for chunk in export.stream_ndjson(export.export_query(Post))]
+    assert [chunk.count(b"\n") for chunk in chunks] == [2, 2, 1]
@@ -0,0 +1,81 @@
+import pytest
+from datetime import datetime, timezone
+from httpx import AsyncClient, ASGITransport
+from server import app
+from server.api.v1 import user_feed as user_feed_api
+from server.common import config, fast_json
+from server.db.models import Category, Follow, Post, PostCategory, PostTag, Tag, User
+from server.services import ranking
+from server.services.counters import recompute_counters
+from server.services.newsfeed import fan_out_posts
+
+
+async def _seed(session):
+    author, reader = User(username="author", password_hash="x"), User(
+        username="reader", password_hash="x", bio="hi"
+    )
+    tag, category = Tag(name="python"), Category(name="Tech", description="code")
+    session.add_all([author, reader, tag, category])
+    await session.flush()
+    session.add(Follow(follower_id=reader.id, following_id=author.id))
+    posts = [Post(user_id=author.id, content_text=f"post {i}") for i in range(5)]
+    session.add_all(posts)
+    await session.flush()
+    session.add_all(
+        [
+            PostTag(post_id=posts[0].id, tag_id=tag.id),
+            PostCategory(post_id=posts[0].id, category_id=category.id),
+        ]
+    )
+    await fan_out_posts(session, posts)
+    await recompute_counters(session)
+    await session.commit()
+    return author, reader
+
+
+@pytest.mark.asyncio
+async def test_fast_path_matches_response_model_output(db_session, monkeypatch):
+    author, reader = await _seed(db_session)
+    urls = [
+        "/api/v1/posts/?limit=3",
+        f"/api/v1/posts/by-user/{author.id}",
+        "/api/v1/users/",
+        f"/api/v1/user-feeds/by-user/{reader.id}?limit=3",
+        f"/api/v1/user-feeds/by-user/{reader.id}?order=score",
+        f"/api/v1/user-feeds/by-user/{reader.id}/hydrated",
+    ]
+    # Ranked pages are scored at read time; both passes read at one moment
+    read_at = datetime.now(timezone.utc)
+
+    class Frozen(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return read_at
+
+    monkeypatch.setattr(ranking, "datetime", Frozen)
+
+    async def unchanged(user_id):
+        pass
+
+    # Opening the feed would move last_active_at between the passes
+    monkeypatch.setattr(user_feed_api, "record_active", unchanged)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=config.base_url) as ac:
+        monkeypatch.setattr(config, "FAST_JSON_RESPONSES", False)
+        slow = [await ac.get(url) for url in urls]
+        monkeypatch.setattr(config, "FAST_JSON_RESPONSES", True)
+        # Otherwise both passes would take the slow path
+        assert fast_json.enabled()
+        fast = [await ac.get(url) for url in urls]
+
+    for url, expected, actual in zip(urls, slow, fast):
+        assert actual.status_code == expected.status_code == 200, url
+        assert actual.json() == expected.json(), url
+        assert actual.headers.get("X-Next-Cursor") == expected.headers.get(
+            "X-Next-Cursor"
+        )
+    assert fast[0].headers["X-Next-Cursor"]
+    # Nested schemas drop keys they do not declare, like the tag description
+    (tag,) = fast[-1].json()[-1]["tags"]
+    assert set(tag) == {"id", "name"}
@@ -0,0 +1,72 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from server import app
+from server.common import config
+from server.db.models import User
+
+
+@pytest.mark.asyncio
+async def test_friendship_is_one_row_per_pair(db_session):
+    users = [User(username=f"user{i}", password_hash="x") for i in range(4)]
+    db_session.add_all(users)
+    await db_session.commit()
+    low, high, other, stranger = (user.id for user in users)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=config.base_url) as client:
+        response = await client.post(
+            "/api/v1/friendships/",
+            json={"user_id": high, "friend_id": low},
+        )
+        assert response.status_code == 200
+        created = response.json()
+        assert (created["user_id"], created["friend_id"]) == (low, high)
+        assert created["requester_id"] == high
+        assert created["status"] == "requested"
+
+        # The reverse request is the same pair
+        response = await client.post(
+            "/api/v1/friendships/",
+            json={"user_id": low, "friend_id": high, "status": "requested"},
+        )
+        assert response.status_code == 409
+        for a, b in ((low, high), (high, low)):
+            response = await client.get(f"/api/v1/friendships/between/{a}/{b}")
+            assert response.json()["id"] == created["id"]
+        response = await client.get(f"/api/v1/friendships/between/{low}/{other}")
+        assert response.status_code == 404
+
+        # requested -> accepted -> blocked, and no way back
+        url = f"/api/v1/friendships/{created['id']}"
+        response = await client.put(url, json={"status": "accepted"})
+        assert response.json()["status"] == "accepted"
+        # A friendship cannot be created accepted, only answered
+        response = await client.post(
+            "/api/v1/friendships/",
+            json={"user_id": other, "friend_id": high, "status": "accepted"},
+        )
+        assert response.status_code == 422
+        response = await client.post(
+            "/api/v1/friendships/", json={"user_id": other, "friend_id": high}
+        )
+        await client.put(
+            f"/api/v1/friendships/{response.json()['id']}",
+            json={"status": "accepted"},
+        )
+        await client.post(
+            "/api/v1/friendships/",
+            json={"user_id": stranger, "friend_id": high},
+        )
+        response = await client.get(f"/api/v1/friendships/by-user/{high}/friends")
+        assert response.json() == [low, other]
+        response = await client.get(f"/api/v1/friendships/by-user/{high}")
+        assert len(response.json()) == 3
+
+        response = await client.put(url, json={"status": "blocked"})
+        assert response.json()["status"] == "blocked"
+        response = await client.put(url, json={"status": "accepted"})
+        assert response.status_code == 409
+        response = await client.put(url, json={"status": "friends"})
+        assert response.status_code == 422
+        response = await client.get(f"/api/v1/friendships/by-user/{high}/friends")
+        assert response.json() == [other]
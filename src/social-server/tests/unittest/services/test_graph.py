@@ -0,0 +1,150 @@
+import numpy as np
+import pytest
+from httpx import AsyncClient, ASGITransport
+from server import app
+from server.common import config
+from server.db.models import Follow, Friendship, User
+from server.schemas.follow import FollowCreate
+from server.schemas.friendship import FriendshipCreate, FriendshipUpdate
+from server.services import follow as follow_service
+from server.services import friendship as friendship_service
+from server.services.friendship import ordered_pair
+from server.services.graph import (
+    Adjacency,
+    get_counts,
+    get_friend_suggestions,
+    get_mutual_friends,
+    index,
+    is_following,
+)
+
+
+def test_adjacency_overlays_changes_on_the_built_arrays():
+    edges = Adjacency(np.array([1, 1, 2, 1]), np.array([3, 2, 3, 3]))
+    assert edges.neighbours(1).tolist() == [2, 3]
+    assert edges.degree(1) == 2 and edges.degree(7) == 0
+
+    edges.add(1, 5)
+    edges.remove(1, 2)
+    edges.add(9, 1)  # beyond the built node range
+    assert edges.neighbours(1).tolist() == [3, 5]
+    assert edges.degree(1) == 2
+    assert edges.has(1, 5) and not edges.has(1, 2) and edges.has(9, 1)
+
+    edges.add(1, 2)
+    edges.remove(1, 5)
+    assert edges.neighbours(1).tolist() == [2, 3]
+    assert not edges.added[1] and not edges.removed[1]
+
+
+def _friendship(requester, other, status):
+    user_id, friend_id = ordered_pair(requester, other)
+    return Friendship(
+        user_id=user_id, friend_id=friend_id, requester_id=requester, status=status
+    )
+
+
+async def _users(db_session, n):
+    users = [User(username=f"user{i}", password_hash="x") for i in range(n)]
+    db_session.add_all(users)
+    await db_session.commit()
+    return [user.id for user in users]
+
+
+@pytest.mark.asyncio
+async def test_graph_queries_follow_writes(db_session):
+    me, a, b, c, d, e = await _users(db_session, 6)
+    db_session.add_all(
+        [Follow(follower_id=me, following_id=a), Follow(follower_id=b, following_id=me)]
+        + [
+            _friendship(me, a, "accepted"),
+            _friendship(b, me, "accepted"),
+            _friendship(a, c, "accepted"),
+            _friendship(c, b, "accepted"),
+            _friendship(a, d, "accepted"),
+            # A pending request is neither a friend nor a suggestion
+            _friendship(a, e, "accepted"),
+            _friendship(me, e, "requested"),
+        ]
+    )
+    await db_session.commit()
+
+    assert await get_counts(me) == {
+        "user_id": me,
+        "followers": 1,
+        "following": 1,
+        "friends": 2,
+    }
+    assert await is_following(me, [a, b]) == {a: True, b: False}
+    assert await get_mutual_friends(me, c) == sorted([a, b])
+    assert await get_friend_suggestions(me, 10) == [(c, 2), (d, 1)]
+
+    # Writes through the services reach the built index without a rebuild
+    built_at = index.built_at
+    created = await follow_service.create_follow(
+        FollowCreate(follower_id=me, following_id=b)
+    )
+    assert await is_following(me, [b]) == {b: True}
+    assert (
+        await follow_service.create_follow(FollowCreate(follower_id=me, following_id=b))
+        is None
+    )
+    request = await friendship_service.create_friendship(
+        FriendshipCreate(user_id=me, friend_id=c, status="requested")
+    )
+    assert await get_friend_suggestions(me, 10) == [(d, 1)]
+    await friendship_service.update_friendship(
+        request.id, FriendshipUpdate(status="accepted")
+    )
+    assert (await get_counts(me))["friends"] == 3
+    assert await get_mutual_friends(me, a) == [c]
+
+    await follow_service.delete_follow(created.id)
+    await friendship_service.delete_friendship(request.id)
+    assert await is_following(me, [b]) == {b: False}
+    assert await get_counts(me) == {
+        "user_id": me,
+        "followers": 1,
+        "following": 1,
+        "friends": 2,
+    }
+    assert index.built_at == built_at
+
+    # A rebuild sees the same graph from the tables
+    await index.build()
+    assert await get_friend_suggestions(me, 10) == [(c, 2), (d, 1)]
+
+
+@pytest.mark.asyncio
+async def test_graph_routes(db_session):
+    me, a, b = await _users(db_session, 3)
+    db_session.add_all(
+        [
+            Follow(follower_id=me, following_id=a),
+            _friendship(me, a, "accepted"),
+            _friendship(a, b, "accepted"),
+        ]
+    )
+    await db_session.commit()
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=config.base_url) as client:
+        response = await client.get(f"/api/v1/graph/users/{a}/counts")
+        assert response.json() == {
+            "user_id": a,
+            "followers": 1,
+            "following": 0,
+            "friends": 2,
+        }
+        response = await client.get(
+            f"/api/v1/graph/users/{me}/is-following",
+            params={"user_ids": [a, b]},
+        )
+        assert response.json() == [
+            {"user_id": a, "following": True},
+            {"user_id": b, "following": False},
+        ]
+        response = await client.get(f"/api/v1/graph/users/{me}/mutual-friends/{b}")
+        assert response.json() == {"count": 1, "user_ids": [a]}
+        response = await client.get(f"/api/v1/graph/users/{me}/suggestions")
+        assert response.json() == [{"user_id": b, "mutual_friends": 1}]
@@ -0,0 +1,238 @@
+import pytest
+from datetime import timedelta
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+from sqlmodel import select
+from server.db.models import (
+    Category,
+    Comment,
+    Follow,
+    Friendship,
+    Post,
+    PostCategory,
+    PostTag,
+    Reaction,
+    Tag,
+    User,
+    UserFeed,
+)
+from server import app
+from server.db.session import engine
+from server.common import config
+from server.services.counters import recompute_counters
+from server.services.newsfeed import fan_out_post, feed_query
+from server.services.user_feed import get_hydrated_feed_for_user
+
+
+async def _setup_graph(session):
+    users = [User(username=f"user{i}", password_hash="x") for i in range(5)]
+    session.add_all(users)
+    await session.flush()
+    author, follower, friend, both, stranger = users
+    session.add_all(
+        [
+            Follow(follower_id=follower.id, following_id=author.id),
+            Follow(follower_id=both.id, following_id=author.id),
+            Friendship(
+                user_id=author.id,
+                friend_id=friend.id,
+                requester_id=author.id,
+                status="accepted",
+            ),
+            Friendship(
+                user_id=author.id,
+                friend_id=both.id,
+                requester_id=both.id,
+                status="accepted",
+            ),
+            Friendship(
+                user_id=author.id,
+                friend_id=stranger.id,
+                requester_id=author.id,
+                status="requested",
+            ),
+        ]
+    )
+    await session.flush()
+    return users
+
+
+async def _post_and_fan_out(session, author, visibility):
+    post = Post(user_id=author.id, content_text="hello", visibility=visibility)
+    session.add(post)
+    await session.flush()
+    await fan_out_post(session, post)
+    await session.commit()
+    result = await session.exec(select(UserFeed).where(UserFeed.post_id == post.id))
+    return post, {feed.user_id: feed for feed in result.all()}
+
+
+@pytest.mark.asyncio
+async def test_fan_out_public_post(db_session):
+    author, follower, friend, both, stranger = await _setup_graph(db_session)
+
+    post, feeds = await _post_and_fan_out(db_session, author, "public")
+
+    assert set(feeds) == {follower.id, friend.id, both.id}
+    assert feeds[follower.id].source_type == "follow"
+    assert feeds[friend.id].source_type == "friend"
+    assert feeds[both.id].source_type == "friend"
+    assert all(feed.visibility == "public" for feed in feeds.values())
+
+
+@pytest.mark.asyncio
+async def test_fan_out_friends_only_post(db_session):
+    author, follower, friend, both, stranger = await _setup_graph(db_session)
+
+    post, feeds = await _post_and_fan_out(db_session, author, "friends")
+
+    assert set(feeds) == {friend.id, both.id}
+
+
+@pytest.mark.asyncio
+async def test_fan_out_private_post(db_session):
+    author, *_ = await _setup_graph(db_session)
+
+    post, feeds = await _post_and_fan_out(db_session, author, "private")
+
+    assert feeds == {}
+
+
+@pytest.mark.asyncio
+async def test_celebrity_post_is_pulled_at_read_time(db_session, monkeypatch):
+    monkeypatch.setattr(config, "CELEBRITY_FOLLOWER_THRESHOLD", 1)
+    author, follower, friend, both, stranger = await _setup_graph(db_session)
+
+    post, feeds = await _post_and_fan_out(db_session, author, "public")
+
+    # Only friends are written; the plain follower is not fanned out
+    assert post.followers_fanned_out is False
+    assert set(feeds) == {friend.id, both.id}
+
+    result = await db_session.exec(feed_query(follower.id))
+    pulled = result.all()
+    assert [(row.id, row.post_id, row.source_type) for row in pulled] == [
+        (None, post.id, "follow")
+    ]
+    assert pulled[0].added_at == feeds[friend.id].added_at
+
+    result = await db_session.exec(feed_query(both.id))
+    assert [(row.post_id, row.source_type) for row in result.all()] == [
+        (post.id, "friend")
+    ]
+
+    result = await db_session.exec(feed_query(stranger.id))
+    assert result.all() == []
+
+    # A new follower gets what the author posts from then on, as with fan-out,
+    # not the back catalogue
+    db_session.add(
+        Follow(
+            follower_id=stranger.id,
+            following_id=author.id,
+            created_at=post.created_at + timedelta(microseconds=1),
+        )
+    )
+    await db_session.commit()
+    result = await db_session.exec(feed_query(stranger.id))
+    assert result.all() == []
+    later, _ = await _post_and_fan_out(db_session, author, "public")
+    result = await db_session.exec(feed_query(stranger.id))
+    assert [row.post_id for row in result.all()] == [later.id]
+
+
+@pytest.mark.asyncio
+async def test_hydrated_feed_uses_fixed_number_of_statements(db_session):
+    author, follower, friend, both, stranger = await _setup_graph(db_session)
+    tag, category = Tag(name="python"), Category(name="Tech", description="code")
+    db_session.add_all([tag, category])
+    await db_session.flush()
+    posts = []
+    for i in range(5):
+        post, _ = await _post_and_fan_out(db_session, author, "public")
+        posts.append(post)
+    first = posts[0]
+    db_session.add_all(
+        [
+            Comment(post_id=first.id, user_id=friend.id, content_text="nice"),
+            Comment(post_id=first.id, user_id=both.id, content_text="+1"),
+            Reaction(post_id=first.id, user_id=friend.id, type="like"),
+            Reaction(post_id=first.id, user_id=both.id, type="like"),
+            Reaction(post_id=first.id, user_id=both.id, type="wow"),
+            PostTag(post_id=first.id, tag_id=tag.id),
+            PostCategory(post_id=first.id, category_id=category.id),
+        ]
+    )
+    await db_session.commit()
+    await recompute_counters(db_session)
+    await db_session.commit()
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    try:
+        items, _ = await get_hydrated_feed_for_user(follower.id, limit=50)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count)
+
+    assert len(statements) == 3
+    assert [item["post_id"] for item in items] == [p.id for p in reversed(posts)]
+    item = items[-1]
+    assert item["author_username"] == author.username
+    assert item["comment_count"] == 2
+    assert item["reaction_counts"] == {"like": 2, "wow": 1}
+    assert [t["name"] for t in item["tags"]] == ["python"]
+    assert [c["name"] for c in item["categories"]] == ["Tech"]
+    assert items[0]["comment_count"] == 0 and items[0]["tags"] == []
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=config.base_url) as ac:
+        resp = await ac.get(
+            f"/api/v1/user-feeds/by-user/{follower.id}/hydrated", params={"limit": 2}
+        )
+    assert resp.status_code == 200
+    assert [item["post"]["id"] for item in resp.json()] == [
+        posts[4].id,
+        posts[3].id,
+    ]
+    assert resp.headers["X-Next-Cursor"]
+
+
+@pytest.mark.asyncio
+async def test_feed_answers_unchanged_poll_with_304(db_session):
+    author, follower, *_ = await _setup_graph(db_session)
+    await _post_and_fan_out(db_session, author, "public")
+    url = f"/api/v1/user-feeds/by-user/{follower.id}"
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=config.base_url) as ac:
+        first = await ac.get(url)
+        etag = first.headers["ETag"]
+        unchanged = await ac.get(url, headers={"If-None-Match": etag})
+        await _post_and_fan_out(db_session, author, "public")
+        changed = await ac.get(url, headers={"If-None-Match": etag})
+
+    assert first.status_code == 200 and len(first.json()) == 1
+    assert unchanged.status_code == 304
+    assert changed.status_code == 200 and len(changed.json()) == 2
+
+
+@pytest.mark.asyncio
+async def test_deleting_a_post_removes_its_feed_entries(db_session):
+    author, follower, *_ = await _setup_graph(db_session)
+    kept, _ = await _post_and_fan_out(db_session, author, "public")
+    gone, _ = await _post_and_fan_out(db_session, author, "public")
+    url = f"/api/v1/user-feeds/by-user/{follower.id}"
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=config.base_url) as ac:
+        resp = await ac.delete(f"/api/v1/posts/{gone.id}")
+        assert resp.status_code == 204
+        feed = await ac.get(url)
+        hydrated = await ac.get(f"{url}/hydrated")
+
+    assert [entry["post_id"] for entry in feed.json()] == [kept.id]
+    assert len(hydrated.json()) == 1
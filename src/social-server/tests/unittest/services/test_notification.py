@@ -0,0 +1,181 @@
+import pytest
+from datetime import datetime, timezone
+from httpx import AsyncClient, ASGITransport
+from sqlmodel import select
+from server import app
+from server.common import config
+from server.db.models import Notification, Post, User
+from server.schemas.comment import CommentCreate
+from server.schemas.follow import FollowCreate
+from server.schemas.friendship import FriendshipCreate, FriendshipUpdate
+from server.schemas.reaction import ReactionCreate
+from server.services.comment import create_comment
+from server.services.events import event_log
+from server.services.follow import create_follow
+from server.services.friendship import create_friendship, update_friendship
+from server.services.notification import (
+    get_notifications_for_user,
+    get_unread_count,
+    mark_read,
+    recompute_unread_counts,
+    write_notifications,
+)
+from server.services.reaction import create_reaction
+
+
+async def _setup(db_session, n=4):
+    users = [User(username=f"user{i}", password_hash="x") for i in range(n)]
+    db_session.add_all(users)
+    await db_session.flush()
+    post = Post(user_id=users[0].id, content_text="hello")
+    db_session.add(post)
+    await db_session.commit()
+    return [user.id for user in users], post.id
+
+
+async def _comment(post_id, user_id):
+    await create_comment(
+        CommentCreate(post_id=post_id, user_id=user_id, content_text="hi")
+    )
+
+
+async def _summary(user_id):
+    notifications, _ = await get_notifications_for_user(user_id)
+    return [(n.type, n.actor_id, n.actor_count, n.read) for n in notifications]
+
+
+@pytest.mark.asyncio
+async def test_writes_notify_and_bursts_fold_into_one_row(db_session):
+    (author, a, b, c), post = await _setup(db_session)
+
+    for actor in (a, b, c, a, author):  # the author's own comment is not news
+        await _comment(post, actor)
+    await create_reaction(ReactionCreate(post_id=post, user_id=b, type="like"))
+    await create_follow(FollowCreate(follower_id=c, following_id=author))
+    request = await create_friendship(FriendshipCreate(user_id=a, friend_id=author))
+
+    assert await _summary(author) == [
+        ("friend_request", a, 1, False),
+        ("follow", c, 1, False),
+        ("reaction", b, 1, False),
+        ("comment", a, 3, False),
+    ]
+    assert await get_unread_count(author) == 4
+    notifications, _ = await get_notifications_for_user(author)
+    assert notifications[-1].actor_ids == [a, c, b]
+
+    await update_friendship(request.id, FriendshipUpdate(status="accepted"))
+    assert await _summary(a) == [("friend_accepted", author, 1, False)]
+
+    # Once read, new activity starts a fresh row
+    unread, _ = await get_notifications_for_user(author, unread_only=True)
+    comment_row = unread[-1]
+    assert await mark_read(author, [comment_row.id]) == 1
+    assert await mark_read(author, [comment_row.id]) == 0
+    assert await get_unread_count(author) == 3
+    await _comment(post, b)
+    assert (await _summary(author))[0] == ("comment", b, 1, False)
+    assert await get_unread_count(author) == 4
+
+    assert await mark_read(author) == 4
+    assert await get_unread_count(author) == 0
+    unread, _ = await get_notifications_for_user(author, unread_only=True)
+    assert unread == []
+
+
+@pytest.mark.asyncio
+async def test_a_queued_burst_is_written_as_one_row(db_session):
+    users, post = await _setup(db_session, 8)
+    author, reactors = users[0], users[1:]
+    event_log.start()
+    try:
+        for user_id in reactors:
+            await create_reaction(
+                ReactionCreate(post_id=post, user_id=user_id, type="like")
+            )
+        await create_reaction(
+            ReactionCreate(post_id=post, user_id=reactors[0], type="wow")
+        )
+    finally:
+        await event_log.stop()
+
+    assert await _summary(author) == [("reaction", reactors[0], 7, False)]
+    assert await get_unread_count(author) == 1
+
+    # The counter is derived state and can be rebuilt from the rows
+    user = await db_session.get(User, author)
+    user.unread_notification_count = 99
+    await db_session.commit()
+    await recompute_unread_counts(db_session)
+    await db_session.commit()
+    assert await get_unread_count(author) == 1
+
+
+@pytest.mark.asyncio
+async def test_a_burst_folds_only_into_its_own_key(db_session):
+    (author, a, b, c), post = await _setup(db_session)
+    other = Post(user_id=author, content_text="other")
+    db_session.add(other)
+    await db_session.commit()
+
+    def event(type, actor_id, **target):
+        return {
+            "type": type,
+            "actor_id": actor_id,
+            "created_at": datetime.now(timezone.utc),
+            **target,
+        }
+
+    await write_notifications(
+        db_session,
+        [
+            event("comment", a, post_id=post),
+            event("comment", a, post_id=other.id),
+            event("follow", a, user_id=author),
+        ],
+    )
+    # Follows carry no post, comments fold per post
+    await write_notifications(
+        db_session,
+        [event("follow", b, user_id=author), event("comment", c, post_id=post)],
+    )
+    await db_session.commit()
+
+    result = await db_session.exec(
+        select(Notification.type, Notification.post_id, Notification.actor_count)
+    )
+    assert sorted(result.all(), key=str) == sorted(
+        [("comment", post, 2), ("comment", other.id, 1), ("follow", None, 2)],
+        key=str,
+    )
+    assert await get_unread_count(author) == 3
+
+
+@pytest.mark.asyncio
+async def test_notification_routes(db_session):
+    (author, a, b, _), post = await _setup(db_session)
+    await _comment(post, a)
+    await create_follow(FollowCreate(follower_id=b, following_id=author))
+    result = await db_session.exec(select(Notification.id).order_by(Notification.id))
+    comment_id, follow_id = result.all()
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=config.base_url) as client:
+        url = f"/api/v1/notifications/by-user/{author}"
+        response = await client.get(url, params={"limit": 1})
+        assert [n["id"] for n in response.json()] == [follow_id]
+        assert response.json()[0]["type"] == "follow"
+        response = await client.get(
+            url, params={"limit": 1, "cursor": response.headers["X-Next-Cursor"]}
+        )
+        assert [n["id"] for n in response.json()] == [comment_id]
+        assert "X-Next-Cursor" not in response.headers
+
+        response = await client.get(f"{url}/unread-count")
+        assert response.json() == {"user_id": author, "unread": 2}
+        response = await client.post(f"{url}/mark-read", json={"ids": [follow_id]})
+        assert response.json() == {"marked": 1, "unread": 1}
+        response = await client.post(f"{url}/mark-read", json={})
+        assert response.json() == {"marked": 1, "unread": 0}
+        response = await client.get("/api/v1/notifications/by-user/999999/unread-count")
+        assert response.status_code == 404
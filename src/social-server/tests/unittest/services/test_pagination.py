@@ -0,0 +1,128 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from datetime import datetime, timedelta, timezone
+from sqlmodel import select
+from server import app
+from server.common import config
+from server.common.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    page_of,
+    paginate,
+)
+from server.db.models import Follow, Post, User
+from server.services.newsfeed import FEED_ORDER, fan_out_post, feed_query
+
+POST_ORDER = [Post.created_at, Post.id]
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def test_cursor_round_trip():
+    values = [START, 42]
+    assert decode_cursor(encode_cursor(values), 2) == values
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor([1])])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, 2)
+
+
+@pytest.mark.parametrize(
+    "values", [["x", 1], [START, "1"], [None, None], [START, True], [1.5, 1]]
+)
+def test_cursor_values_must_fit_the_columns(values):
+    with pytest.raises(InvalidCursorError):
+        paginate(select(Post), POST_ORDER, encode_cursor(values), 10)
+    # The score-ordered feed checks its own cursor
+    assert decode_cursor(encode_cursor([1, 2, 3.5]), 3, (float, int, float))
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(encode_cursor([None, None, None]), 3, (float, int, float))
+
+
+@pytest.mark.asyncio
+async def test_wrongly_typed_cursors_are_bad_requests(db_session):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=config.base_url) as client:
+        for url, values in [
+            ("/api/v1/posts/", ["x", 1]),
+            ("/api/v1/user-feeds/by-user/1?order=score", [None, None, None]),
+        ]:
+            response = await client.get(url, params={"cursor": encode_cursor(values)})
+            assert response.status_code == 400, url
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_cover_every_row_once(db_session):
+    user = User(username="author", password_hash="x")
+    db_session.add(user)
+    await db_session.flush()
+    # Two posts share a timestamp so the id tie-breaker is exercised
+    stamps = [START, START, START + timedelta(1), START + timedelta(2), START]
+    db_session.add_all(
+        [
+            Post(user_id=user.id, content_text=str(i), created_at=ts)
+            for i, ts in enumerate(stamps)
+        ]
+    )
+    await db_session.commit()
+
+    seen, cursor = [], None
+    while True:
+        result = await db_session.exec(
+            paginate(select(Post), POST_ORDER, cursor, 2, descending=True)
+        )
+        page, cursor = page_of(result.all(), POST_ORDER, 2)
+        seen.extend(post.content_text for post in page)
+        if cursor is None:
+            break
+
+    assert seen == ["3", "2", "4", "1", "0"]
+
+
+@pytest.mark.asyncio
+async def test_feed_pages_merge_stored_and_pulled(db_session, monkeypatch):
+    celebrity, regular, reader = [
+        User(username=name, password_hash="x")
+        for name in ("celeb", "regular", "reader")
+    ]
+    db_session.add_all([celebrity, regular, reader])
+    await db_session.flush()
+    # Only the celebrity has more than one follower, so only its posts are pulled
+    monkeypatch.setattr(config, "CELEBRITY_FOLLOWER_THRESHOLD", 1)
+    db_session.add_all(
+        [
+            # Followed before any of the posts, so all of them are pulled
+            Follow(follower_id=follower, following_id=following, created_at=START)
+            for follower, following in (
+                (reader.id, celebrity.id),
+                (regular.id, celebrity.id),
+                (reader.id, regular.id),
+            )
+        ]
+    )
+    for i in range(6):
+        author = celebrity if i % 2 else regular
+        post = Post(
+            user_id=author.id,
+            content_text=str(i),
+            created_at=START + timedelta(minutes=i),
+        )
+        db_session.add(post)
+        await db_session.flush()
+        await fan_out_post(db_session, post)
+    await db_session.commit()
+
+    seen, cursor = [], None
+    while True:
+        result = await db_session.exec(feed_query(reader.id, cursor, 2))
+        page, cursor = page_of(result.all(), FEED_ORDER, 2)
+        seen.extend((row.id is None, row.added_at) for row in page)
+        if cursor is None:
+            break
+
+    assert [pulled for pulled, _ in seen] == [True, False] * 3
+    assert [added_at for _, added_at in seen] == [
+        START + timedelta(minutes=i) for i in reversed(range(6))
+    ]
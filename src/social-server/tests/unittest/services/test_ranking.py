@@ -0,0 +1,156 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from sqlmodel import select
+from server.common import config
+from server.db.models import Follow, Post, PostTag, Reaction, Tag, User, UserFeed
+from server.services.newsfeed import fan_out_post
+from server.services.ranking import (
+    LABEL_SPACE,
+    Affinity,
+    Candidates,
+    PostLabels,
+    rank_feeds,
+    ranked_feed_page,
+    score,
+)
+from server.services.user_feed import get_feeds_for_user
+
+NOW = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+
+def _candidates(**columns):
+    n = len(columns["post_ids"])
+    defaults = dict(
+        user_ids=np.ones(n, np.int64),
+        source_weights=np.full(n, 0.7),
+        created_at=np.full(n, NOW.timestamp()),
+        comment_counts=np.zeros(n),
+        reaction_counts=np.zeros(n),
+    )
+    defaults.update(columns)
+    defaults["post_ids"] = np.asarray(defaults["post_ids"], np.int64)
+    return Candidates(**defaults)
+
+
+def test_score_components():
+    none = Affinity(np.empty(0, np.int64), np.empty(0))
+    no_labels = PostLabels(np.empty(0, np.int64), np.empty(0, np.int64))
+    now = NOW.timestamp()
+
+    hours = config.RANK_HALF_LIFE_HOURS * 3600
+    fresh, old = score(
+        _candidates(post_ids=[1, 2], created_at=np.array([now, now - hours])),
+        none,
+        no_labels,
+        now,
+    )
+    assert old == pytest.approx(fresh / 2)
+
+    friend, follow = score(
+        _candidates(post_ids=[1, 2], source_weights=np.array([1.0, 0.7])),
+        none,
+        no_labels,
+        now,
+    )
+    assert friend > follow
+
+    busy, quiet = score(
+        _candidates(post_ids=[1, 2], reaction_counts=np.array([50.0, 0.0])),
+        none,
+        no_labels,
+        now,
+    )
+    assert busy > quiet
+
+    # Reader 1 likes label 4 (tag 2); post 1 carries it, post 2 does not
+    affinity = Affinity(np.array([1 * LABEL_SPACE + 4]), np.array([1.0]))
+    labels = PostLabels(np.array([1, 2]), np.array([4, 6]))
+    liked, other = score(_candidates(post_ids=[1, 2]), affinity, labels, now)
+    assert liked == pytest.approx(other + 0.8)
+
+
+@pytest.mark.asyncio
+async def test_ranked_reads_and_rank_feeds(db_session, monkeypatch):
+    users = [User(username=f"user{i}", password_hash="x") for i in range(3)]
+    db_session.add_all(users)
+    await db_session.flush()
+    author, reader, celebrity = users
+    tag = Tag(name="python")
+    now = datetime.now(timezone.utc)
+    followed_at = now - timedelta(days=7)
+    db_session.add_all(
+        [
+            tag,
+            Follow(
+                follower_id=reader.id, following_id=author.id, created_at=followed_at
+            ),
+            Follow(
+                follower_id=reader.id,
+                following_id=celebrity.id,
+                created_at=followed_at,
+            ),
+        ]
+    )
+    await db_session.flush()
+
+    posts = {}
+    for name, user, age in [
+        ("old", author, 48),
+        ("new", author, 1),
+        ("tagged", author, 6),
+        ("celebrity", celebrity, 2),
+    ]:
+        post = Post(
+            user_id=user.id,
+            content_text=name,
+            created_at=now - timedelta(hours=age),
+        )
+        db_session.add(post)
+        await db_session.flush()
+        if name == "celebrity":
+            monkeypatch.setattr(config, "CELEBRITY_FOLLOWER_THRESHOLD", 0)
+        await fan_out_post(db_session, post)
+        posts[name] = post
+    # The reader reacted to a python post before, so python posts get a boost
+    db_session.add_all(
+        [
+            PostTag(post_id=posts["tagged"].id, tag_id=tag.id),
+            PostTag(post_id=posts["old"].id, tag_id=tag.id),
+            Reaction(post_id=posts["old"].id, user_id=reader.id, type="like"),
+        ]
+    )
+    await db_session.commit()
+
+    # Nothing ranked ahead of the read: every entry is scored as it is read
+    seen, cursor = [], None
+    while True:
+        page, cursor = await get_feeds_for_user(reader.id, cursor, 1, order="score")
+        seen += page
+        if not cursor:
+            break
+    names = {post.id: name for name, post in posts.items()}
+    assert [names[entry.post_id] for entry in seen] == [
+        "tagged",
+        "new",
+        "celebrity",
+        "old",
+    ]
+    scores = [entry.rank_score for entry in seen]
+    assert scores == sorted(scores, reverse=True)
+    assert seen[2].id is None  # pulled at read time
+
+    # The offline snapshot agrees with a read at the same moment
+    assert await rank_feeds(now=now) == 3
+    entries, _ = await ranked_feed_page(db_session, reader.id, None, 10, now)
+    result = await db_session.exec(
+        select(UserFeed.post_id, UserFeed.rank_score).where(
+            UserFeed.user_id == reader.id
+        )
+    )
+    stored = dict(result.all())
+    assert len(stored) == 3
+    for entry in entries:
+        if entry.id is not None:
+            assert entry.rank_score == pytest.approx(stored[entry.post_id])
@@ -0,0 +1,117 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from server import app
+from server.common import config
+from server.db.models import Category, Post, PostCategory, PostTag, Tag, User
+from server.db.search import rebuild_search_index
+from server.db.session import engine
+from server.schemas.comment import CommentCreate
+from server.schemas.post import PostCreate, PostUpdate
+from server.services.comment import create_comment, delete_comment
+from server.services.post import create_post, delete_post, update_post
+from server.services.search import search
+
+
+async def _users(db_session, n):
+    users = [User(username=f"user{i}", password_hash="x") for i in range(n)]
+    db_session.add_all(users)
+    await db_session.commit()
+    return [user.id for user in users]
+
+
+async def _hits(query, **filters):
+    hits, _ = await search(query, **filters)
+    return [(hit.kind, hit.comment_id or hit.post_id) for hit in hits]
+
+
+@pytest.mark.asyncio
+async def test_search_follows_post_and_comment_writes(db_session):
+    author, reader = await _users(db_session, 2)
+    garden = await create_post(
+        PostCreate(user_id=author, content_text="Planting tomatoes in the garden")
+    )
+    other = await create_post(PostCreate(user_id=author, content_text="Cats nap"))
+    comment = await create_comment(
+        CommentCreate(
+            post_id=other.id, user_id=reader, content_text="My tomato plants died"
+        )
+    )
+
+    # Stemmed, case-insensitive and every word must match
+    assert sorted(await _hits("TOMATOES")) == [
+        ("comment", comment.id),
+        ("post", garden.id),
+    ]
+    assert await _hits("tomato garden") == [("post", garden.id)]
+    assert await _hits("tomato", kind="comment") == [("comment", comment.id)]
+    # Query syntax in the input is searched for as words
+    assert await _hits('tomato" OR cats*') == []
+    assert await _hits("?!") == []
+
+    await update_post(garden.id, PostUpdate(content_text="Roses in the garden"))
+    assert await _hits("tomato") == [("comment", comment.id)]
+    assert await _hits("rose") == [("post", garden.id)]
+
+    await delete_comment(comment.id)
+    await delete_post(garden.id)
+    assert await _hits("tomato") == []
+    assert await _hits("garden") == []
+    assert await _hits("cats") == [("post", other.id)]
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_filters_and_pages(db_session):
+    author, stranger = await _users(db_session, 2)
+    posts = [
+        Post(user_id=author, content_text="python"),
+        Post(user_id=author, content_text="python python python"),
+        Post(user_id=author, content_text="python, rust, go and java"),
+        Post(user_id=author, content_text="python secrets", visibility="private"),
+    ]
+    tag, category = Tag(name="code"), Category(name="Tech", description="")
+    db_session.add_all(posts + [tag, category])
+    await db_session.flush()
+    db_session.add_all(
+        [
+            PostTag(post_id=posts[1].id, tag_id=tag.id),
+            PostTag(post_id=posts[2].id, tag_id=tag.id),
+            PostCategory(post_id=posts[2].id, category_id=category.id),
+        ]
+    )
+    await db_session.commit()
+    # Written around the services, as the bulk seeder does
+    async with engine.begin() as conn:
+        await conn.run_sync(rebuild_search_index)
+
+    hits, _ = await search("python")
+    assert [hit.post_id for hit in hits] == [posts[1].id, posts[0].id, posts[2].id]
+    assert hits[0].score > hits[1].score > hits[2].score
+
+    pages, cursor = [], None
+    while True:
+        page, cursor = await search("python", limit=1, cursor=cursor)
+        pages += [hit.post_id for hit in page]
+        if not cursor:
+            break
+    assert pages == [hit.post_id for hit in hits]
+
+    assert await _hits("python", tag_id=tag.id) == [
+        ("post", posts[1].id),
+        ("post", posts[2].id),
+    ]
+    assert await _hits("python", tag_id=tag.id, category_id=category.id) == [
+        ("post", posts[2].id)
+    ]
+    assert ("post", posts[3].id) in await _hits("secrets", viewer_id=author)
+    assert await _hits("secrets", viewer_id=stranger) == []
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=config.base_url) as client:
+        response = await client.get(
+            "/api/v1/search/", params={"q": "python", "limit": 2}
+        )
+        assert [hit["post_id"] for hit in response.json()] == pages[:2]
+        assert response.json()[0]["kind"] == "post"
+        assert response.headers["X-Next-Cursor"]
+        response = await client.get("/api/v1/search/", params={"q": ""})
+        assert response.status_code == 422
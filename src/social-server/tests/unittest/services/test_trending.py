@@ -0,0 +1,181 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlmodel import select
+from server import app
+from server.common import config
+from server.db.models import Post, PostTag, Reaction, Tag, User, UserFeed
+from server.services import trending
+from server.services.cache import LocalRedis, RedisBackend
+from server.services.trending import SlidingCounter, TrendingTracker
+
+
+def test_sliding_counter_expires_old_buckets():
+    counter = SlidingCounter(window=600, bucket=60)
+    now = 10_000.0
+    assert counter.add("a", 1, now - 500, now)
+    counter.add("a", 1, now - 10, now)
+    counter.add("b", 3, now - 10, now)
+    assert not counter.add("c", 1, now - 700, now)  # already outside the window
+    assert counter.top(2) == [("b", 3), ("a", 2)]
+
+    assert counter.expire(now + 200) == set()
+    assert counter.top(2) == [("b", 3), ("a", 1)]
+    assert counter.expire(now + 700) == {"a", "b"}
+    assert counter.top(2) == []
+
+
+@pytest.mark.asyncio
+async def test_tick_injects_trending_and_recommended(db_session, monkeypatch):
+    monkeypatch.setattr(config, "TRENDING_TOP_K", 1)
+    now = datetime.now(timezone.utc)
+    users = [
+        User(username=f"user{i}", password_hash="x", last_active_at=now)
+        for i in range(4)
+    ]
+    idle = User(username="idle", password_hash="x")
+    tag = Tag(name="python")
+    db_session.add_all(users + [idle, tag])
+    await db_session.flush()
+    author, reader, fan1, fan2 = users
+
+    long_ago = now - timedelta(days=30)
+    posts = {
+        name: Post(user_id=author.id, content_text=name, visibility=visibility)
+        for name, visibility in [
+            ("hot", "public"),
+            ("python", "public"),
+            ("private", "private"),
+            ("old_python", "public"),
+        ]
+    }
+    db_session.add_all(posts.values())
+    await db_session.flush()
+    db_session.add_all(
+        [
+            PostTag(post_id=posts["python"].id, tag_id=tag.id),
+            PostTag(post_id=posts["old_python"].id, tag_id=tag.id),
+            # The reader's python interest predates the window
+            Reaction(
+                post_id=posts["old_python"].id,
+                user_id=reader.id,
+                type="like",
+                created_at=long_ago,
+            ),
+            Reaction(post_id=posts["python"].id, user_id=fan1.id, type="like"),
+        ]
+        + [
+            Reaction(post_id=posts[name].id, user_id=fan.id, type="like")
+            for name in ("hot", "private")
+            for fan in (reader, fan1, fan2)
+        ]
+    )
+    await db_session.commit()
+
+    tracker = TrendingTracker()
+    events, injected = await tracker.tick(budget=10, now=time.time())
+    assert events == 7  # the month-old reaction is outside the window
+    assert injected == 5
+
+    async def feeds():
+        result = await db_session.exec(
+            select(UserFeed.user_id, UserFeed.post_id, UserFeed.source_type)
+        )
+        return sorted(result.all())
+
+    by_name = {post.id: name for name, post in posts.items()}
+    rows = [(user, by_name[post], source) for user, post, source in await feeds()]
+    assert rows == sorted(
+        [
+            (reader.id, "hot", "trending"),
+            (reader.id, "python", "recommended"),
+            (fan1.id, "hot", "trending"),
+            (fan1.id, "python", "recommended"),
+            (fan2.id, "hot", "trending"),
+        ]
+    )
+
+    # A second pass adds nothing new
+    await tracker.tick(budget=10, now=time.time())
+    assert len(await feeds()) == 5
+
+    monkeypatch.setattr(trending, "tracker", tracker)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=config.base_url) as ac:
+        resp = await ac.get("/api/v1/trending/", params={"tag_id": tag.id})
+        assert resp.json() == [{"post_id": posts["python"].id, "score": 1.0}]
+        # Opening the feed makes the idle reader active for the next tick
+        await ac.get(f"/api/v1/user-feeds/by-user/{idle.id}")
+    await tracker.tick(budget=10, now=time.time())
+    result = await db_session.exec(
+        select(UserFeed.post_id).where(UserFeed.user_id == idle.id)
+    )
+    assert result.all() == [posts["hot"].id]
+
+
+@pytest.mark.asyncio
+async def test_ingest_catches_up_within_the_tick(db_session, monkeypatch, caplog):
+    monkeypatch.setattr(trending, "INGEST_BATCH", 2)
+    users = [User(username=f"user{i}", password_hash="x") for i in range(6)]
+    db_session.add_all(users)
+    await db_session.flush()
+    post = Post(user_id=users[0].id, content_text="hot")
+    db_session.add(post)
+    await db_session.flush()
+    db_session.add_all(
+        [Reaction(post_id=post.id, user_id=user.id, type="like") for user in users]
+    )
+    await db_session.commit()
+
+    tracker = TrendingTracker()
+    events, _ = await tracker.tick(budget=10, now=time.time())
+    assert events == 6 and tracker.caught_up
+    assert tracker.top() == [(post.id, 6.0)]
+
+    # Out of budget after one batch: the rest waits, and the lag is logged
+    tracker = TrendingTracker()
+    events, _ = await tracker.tick(budget=0, now=time.time())
+    assert events == 2 and not tracker.caught_up
+    assert "Trending ingest is behind" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_other_workers_serve_the_shared_lists(db_session, monkeypatch):
+    author, fan = User(username="author", password_hash="x"), User(
+        username="fan", password_hash="x"
+    )
+    tag = Tag(name="python")
+    db_session.add_all([author, fan, tag])
+    await db_session.flush()
+    post = Post(user_id=author.id, content_text="hot")
+    db_session.add(post)
+    await db_session.flush()
+    db_session.add_all(
+        [
+            PostTag(post_id=post.id, tag_id=tag.id),
+            Reaction(post_id=post.id, user_id=fan.id, type="like"),
+        ]
+    )
+    await db_session.commit()
+    shared = RedisBackend(LocalRedis(), "trending")
+    monkeypatch.setattr(trending, "shared_lists", shared)
+
+    # A worker without the job lock has nothing until the leader shares
+    follower = TrendingTracker()
+    monkeypatch.setattr(trending, "tracker", follower)
+    assert await trending.top_posts() == []
+
+    leader = TrendingTracker()
+    monkeypatch.setattr(trending, "tracker", leader)
+    job = asyncio.create_task(trending.run_trending_job(interval=60))
+    while await shared.get(trending.LISTS_KEY) is trending.MISSING:
+        await asyncio.sleep(0.01)
+    job.cancel()
+
+    monkeypatch.setattr(trending, "tracker", follower)
+    assert await trending.top_posts() == [(post.id, 1.0)]
+    assert await trending.top_posts(label=tag.id * 2) == [(post.id, 1.0)]
+    assert await trending.top_posts(label=999) == []
@@ -0,0 +1,111 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from server import app
+from server.common import config
+from server.db.models import Friendship, Post, User
+from server.schemas.friendship import FriendshipUpdate
+from server.schemas.post import PostUpdate, Visibility
+from server.services import friendship as friendship_service
+from server.services.friendship import ordered_pair
+from server.services.newsfeed import fan_out_post
+from server.services.post import get_all_posts, get_posts_by_user_id, update_post
+from server.services.user_feed import get_feeds_for_user
+
+
+async def _setup(session):
+    users = [User(username=f"user{i}", password_hash="x") for i in range(3)]
+    session.add_all(users)
+    await session.flush()
+    author, friend, stranger = (user.id for user in users)
+    user_id, friend_id = ordered_pair(author, friend)
+    friendship = Friendship(
+        user_id=user_id, friend_id=friend_id, requester_id=friend, status="accepted"
+    )
+    session.add(friendship)
+    posts = {}
+    # "friends-only" is how older rows spell "friends"
+    for visibility in ("public", "friends", "friends-only", "private"):
+        post = Post(user_id=author, content_text=visibility, visibility=visibility)
+        session.add(post)
+        await session.flush()
+        await fan_out_post(session, post)
+        posts[visibility] = post.id
+    await session.commit()
+    return author, friend, stranger, friendship.id, posts
+
+
+def _ids(posts, *visibilities):
+    return sorted(posts[visibility] for visibility in visibilities)
+
+
+@pytest.mark.asyncio
+async def test_posts_are_filtered_for_the_viewer(db_session):
+    author, friend, stranger, _, posts = await _setup(db_session)
+    everything = ("public", "friends", "friends-only", "private")
+
+    async def read(viewer_id, user_id=None):
+        if user_id is None:
+            page, _ = await get_all_posts(viewer_id=viewer_id)
+        else:
+            page, _ = await get_posts_by_user_id(user_id, viewer_id=viewer_id)
+        return sorted(post.id for post in page)
+
+    for user_id in (None, author):
+        assert await read(None, user_id) == _ids(posts, "public")
+        assert await read(stranger, user_id) == _ids(posts, "public")
+        assert await read(friend, user_id) == _ids(
+            posts, "public", "friends", "friends-only"
+        )
+        assert await read(author, user_id) == _ids(posts, *everything)
+
+
+@pytest.mark.asyncio
+async def test_feed_drops_posts_the_reader_can_no_longer_see(db_session):
+    author, friend, _, friendship_id, posts = await _setup(db_session)
+
+    async def feed():
+        entries, _ = await get_feeds_for_user(friend)
+        return sorted(entry.post_id for entry in entries)
+
+    assert await feed() == _ids(posts, "public", "friends", "friends-only")
+
+    await update_post(posts["public"], PostUpdate(visibility="private"))
+    assert await feed() == _ids(posts, "friends", "friends-only")
+
+    await friendship_service.update_friendship(
+        friendship_id, FriendshipUpdate(status="blocked")
+    )
+    assert await feed() == []
+
+
+def test_visibility_accepts_legacy_and_mixed_case_values():
+    assert Visibility("friends-only") is Visibility.FRIENDS
+    assert Visibility("Public") is Visibility.PUBLIC
+    assert PostUpdate(visibility="FRIENDS").visibility == "friends"
+    with pytest.raises(ValueError):
+        Visibility("everyone")
+
+
+@pytest.mark.asyncio
+async def test_post_routes_take_a_viewer(db_session):
+    author, friend, _, _, posts = await _setup(db_session)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=config.base_url) as client:
+        response = await client.get("/api/v1/posts/")
+        assert [post["id"] for post in response.json()] == [posts["public"]]
+        response = await client.get(
+            f"/api/v1/posts/by-user/{author}", params={"viewer_id": friend}
+        )
+        assert sorted(post["id"] for post in response.json()) == _ids(
+            posts, "public", "friends", "friends-only"
+        )
+        # Legacy values read back normalised
+        assert {post["visibility"] for post in response.json()} == {
+            "public",
+            "friends",
+        }
+        response = await client.put(
+            f"/api/v1/posts/{posts['private']}", json={"visibility": "everyone"}
+        )
+        assert response.status_code == 422
@@ -0,0 +1,47 @@
+import os
+import uvicorn
+import run
+
+
+def test_production_options_are_valid_uvicorn_config(monkeypatch, capsys):
+    # serve_production sets these for the workers it spawns
+    monkeypatch.setitem(os.environ, "INIT_DB_ON_STARTUP", "1")
+    monkeypatch.delenv("GRAPH_MAX_AGE_SECONDS", raising=False)
+    monkeypatch.setattr(run.config, "CACHE_URL", "")
+    calls = []
+    monkeypatch.setattr(run.uvicorn, "run", lambda app, **kwargs: calls.append(kwargs))
+    run.serve_production("127.0.0.1", 8000, 2)
+
+    (options,) = calls
+    config = uvicorn.Config("server:app", **options)
+    assert config.workers == 2
+    assert config.timeout_graceful_shutdown == (
+        run.config.SERVER_GRACEFUL_SHUTDOWN_SECONDS
+    )
+    assert config.limit_concurrency == run.config.SERVER_LIMIT_CONCURRENCY
+    # Each worker's graph index catches up with the others' writes sooner
+    assert os.environ["GRAPH_MAX_AGE_SECONDS"] == "10"
+    # Without CACHE_URL only the job's worker has trending lists
+    assert "Trending runs in one worker" in capsys.readouterr().out
+
+
+def test_an_explicit_graph_max_age_is_kept(monkeypatch):
+    monkeypatch.setitem(os.environ, "INIT_DB_ON_STARTUP", "1")
+    monkeypatch.setenv("GRAPH_MAX_AGE_SECONDS", "60")
+    monkeypatch.setattr(run.uvicorn, "run", lambda app, **kwargs: None)
+    run.serve_production("127.0.0.1", 8000, 2)
+    assert os.environ["GRAPH_MAX_AGE_SECONDS"] == "60"
+
+
+def test_dev_reset_and_seed_share_one_event_loop(monkeypatch):
+    steps = []
+
+    async def prepare_db(reset, init_data):
+        steps.append((reset, init_data))
+
+    monkeypatch.setattr(run, "DB_FILE", None)
+    monkeypatch.setattr(run, "prepare_db", prepare_db)
+    monkeypatch.setattr(run.uvicorn, "run", lambda app, **kwargs: None)
+    monkeypatch.setattr("sys.argv", ["run.py", "--init-data"])
+    run.main()
+    assert steps == [(True, True)]